@@ -0,0 +1,4 @@
+from time import perf_counter
+
+# Time of the first import of the bot package, used to report the startup time of the bot.
+STARTED_AT = perf_counter()
@@ -1,27 +1,125 @@
+import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
 
 from dotenv import load_dotenv
-from pydantic import ValidationError
 from telebot import TeleBot, types
 
-from resume_parser.dto import CriteriaDTO
-from resume_parser.exceptions import ResumeNotFoundError
-from resume_parser.robota_ua_resume_parser import RobotaUaResumeParser
-from resume_parser.robota_ua_resume_searcher import RobotaUaResumeSearcher
-from resume_parser.work_ua_resume_parser import WorkUaResumeParser
-from resume_parser.work_ua_resume_searcher import SALARY, WorkUaResumeSearcher
+from resume_finder_bot import STARTED_AT
+from resume_finder_bot.message_sender import MessageSender
+from resume_finder_bot.session_store import InMemorySessionStore, SQLiteSessionStore
+from resume_finder_bot.webhook import WebhookServer
+from resume_parser.budget import SearchBudget
+from resume_parser.caching import LinkCache
+from resume_parser.cancellation import CancellationToken
+from resume_parser.coalescing import SearchCoalescer
+from resume_parser.constants import SALARY
+from resume_parser.corpus import ResumeCorpus
+from resume_parser.deduplication import ResumeDeduplicator
+from resume_parser.exceptions import SearchCancelledError
+from resume_parser.exporters import create_exporter
+from resume_parser.planning import SearchPlanner
+from resume_parser.prewarming import PrewarmScheduler, SearchUsage
+from resume_parser.profiling import SearchProfiler, profile_stage
+from resume_parser.search import search_corpus
+from resume_parser.user_agents import user_agent_provider
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 TOKEN = os.environ.get("TOKEN")
+SEARCH_MAX_RESUMES = int(os.environ.get("SEARCH_MAX_RESUMES", 300))
+SEARCH_MAX_PAGES = int(os.environ.get("SEARCH_MAX_PAGES", 30))
+SEARCH_DEADLINE = float(os.environ.get("SEARCH_DEADLINE", 600))
+SEARCH_KEPT_RESULTS = int(os.environ.get("SEARCH_KEPT_RESULTS", 20))
+SEARCH_EARLY_STOP_SLACK = os.environ.get("SEARCH_EARLY_STOP_SLACK", "1")
+SEARCH_SHORTLIST_SIZE = os.environ.get("SEARCH_SHORTLIST_SIZE", "30")
+SEARCH_LOCAL_FILTERS = os.environ.get("SEARCH_LOCAL_FILTERS", "").lower() in ("1", "true", "yes")
+SEARCH_PLANNED_QUERIES = int(os.environ.get("SEARCH_PLANNED_QUERIES", 0))
+SEARCH_PARALLEL_QUERIES = int(os.environ.get("SEARCH_PARALLEL_QUERIES", 2))
+TRACE_MEMORY = os.environ.get("TRACE_MEMORY", "").lower() in ("1", "true", "yes")
+CORPUS_PATH = os.environ.get("CORPUS_PATH", "resumes.sqlite3")
+CORPUS_MAX_AGE = float(os.environ.get("CORPUS_MAX_AGE", 7 * 24 * 60 * 60))
+SEARCH_CACHE_PATH = os.environ.get("SEARCH_CACHE_PATH", "search_cache.sqlite3")
+LINK_CACHE_TTL = float(os.environ.get("LINK_CACHE_TTL", 0))
+RESUME_CACHE_MAX_AGE = float(os.environ.get("RESUME_CACHE_MAX_AGE", 0))
+PREWARM_HOURS = os.environ.get("PREWARM_HOURS", "")
+PREWARM_SEARCHES = int(os.environ.get("PREWARM_SEARCHES", 20))
+PREWARM_PARALLEL = int(os.environ.get("PREWARM_PARALLEL", 1))
+PREWARM_MAX_RESUMES = int(os.environ.get("PREWARM_MAX_RESUMES", SEARCH_MAX_RESUMES))
+PREWARM_MAX_PAGES = int(os.environ.get("PREWARM_MAX_PAGES", SEARCH_MAX_PAGES))
+EXPORT_PATH = os.environ.get("EXPORT_PATH", "")
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 10000))
+PROFILE_SEARCHES = os.environ.get("PROFILE_SEARCHES", "").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+ADMIN_IDS = {int(user_id) for user_id in os.environ.get("ADMIN_IDS", "").split(",") if user_id.strip()}
+BOT_MODE = os.environ.get("BOT_MODE", "polling")
+BOT_WORKERS = int(os.environ.get("BOT_WORKERS", 2))
+SEARCH_WORKERS = int(os.environ.get("SEARCH_WORKERS", 4))
+WEBHOOK_URL = os.environ.get("WEBHOOK_URL")
+WEBHOOK_HOST = os.environ.get("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.environ.get("WEBHOOK_PORT", 8443))
+WEBHOOK_PATH = os.environ.get("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET")
+
+bot = TeleBot(TOKEN, parse_mode="HTML", num_threads=BOT_WORKERS)
+message_sender = MessageSender(bot)
+
+if os.environ.get("SESSION_STORE") == "sqlite":
+    session_store = SQLiteSessionStore(
+        path=os.environ.get("SESSION_DB_PATH", "sessions.sqlite3"),
+        ttl=float(os.environ.get("SESSION_TTL", 7 * 24 * 60 * 60)),
+    )
+else:
+    session_store = InMemorySessionStore(
+        max_size=int(os.environ.get("SESSION_MAX_SIZE", 10000)),
+        ttl=float(os.environ.get("SESSION_TTL", 7 * 24 * 60 * 60)),
+    )
 
-bot = TeleBot(TOKEN, parse_mode="HTML")
-
-user_responses = {}
+resume_corpus = ResumeCorpus(CORPUS_PATH) if CORPUS_PATH else None
+resume_exporter = create_exporter(EXPORT_PATH, EXPORT_CHUNK_SIZE) if EXPORT_PATH else None
+search_planner = (
+    SearchPlanner(max_queries=SEARCH_PLANNED_QUERIES, max_parallel=SEARCH_PARALLEL_QUERIES)
+    if SEARCH_PLANNED_QUERIES
+    else None
+)
+link_cache = LinkCache(SEARCH_CACHE_PATH, LINK_CACHE_TTL) if LINK_CACHE_TTL else None
+search_coalescer = SearchCoalescer(local_filters=SEARCH_LOCAL_FILTERS, planner=search_planner, link_cache=link_cache)
+search_usage = SearchUsage(SEARCH_CACHE_PATH) if PREWARM_HOURS else None
+profile_next_search = threading.Event()
+# Searches run outside the update workers, so commands such as /cancel are handled while searches are running.
+search_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="search")
+active_searches = {}
+active_searches_lock = threading.Lock()
+
+BUDGET_EXHAUSTED_MESSAGE = (
+    "Пошук зупинено через обмеження на кількість резюме, сторінок або час пошуку. "
+    "Показано найкращі результати серед уже оброблених резюме."
+)
+
+
+def run_in_search_executor(handler):
+    @wraps(handler)
+    def submit(message):
+        search_executor.submit(run_search_handler, handler, message)
+
+    return submit
+
+
+def run_search_handler(handler, message):
+    try:
+        handler(message)
+    except Exception:
+        logger.exception("Search of chat %s failed", message.chat.id)
 
 
 @bot.message_handler(commands=["start"])
 def start(message):
-    user_responses[message.chat.id] = {}
+    session_store.save(message.chat.id, {"criteria": {}})
     keyboard = types.ReplyKeyboardMarkup(row_width=3, resize_keyboard=True)
     position = types.KeyboardButton(text="Посада")
     location = types.KeyboardButton(text="Локація")
@@ -30,7 +128,7 @@ def start(message):
     experience = types.KeyboardButton(text="Зарплата до")
     keywords = types.KeyboardButton(text="Ключові слова")
     keyboard.add(position, location, salary_from, salary_to, experience, keywords)
-    bot.send_message(
+    message_sender.send(
         message.chat.id,
         """
 <b>Вас вітає бот ResumeFinder🔍</b>
@@ -48,7 +146,7 @@ def start(message):
 
 @bot.message_handler(commands=["help"])
 def help_handler(message):
-    bot.send_message(
+    message_sender.send(
         message.chat.id,
         """
 <b>Доступні команди</b>
@@ -60,6 +158,8 @@ def help_handler(message):
 /find_on_work - Команда щоб виконати пошук релевантних резюме за попередньо заданими параметрами на сайті work.ua.
 /find_on_robota - Команда щоб виконати пошук релевантних резюме за попередньо заданими параметрами на сайті robota.ua.
 /find_on_all - Команда щоб виконати пошук релевантних резюме за попередньо заданими параметрами на обох платформах.
+/find_in_corpus - Команда щоб швидко знайти релевантні резюме серед раніше завантажених, без пошуку на сайтах.
+/cancel - Команда щоб скасувати пошук, що виконується.
 
 Перед пошуком резюме <b>обов'язково введіть параметри</b> для пошуку. 
 Для цього використайте спеціальні кнопки на клавіатурі або напишіть вручну, наприклад, <i>Посада</i>,
@@ -71,102 +171,181 @@ def help_handler(message):
 
 
 @bot.message_handler(commands=["find_on_work"])
+@run_in_search_executor
 def find_resume_on_work(message):
-    if not is_user_started(message):
+    criteria = get_search_criteria(message)
+    if criteria is None:
         return
 
-    try:
-        criteria = get_criteria(message)
-    except ValidationError:
-        bot.send_message(message.chat.id, "Посада кандидата не вказана або введені некоректні дані в інших параметрах")
-        return
+    message_sender.send(message.chat.id, "Шукаємо кандидатів на work.ua, це може зайняти певний час.")
 
-    bot.send_message(message.chat.id, "Шукаємо кандидатів на work.ua, це може зайняти певний час.")
+    record_search_usage(criteria, "work_ua")
+    budget = get_search_budget()
+    with start_search(message) as cancellation_token, get_profiler("work_ua") as profiler:
+        work_ua_results = search_coalescer.search(
+            criteria, "work_ua", budget, get_parser_options(), TRACE_MEMORY, profiler, cancellation_token
+        )
+        if work_ua_results is None:
+            message_sender.send(message.chat.id, "Резюме кандидатів за заданими параметрами не знайдено!")
+            return
 
-    work_ua_searcher = WorkUaResumeSearcher()
+        send_report(message, "<b>Звіт пошуку кандидатів на work.ua</b>", work_ua_results, budget.is_exhausted, profiler)
 
-    try:
-        work_ua_searcher.set_params(criteria)
-    except ResumeNotFoundError:
-        bot.send_message(message.chat.id, "Резюме кандидатів за заданими параметрами не знайдено!")
+
+@bot.message_handler(commands=["find_on_robota"])
+@run_in_search_executor
+def find_resume_on_robota(message):
+    criteria = get_search_criteria(message)
+    if criteria is None:
         return
 
-    work_ua_resume_parser = WorkUaResumeParser()
-    work_ua_resume_parser.pars_resumes(work_ua_searcher.resume_links, criteria)
+    message_sender.send(message.chat.id, "Шукаємо кандидатів на robota.ua, це може зайняти певний час.")
 
-    work_ua_results = work_ua_resume_parser.get_relevant_resumes(5)
-    bot.send_message(message.chat.id, "<b>Звіт пошуку кандидатів на work.ua</b>")
-    for index, result in enumerate(work_ua_results.items()):
-        if result[1]["is_file"]:
-            bot.send_message(
-                message.chat.id,
-                f"""
-📌 Кандидат №{index + 1}
-- <b>Посада</b>: <a href="{result[0]}">{result[1]["position"]}</a>
-- Усі ключові слова з якими знайдено співпадіння в резюме: {result[1]["matching_keywords"]}
-- Кількість балів: {result[1]["points"]}
-- Резюме завантажено файлом, а не заповнено на сайті, тому розділи навичок, освіти та досвіду не знайдені.
-                """
-            )
-        else:
-            bot.send_message(
-                message.chat.id,
-                f"""
-📌 Кандидат №{index + 1}
-- <b>Посада</b>: <a href="{result[0]}">{result[1]["position"]}</a>
-- {result[1]["experience"]}
-- {result[1]["education"]}
-- Навички кандидата, що співпали з вказаними: {result[1]["matching_skills"]}
-- Усі ключові слова з якими знайдено співпадіння в резюме: {result[1]["matching_keywords"]}
-- Кількість балів: {result[1]["points"]}
-                """
-            )
+    record_search_usage(criteria, "robota_ua")
+    budget = get_search_budget()
+    with start_search(message) as cancellation_token, get_profiler("robota_ua") as profiler:
+        robota_ua_results = search_coalescer.search(
+            criteria, "robota_ua", budget, get_parser_options(), TRACE_MEMORY, profiler, cancellation_token
+        )
+        if robota_ua_results is None:
+            message_sender.send(message.chat.id, "Резюме кандидатів за заданими параметрами не знайдено!")
+            return
 
+        send_report(
+            message, "<b>Звіт пошуку кандидатів на robota.ua</b>", robota_ua_results, budget.is_exhausted, profiler
+        )
 
-@bot.message_handler(commands=["find_on_robota"])
-def find_resume_on_robota(message):
-    if not is_user_started(message):
+
+@bot.message_handler(commands=["find_on_all"])
+@run_in_search_executor
+def find_resume_on_all(message):
+    criteria = get_search_criteria(message)
+    if criteria is None:
         return
 
-    try:
-        criteria = get_criteria(message)
-    except ValidationError:
-        bot.send_message(message.chat.id, "Посада кандидата не вказана або введені некоректні дані в інших параметрах")
+    message_sender.send(message.chat.id, "Шукаємо кандидатів на work.ua та robota.ua, це може зайняти певний час.")
+
+    record_search_usage(criteria, "work_ua")
+    record_search_usage(criteria, "robota_ua")
+    work_ua_budget = get_search_budget()
+    robota_ua_budget = get_search_budget()
+    with start_search(message) as cancellation_token, get_profiler("all") as profiler:
+        work_ua_results = search_coalescer.search(
+            criteria, "work_ua", work_ua_budget, get_parser_options(), TRACE_MEMORY, profiler, cancellation_token
+        )
+        robota_ua_results = search_coalescer.search(
+            criteria, "robota_ua", robota_ua_budget, get_parser_options(), TRACE_MEMORY, profiler, cancellation_token
+        )
+        if work_ua_results is None and robota_ua_results is None:
+            message_sender.send(message.chat.id, "Резюме кандидатів за заданими параметрами не знайдено!")
+            return
+
+        with profile_stage(profiler, "ranking"):
+            all_results = ResumeDeduplicator().deduplicate({**(work_ua_results or {}), **(robota_ua_results or {})})
+        send_report(
+            message,
+            "<b>Звіт пошуку кандидатів на work.ua та robota.ua</b>",
+            all_results,
+            work_ua_budget.is_exhausted or robota_ua_budget.is_exhausted,
+            profiler,
+        )
+
+
+@bot.message_handler(commands=["cancel"])
+def cancel_search(message):
+    with active_searches_lock:
+        cancellation_tokens = active_searches.pop(message.chat.id, set())
+    if not cancellation_tokens:
+        message_sender.send(message.chat.id, "Немає активного пошуку, який можна скасувати.")
         return
 
-    bot.send_message(message.chat.id, "Шукаємо кандидатів на robota.ua, це може зайняти певний час.")
+    message_sender.send(message.chat.id, "Скасовуємо пошук...")
+    for cancellation_token in cancellation_tokens:
+        cancellation_token.cancel()
 
-    robota_ua_searcher = RobotaUaResumeSearcher()
 
-    try:
-        robota_ua_searcher.set_params(criteria)
-    except ResumeNotFoundError:
-        bot.send_message(message.chat.id, "Резюме кандидатів за заданими параметрами не знайдено!")
+@bot.message_handler(commands=["find_in_corpus"])
+@run_in_search_executor
+def find_resume_in_corpus(message):
+    criteria = get_search_criteria(message)
+    if criteria is None:
         return
 
-    robota_ua_resume_parser = RobotaUaResumeParser()
-    robota_ua_resume_parser.pars_resumes(robota_ua_searcher.resume_links, criteria)
+    if resume_corpus is None:
+        message_sender.send(message.chat.id, "Локальна база резюме не підключена.")
+        return
 
-    robota_ua_results = robota_ua_resume_parser.get_relevant_resumes(5)
-    bot.send_message(message.chat.id, "<b>Звіт пошуку кандидатів на robota.ua</b>")
-    for index, result in enumerate(robota_ua_results.items()):
-        bot.send_message(
-            message.chat.id,
-            f"""
+    corpus_results = search_corpus(criteria, resume_corpus, max_age=CORPUS_MAX_AGE, refresh_limit=SEARCH_KEPT_RESULTS)
+    if not corpus_results:
+        message_sender.send(message.chat.id, "Резюме кандидатів за заданими параметрами не знайдено!")
+        return
+
+    send_report(
+        message,
+        "<b>Звіт пошуку кандидатів серед раніше завантажених резюме</b>",
+        ResumeDeduplicator().deduplicate(corpus_results),
+        False,
+    )
+
+
+def send_report(message, title, resume_results, is_budget_exhausted, profiler=None):
+    from resume_parser.interfaces import ResumeParserInterface
+
+    with profile_stage(profiler, "ranking"):
+        relevant_results = ResumeParserInterface.rank_resumes(resume_results, 5)
+    save_search_results(message.chat.id, title, relevant_results)
+
+    report_parts = [title]
+    if is_budget_exhausted:
+        report_parts.append(BUDGET_EXHAUSTED_MESSAGE)
+    for index, result in enumerate(relevant_results.items()):
+        report_parts.append(format_candidate(index, *result))
+    message_sender.send_report(message.chat.id, report_parts)
+
+
+def format_candidate(index, resume_link, resume):
+    if resume.get("is_file"):
+        candidate = f"""
 📌 Кандидат №{index + 1}
-- <b>Посада</b>: <a href="{result[0]}">{result[1]["position"]}</a>
-- {result[1]["experience"]}
-- {result[1]["education"]}
-- Усі ключові слова з якими знайдено співпадіння в резюме: {result[1]["matching_keywords"]}
-- Кількість балів: {result[1]["points"]}
-            """
-        )
+- <b>Посада</b>: <a href="{resume_link}">{resume["position"]}</a>
+- Усі ключові слова з якими знайдено співпадіння в резюме: {resume["matching_keywords"]}
+- Кількість балів: {resume["points"]}
+- Резюме завантажено файлом, а не заповнено на сайті, тому розділи навичок, освіти та досвіду не знайдені.
+"""
+    elif "matching_skills" in resume:
+        candidate = f"""
+📌 Кандидат №{index + 1}
+- <b>Посада</b>: <a href="{resume_link}">{resume["position"]}</a>
+- {resume["experience"]}
+- {resume["education"]}
+- Навички кандидата, що співпали з вказаними: {resume["matching_skills"]}
+- Усі ключові слова з якими знайдено співпадіння в резюме: {resume["matching_keywords"]}
+- Кількість балів: {resume["points"]}
+"""
+    else:
+        candidate = f"""
+📌 Кандидат №{index + 1}
+- <b>Посада</b>: <a href="{resume_link}">{resume["position"]}</a>
+- {resume["experience"]}
+- {resume["education"]}
+- Усі ключові слова з якими знайдено співпадіння в резюме: {resume["matching_keywords"]}
+- Кількість балів: {resume["points"]}
+"""
+    for duplicate_link in resume.get("duplicates", []):
+        candidate += f'- Цей кандидат також знайдений тут: <a href="{duplicate_link}">{duplicate_link}</a>\n'
+    return candidate
 
 
-@bot.message_handler(commands=["find_on_all"])
-def find_resume_on_all(message):
-    find_resume_on_work(message)
-    find_resume_on_robota(message)
+@bot.message_handler(commands=["profile_next"])
+def profile_next(message):
+    if message.from_user.id not in ADMIN_IDS:
+        message_sender.send(message.chat.id, "Ця команда доступна лише адміністраторам бота.")
+        return
+
+    profile_next_search.set()
+    message_sender.send(
+        message.chat.id, f"Наступний пошук буде запущено з профілюванням, результати буде збережено в {PROFILE_DIR}."
+    )
 
 
 @bot.message_handler(commands=["check"])
@@ -174,16 +353,17 @@ def check_params(message):
     if not is_user_started(message):
         return
 
-    bot.send_message(
+    user_criteria = get_user_criteria(message.chat.id)
+    message_sender.send(
         message.chat.id,
         f"""
 <b>Параметри пошуку резюме</b>: 
-Позиція: <i>{user_responses[message.chat.id].get('position', 'Не вказана')}</i>
-Локація: <i>{user_responses[message.chat.id].get('location', 'Не вказана')}</i>
-Досвід: <i>{user_responses[message.chat.id].get('experience', 'Не вказаний')}</i>
-Зарплата (від): <i>{user_responses[message.chat.id].get('salary_from', 'Не вказана')}</i>
-Зарплата (до): <i>{user_responses[message.chat.id].get('salary_to', 'Не вказана')}</i>
-Ключові слова: <i>{user_responses[message.chat.id].get('keywords', 'Не вказані')}</i>
+Позиція: <i>{user_criteria.get('position', 'Не вказана')}</i>
+Локація: <i>{user_criteria.get('location', 'Не вказана')}</i>
+Досвід: <i>{user_criteria.get('experience', 'Не вказаний')}</i>
+Зарплата (від): <i>{user_criteria.get('salary_from', 'Не вказана')}</i>
+Зарплата (до): <i>{user_criteria.get('salary_to', 'Не вказана')}</i>
+Ключові слова: <i>{user_criteria.get('keywords', 'Не вказані')}</i>
 """
     )
 
@@ -193,18 +373,110 @@ def clear_params(message):
     if not is_user_started(message):
         return
 
-    user_responses[message.chat.id] = {}
-    bot.send_message(message.chat.id, "Параметри очищено")
+    session_store.save(message.chat.id, {"criteria": {}})
+    message_sender.send(message.chat.id, "Параметри очищено")
+
+
+def get_search_budget():
+    return SearchBudget(max_resumes=SEARCH_MAX_RESUMES, max_pages=SEARCH_MAX_PAGES, deadline=SEARCH_DEADLINE)
+
+
+@contextmanager
+def start_search(message):
+    cancellation_token = CancellationToken()
+    with active_searches_lock:
+        active_searches.setdefault(message.chat.id, set()).add(cancellation_token)
+    try:
+        yield cancellation_token
+    except SearchCancelledError:
+        message_sender.send(message.chat.id, "Пошук скасовано.")
+    finally:
+        with active_searches_lock:
+            cancellation_tokens = active_searches.get(message.chat.id)
+            if cancellation_tokens is not None:
+                cancellation_tokens.discard(cancellation_token)
+                if not cancellation_tokens:
+                    del active_searches[message.chat.id]
+
+
+@contextmanager
+def get_profiler(name):
+    if not (PROFILE_SEARCHES or profile_next_search.is_set()):
+        yield None
+        return
+
+    with SearchProfiler(PROFILE_DIR, name) as profiler:
+        # The request of /profile_next is kept for the next search if another search is being profiled.
+        if profiler.is_active:
+            profile_next_search.clear()
+        yield profiler
+
+
+def get_parser_options():
+    return {
+        "max_results": SEARCH_KEPT_RESULTS,
+        "sinks": [sink for sink in (resume_corpus, resume_exporter) if sink],
+        "early_stop_slack": int(SEARCH_EARLY_STOP_SLACK) if SEARCH_EARLY_STOP_SLACK else None,
+        "shortlist_size": int(SEARCH_SHORTLIST_SIZE) if SEARCH_SHORTLIST_SIZE else None,
+        "resume_cache": resume_corpus if RESUME_CACHE_MAX_AGE else None,
+        "resume_cache_max_age": RESUME_CACHE_MAX_AGE or None,
+    }
+
+
+def record_search_usage(criteria, platform):
+    if search_usage is not None:
+        search_usage.record(criteria, platform)
+
+
+def prewarm_search(criteria, platform, budget, cancellation_token):
+    # All found resumes are downloaded into the corpus, not only the shortlist of the keywords. They are not
+    # exported, their scores are for the keywords of past searches.
+    parser_options = {
+        **get_parser_options(),
+        "sinks": [resume_corpus] if resume_corpus else [],
+        "early_stop_slack": None,
+        "shortlist_size": None,
+    }
+    search_coalescer.search(criteria, platform, budget, parser_options, cancellation_token=cancellation_token)
+
+
+def get_prewarm_scheduler():
+    start_hour, end_hour = (int(hour) for hour in PREWARM_HOURS.split("-"))
+    return PrewarmScheduler(
+        search_usage,
+        prewarm_search,
+        hours=(start_hour, end_hour),
+        max_searches=PREWARM_SEARCHES,
+        max_parallel=PREWARM_PARALLEL,
+        max_resumes=PREWARM_MAX_RESUMES,
+        max_pages=PREWARM_MAX_PAGES,
+    )
+
+
+def get_search_criteria(message):
+    from pydantic import ValidationError
+
+    if not is_user_started(message):
+        return None
+
+    try:
+        return get_criteria(message)
+    except ValidationError:
+        message_sender.send(message.chat.id, "Посада кандидата не вказана або введені некоректні дані в інших параметрах")
+        return None
 
 
 def get_criteria(message):
+    from resume_parser.dto import CriteriaDTO
+
+    user_criteria = get_user_criteria(message.chat.id)
     criteria = CriteriaDTO(
-        position=user_responses[message.chat.id].get("position"),
-        location=user_responses[message.chat.id].get("location"),
-        salary_from=user_responses[message.chat.id].get("salary_from"),
-        salary_to=user_responses[message.chat.id].get("salary_to"),
-        experience=user_responses[message.chat.id].get("experience"),
-        skills_and_keywords=user_responses[message.chat.id].get("keywords"),
+        position=user_criteria.get("position"),
+        location=user_criteria.get("location"),
+        salary_from=user_criteria.get("salary_from"),
+        salary_to=user_criteria.get("salary_to"),
+        experience=user_criteria.get("experience"),
+        skills_and_keywords=user_criteria.get("keywords"),
     )
     return criteria
 
@@ -215,74 +487,131 @@ def repeat_all_messages(message):
         return
 
     if message.text.lower() == "посада":
-        bot.send_message(message.chat.id, "Введіть назву посади на яку Ви шукаєте кандидата")
+        message_sender.send(message.chat.id, "Введіть назву посади на яку Ви шукаєте кандидата")
         bot.register_next_step_handler(message, set_position)
     elif message.text.lower() == "локація":
-        bot.send_message(message.chat.id, "Введіть назву міста")
+        message_sender.send(message.chat.id, "Введіть назву міста")
         bot.register_next_step_handler(message, set_location)
     elif message.text.lower() == "зарплата від":
-        bot.send_message(
+        message_sender.send(
             message.chat.id,
             "Введіть мінімальне значення очікуваної зарплати кандидата в грн. "
             f"Доступні значення: {list(SALARY.keys())[1:]}",
         )
         bot.register_next_step_handler(message, set_salary_from)
     elif message.text.lower() == "зарплата до":
-        bot.send_message(
+        message_sender.send(
             message.chat.id,
             "Введіть максимальне значення очікуваної зарплати кандидата в грн. "
             f"Доступні значення: {list(SALARY.keys())[1:]}",
         )
         bot.register_next_step_handler(message, set_salary_to)
     elif message.text.lower() == "досвід":
-        bot.send_message(message.chat.id, "Введіть досвід кандидата у роках")
+        message_sender.send(message.chat.id, "Введіть досвід кандидата у роках")
         bot.register_next_step_handler(message, set_experience)
     elif message.text.lower() == "ключові слова":
-        bot.send_message(
+        message_sender.send(
             message.chat.id, "Введіть необхідні навички кандидата та ключові слова в резюме, перелік через кому"
         )
         bot.register_next_step_handler(message, set_keywords)
 
 
 def set_position(message):
-    user_responses[message.chat.id]["position"] = message.text
-    bot.send_message(message.chat.id, f"Посада кандидата: {message.text}")
+    update_user_criteria(message.chat.id, "position", message.text)
+    message_sender.send(message.chat.id, f"Посада кандидата: {message.text}")
 
 
 def set_location(message):
-    user_responses[message.chat.id]["location"] = message.text
-    bot.send_message(message.chat.id, f"Місто пошуку: {message.text}")
+    update_user_criteria(message.chat.id, "location", message.text)
+    message_sender.send(message.chat.id, f"Місто пошуку: {message.text}")
 
 
 def set_salary_from(message):
-    user_responses[message.chat.id]["salary_from"] = message.text
-    bot.send_message(message.chat.id, f"Зарплатні очікування (від): {message.text}")
+    update_user_criteria(message.chat.id, "salary_from", message.text)
+    message_sender.send(message.chat.id, f"Зарплатні очікування (від): {message.text}")
 
 
 def set_salary_to(message):
-    user_responses[message.chat.id]["salary_to"] = message.text
-    bot.send_message(message.chat.id, f"Зарплатні очікування (до): {message.text}")
+    update_user_criteria(message.chat.id, "salary_to", message.text)
+    message_sender.send(message.chat.id, f"Зарплатні очікування (до): {message.text}")
 
 
 def set_experience(message):
-    user_responses[message.chat.id]["experience"] = message.text
-    bot.send_message(message.chat.id, f"Досвід роботи кандидата: {message.text}")
+    update_user_criteria(message.chat.id, "experience", message.text)
+    message_sender.send(message.chat.id, f"Досвід роботи кандидата: {message.text}")
 
 
 def set_keywords(message):
-    user_responses[message.chat.id]["keywords"] = message.text.split(", ")
-    bot.send_message(message.chat.id, f"Навички кандидата та ключові слова в резюме: {message.text}")
+    update_user_criteria(message.chat.id, "keywords", message.text.split(", "))
+    message_sender.send(message.chat.id, f"Навички кандидата та ключові слова в резюме: {message.text}")
+
+
+def get_user_criteria(chat_id):
+    session = session_store.get(chat_id) or {}
+    return session.get("criteria", {})
+
+
+def update_user_criteria(chat_id, key, value):
+    session = session_store.get(chat_id) or {"criteria": {}}
+    session["criteria"][key] = value
+    session_store.save(chat_id, session)
+
+
+def save_search_results(chat_id, title, resume_results):
+    session = session_store.get(chat_id) or {"criteria": {}}
+    session["results"] = {
+        "title": title,
+        "resumes": {
+            resume_link: {key: value for key, value in resume.items() if key != "fingerprint"}
+            for resume_link, resume in resume_results.items()
+        },
+    }
+    session_store.save(chat_id, session)
 
 
 def is_user_started(message):
-    try:
-        user_responses[message.chat.id]
-    except KeyError:
-        bot.send_message(message.chat.id, "Спочатку виконайте команду /start")
+    if session_store.get(message.chat.id) is None:
+        message_sender.send(message.chat.id, "Спочатку виконайте команду /start")
         return False
-    else:
-        return True
+    return True
 
 
 def run_bot():
-    bot.infinity_polling()
+    logging.basicConfig(
+        level=os.environ.get("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    user_agent_provider.preload()
+    prewarm_scheduler = get_prewarm_scheduler() if search_usage is not None else None
+    if prewarm_scheduler:
+        prewarm_scheduler.start()
+    logger.info("Bot started in %.1f ms", (perf_counter() - STARTED_AT) * 1000)
+    try:
+        if BOT_MODE == "webhook":
+            run_webhook()
+        else:
+            bot.infinity_polling()
+    finally:
+        if prewarm_scheduler:
+            prewarm_scheduler.stop()
+        with active_searches_lock:
+            cancellation_tokens = [token for tokens in active_searches.values() for token in tokens]
+        for cancellation_token in cancellation_tokens:
+            cancellation_token.cancel()
+        search_executor.shutdown(cancel_futures=True)
+        if resume_exporter:
+            resume_exporter.close()
+
+
+def run_webhook():
+    server = WebhookServer(
+        bot,
+        host=WEBHOOK_HOST,
+        port=WEBHOOK_PORT,
+        path=WEBHOOK_PATH,
+        secret_token=WEBHOOK_SECRET,
+        workers=BOT_WORKERS,
+    )
+    if WEBHOOK_URL:
+        bot.remove_webhook()
+        bot.set_webhook(url=WEBHOOK_URL, secret_token=WEBHOOK_SECRET, max_connections=BOT_WORKERS)
+    server.serve_forever()
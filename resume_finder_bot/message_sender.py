@@ -0,0 +1,237 @@
+import re
+import threading
+from time import monotonic, sleep
+
+from telebot import TeleBot
+from telebot.apihelper import ApiTelegramException
+
+MESSAGE_MAX_LENGTH = 4096
+_MARKUP_PATTERN = re.compile(r"<(/?)[^>]*>|&#?\w+;")
+
+
+def pack_messages(parts: list[str], max_length: int = MESSAGE_MAX_LENGTH) -> list[str]:
+    """
+    Packs parts of a report into as few messages as the message length limit allows.
+
+    Parts are never split between messages unless a single part is longer than the limit. Such a part is split
+    by lines, and lines longer than the limit are cut outside HTML tags and entities, and outside elements
+    when possible, so every message stays valid HTML.
+
+    Args:
+        parts (list[str]): Parts of the report, e.g. the header and one part per candidate.
+        max_length (int, optional): The maximum length of a message. Defaults to 4096.
+
+    Returns:
+        list[str]: The messages to send.
+    """
+
+    messages = []
+    current_message = ""
+    for part in parts:
+        part = part.strip("\n")
+        if not part:
+            continue
+        pieces = [part] if len(part) <= max_length else _split_long_part(part, max_length)
+        for piece in pieces:
+            if not current_message:
+                current_message = piece
+            elif len(current_message) + 2 + len(piece) <= max_length:
+                current_message += "\n\n" + piece
+            else:
+                messages.append(current_message)
+                current_message = piece
+    if current_message:
+        messages.append(current_message)
+    return messages
+
+
+def _split_long_part(part: str, max_length: int) -> list[str]:
+    pieces = []
+    current_piece = ""
+    for line in part.split("\n"):
+        while len(line) > max_length:
+            if current_piece:
+                pieces.append(current_piece)
+                current_piece = ""
+            cut_position = _get_cut_position(line, max_length)
+            pieces.append(line[:cut_position])
+            line = line[cut_position:]
+        if not current_piece:
+            current_piece = line
+        elif len(current_piece) + 1 + len(line) <= max_length:
+            current_piece += "\n" + line
+        else:
+            pieces.append(current_piece)
+            current_piece = line
+    if current_piece:
+        pieces.append(current_piece)
+    return pieces
+
+
+def _get_cut_position(line: str, max_length: int) -> int:
+    """
+    Finds the last position within 'max_length' where an HTML line can be cut: outside tags and entities, and
+    outside elements, e.g. "<b>...</b>", if there is such a position.
+    """
+
+    position = 0
+    depth = 0
+    cut_position = 0
+    element_cut_position = 0
+    for match in _MARKUP_PATTERN.finditer(line):
+        if position >= max_length:
+            break
+        # Any position in the text before the tag or the entity can be cut.
+        text_end = min(match.start(), max_length)
+        if text_end > position:
+            cut_position = text_end
+            if depth == 0:
+                element_cut_position = text_end
+        if match[0].startswith("<"):
+            depth = max(0, depth - 1) if match[1] else depth + 1
+        position = match.end()
+        if position <= max_length:
+            cut_position = position
+            if depth == 0:
+                element_cut_position = position
+    else:
+        text_end = min(len(line), max_length)
+        if text_end > position:
+            cut_position = text_end
+            if depth == 0:
+                element_cut_position = text_end
+    return element_cut_position or cut_position or max_length
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that lets events through at most once per interval.
+
+    Every caller reserves the next free time slot and waits for it, so waiting callers are served in the order
+    they came, like a queue.
+
+    Attributes:
+        interval (float): The minimum time between two events in seconds.
+
+    Methods:
+        wait() -> None: Waits for the next free time slot.
+        pause(delay: float) -> None: Moves the next free time slot at least 'delay' seconds forward.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_idle(self) -> bool:
+        return self._next_slot < monotonic()
+
+    def wait(self) -> None:
+        """
+        Waits for the next free time slot.
+        """
+
+        with self._lock:
+            now = monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            sleep(slot - now)
+
+    def pause(self, delay: float) -> None:
+        """
+        Moves the next free time slot at least 'delay' seconds forward.
+
+        Args:
+            delay (float): The delay in seconds.
+        """
+
+        with self._lock:
+            self._next_slot = max(self._next_slot, monotonic() + delay)
+
+
+class MessageSender:
+    """
+    Rate-aware sender of bot messages.
+
+    Messages are sent within the Telegram limits for a single chat and for the whole bot. When Telegram still
+    answers with the 429 error, the sender waits for the time from the 'retry_after' parameter and retries.
+    The pause applies to every chat, as the error may come from the limit of the whole bot.
+
+    Attributes:
+        bot (TeleBot): The bot that sends messages.
+        chat_interval (float): The minimum time between two messages to the same chat in seconds.
+        global_interval (float): The minimum time between two messages of the bot in seconds.
+        max_retries (int): The maximum number of retries of a message after the 429 error.
+
+    Methods:
+        send(chat_id: int, text: str, **kwargs) -> Message: Sends a message.
+        send_report(chat_id: int, parts: list[str]) -> None: Packs a report into few messages and sends them.
+    """
+
+    _CLEANUP_INTERVAL = 1000
+
+    def __init__(self, bot: TeleBot, chat_interval: float = 1.0, global_interval: float = 1 / 30, max_retries: int = 3):
+        self.bot = bot
+        self.chat_interval = chat_interval
+        self.global_interval = global_interval
+        self.max_retries = max_retries
+        self._global_limiter = RateLimiter(global_interval)
+        self._chat_limiters = {}
+        self._chat_limiters_lock = threading.Lock()
+        self._sent_count = 0
+
+    def send(self, chat_id: int, text: str, **kwargs):
+        """
+        Sends a message within the rate limits and retries it after the 429 error.
+
+        Args:
+            chat_id (int): The id of the chat.
+            text (str): The text of the message.
+            **kwargs: Other arguments of TeleBot.send_message.
+
+        Returns:
+            Message: The sent message.
+
+        Raises:
+            ApiTelegramException: If Telegram returns another error or the retries are over.
+        """
+
+        chat_limiter = self._get_chat_limiter(chat_id)
+        for attempt in range(self.max_retries + 1):
+            chat_limiter.wait()
+            self._global_limiter.wait()
+            try:
+                return self.bot.send_message(chat_id, text, **kwargs)
+            except ApiTelegramException as error:
+                if error.error_code != 429 or attempt == self.max_retries:
+                    raise
+                retry_after = (error.result_json.get("parameters") or {}).get("retry_after", 1)
+                chat_limiter.pause(retry_after)
+                self._global_limiter.pause(retry_after)
+
+    def send_report(self, chat_id: int, parts: list[str]) -> None:
+        """
+        Packs a report into as few messages as the message length limit allows and sends them.
+
+        Args:
+            chat_id (int): The id of the chat.
+            parts (list[str]): Parts of the report, e.g. the header and one part per candidate.
+        """
+
+        for message in pack_messages(parts):
+            self.send(chat_id, message)
+
+    def _get_chat_limiter(self, chat_id: int) -> RateLimiter:
+        with self._chat_limiters_lock:
+            self._sent_count += 1
+            if self._sent_count % self._CLEANUP_INTERVAL == 0:
+                self._chat_limiters = {
+                    limiter_chat_id: limiter
+                    for limiter_chat_id, limiter in self._chat_limiters.items()
+                    if not limiter.is_idle
+                }
+            if chat_id not in self._chat_limiters:
+                self._chat_limiters[chat_id] = RateLimiter(self.chat_interval)
+            return self._chat_limiters[chat_id]
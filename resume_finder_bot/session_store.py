@@ -0,0 +1,154 @@
+import json
+import sqlite3
+import threading
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from time import time
+
+
+class SessionStoreInterface(metaclass=ABCMeta):
+    """
+    Abstract base class for storing bot sessions of chats.
+
+    A session is a JSON-compatible dictionary with the search criteria of a chat and its cached search results.
+
+    Methods:
+        get(chat_id: int) -> dict | None: Abstract method to get the session of a chat.
+        save(chat_id: int, session: dict) -> None: Abstract method to save the session of a chat.
+        delete(chat_id: int) -> None: Abstract method to delete the session of a chat.
+    """
+
+    @abstractmethod
+    def get(self, chat_id: int) -> dict | None:
+        """
+        Abstract method to get the session of a chat.
+
+        Args:
+            chat_id (int): The id of the chat.
+
+        Returns:
+            dict | None: The session, or None if the chat has no session or it has expired.
+        """
+        pass
+
+    @abstractmethod
+    def save(self, chat_id: int, session: dict) -> None:
+        """
+        Abstract method to save the session of a chat.
+
+        Args:
+            chat_id (int): The id of the chat.
+            session (dict): The session to save.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, chat_id: int) -> None:
+        """
+        Abstract method to delete the session of a chat.
+
+        Args:
+            chat_id (int): The id of the chat.
+        """
+        pass
+
+
+class InMemorySessionStore(SessionStoreInterface):
+    """
+    Session store in the memory of the bot process, bounded by the number of sessions and their lifetime.
+
+    When the store is full, the least recently used session is evicted.
+
+    Attributes:
+        max_size (int): The maximum number of stored sessions.
+        ttl (float): The lifetime of a session in seconds since its last use.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 7 * 24 * 60 * 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chat_id: int) -> dict | None:
+        with self._lock:
+            try:
+                session, updated_at = self._sessions[chat_id]
+            except KeyError:
+                return None
+            if time() - updated_at > self.ttl:
+                del self._sessions[chat_id]
+                return None
+            self._sessions[chat_id] = (session, time())
+            self._sessions.move_to_end(chat_id)
+            return session
+
+    def save(self, chat_id: int, session: dict) -> None:
+        with self._lock:
+            self._sessions[chat_id] = (session, time())
+            self._sessions.move_to_end(chat_id)
+            while len(self._sessions) > self.max_size:
+                self._sessions.popitem(last=False)
+
+    def delete(self, chat_id: int) -> None:
+        with self._lock:
+            self._sessions.pop(chat_id, None)
+
+
+class SQLiteSessionStore(SessionStoreInterface):
+    """
+    Session store in a SQLite database, which survives restarts and can be shared by several bot processes.
+
+    Sessions are stored as JSON, sets are saved as lists. Expired sessions are removed when they are read
+    and periodically when sessions are saved.
+
+    Attributes:
+        path (str): The path to the database file.
+        ttl (float): The lifetime of a session in seconds since its last use.
+    """
+
+    _CLEANUP_INTERVAL = 1000
+
+    def __init__(self, path: str = "sessions.sqlite3", ttl: float = 7 * 24 * 60 * 60):
+        self.path = path
+        self.ttl = ttl
+        self._saves_count = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (chat_id INTEGER PRIMARY KEY, data TEXT NOT NULL, updated_at REAL)"
+        )
+
+    def get(self, chat_id: int) -> dict | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data, updated_at FROM sessions WHERE chat_id = ?", (chat_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if time() - row[1] > self.ttl:
+                self._connection.execute("DELETE FROM sessions WHERE chat_id = ?", (chat_id,))
+                return None
+            self._connection.execute("UPDATE sessions SET updated_at = ? WHERE chat_id = ?", (time(), chat_id))
+            return json.loads(row[0])
+
+    def save(self, chat_id: int, session: dict) -> None:
+        data = json.dumps(session, ensure_ascii=False, default=self._to_json)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sessions (chat_id, data, updated_at) VALUES (?, ?, ?)", (chat_id, data, time())
+            )
+            self._saves_count += 1
+            if self._saves_count % self._CLEANUP_INTERVAL == 0:
+                self._connection.execute("DELETE FROM sessions WHERE updated_at < ?", (time() - self.ttl,))
+
+    def delete(self, chat_id: int) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM sessions WHERE chat_id = ?", (chat_id,))
+
+    @staticmethod
+    def _to_json(value):
+        if isinstance(value, (set, frozenset)):
+            return sorted(value)
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,210 @@
+import hmac
+import json
+import logging
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+
+from telebot import TeleBot, types
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookStats:
+    """
+    Thread-safe statistics of processed updates.
+
+    Attributes:
+        received_count (int): The number of received updates.
+        processed_count (int): The number of processed updates.
+        rejected_count (int): The number of updates rejected because the queue was full.
+        latencies (list[float]): Times from receiving to the end of processing of the updates in seconds.
+
+    Methods:
+        summary() -> dict: Returns the number of updates and latency percentiles.
+    """
+
+    def __init__(self):
+        self.received_count = 0
+        self.processed_count = 0
+        self.rejected_count = 0
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def add_received(self) -> None:
+        with self._lock:
+            self.received_count += 1
+
+    def add_rejected(self) -> None:
+        with self._lock:
+            self.rejected_count += 1
+
+    def add_processed(self, latency: float) -> None:
+        with self._lock:
+            self.processed_count += 1
+            self.latencies.append(latency)
+
+    def summary(self) -> dict:
+        """
+        Returns the number of updates and latency percentiles.
+
+        Returns:
+            dict: The numbers of received, processed and rejected updates and the p50, p95 and maximum latency
+            in milliseconds.
+        """
+
+        with self._lock:
+            latencies = sorted(self.latencies)
+            summary = {
+                "received": self.received_count,
+                "processed": self.processed_count,
+                "rejected": self.rejected_count,
+            }
+        if latencies:
+            summary["latency_p50_ms"] = round(latencies[len(latencies) // 2] * 1000, 2)
+            summary["latency_p95_ms"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 2)
+            summary["latency_max_ms"] = round(latencies[-1] * 1000, 2)
+        return summary
+
+
+class WebhookServer:
+    """
+    Local HTTP server that receives Telegram updates and passes them to the bot handlers.
+
+    Received updates are put into a bounded queue and processed by a pool of worker threads, so the server
+    answers Telegram at once and a slow search does not block other updates. The server is meant to run behind
+    a reverse proxy that terminates TLS.
+
+    Attributes:
+        bot (TeleBot): The bot whose handlers process the updates.
+        host (str): The host to listen on.
+        port (int): The port to listen on.
+        path (str): The URL path of the webhook.
+        secret_token (str | None): The secret token expected in the X-Telegram-Bot-Api-Secret-Token header.
+        workers (int): The number of update-processing workers.
+        stats (WebhookStats): Statistics of processed updates.
+
+    Methods:
+        start() -> None: Starts the HTTP server and the workers in background threads.
+        serve_forever() -> None: Starts the server and blocks until it is stopped.
+        stop() -> None: Stops the HTTP server and the workers.
+    """
+
+    def __init__(
+        self,
+        bot: TeleBot,
+        host: str = "0.0.0.0",
+        port: int = 8443,
+        path: str = "/webhook",
+        secret_token: str = None,
+        workers: int = 4,
+        queue_size: int = 1000,
+    ):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.path = path
+        self.secret_token = secret_token
+        self.workers = workers
+        self.stats = WebhookStats()
+        self._updates = queue.Queue(maxsize=queue_size)
+        self._worker_threads = []
+        self._http_server = ThreadingHTTPServer((host, port), self._create_request_handler())
+        self._http_server.daemon_threads = True
+        self._server_thread = None
+
+    @property
+    def server_address(self) -> tuple[str, int]:
+        return self._http_server.server_address[:2]
+
+    def start(self) -> None:
+        """
+        Starts the HTTP server and the workers in background threads.
+
+        The handlers of the bot are called directly in the workers, so the own thread pool of the bot is disabled.
+        """
+
+        self.bot.threaded = False
+        for _ in range(self.workers):
+            worker_thread = threading.Thread(target=self._process_updates, daemon=True)
+            worker_thread.start()
+            self._worker_threads.append(worker_thread)
+        self._server_thread = threading.Thread(target=self._http_server.serve_forever, daemon=True)
+        self._server_thread.start()
+
+    def serve_forever(self) -> None:
+        """
+        Starts the server and blocks until it is stopped.
+        """
+
+        self.start()
+        self._server_thread.join()
+
+    def stop(self) -> None:
+        """
+        Stops the HTTP server and waits until the workers process the queued updates.
+        """
+
+        self._http_server.shutdown()
+        self._http_server.server_close()
+        for _ in self._worker_threads:
+            self._updates.put(None)
+        for worker_thread in self._worker_threads:
+            worker_thread.join()
+        self._worker_threads = []
+
+    def _process_updates(self) -> None:
+        while True:
+            item = self._updates.get()
+            if item is None:
+                return
+            update, received_at = item
+            try:
+                self.bot.process_new_updates([update])
+            except Exception:
+                logger.exception("Failed to process update %s", update.update_id)
+            self.stats.add_processed(perf_counter() - received_at)
+
+    def _create_request_handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class WebhookRequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                received_at = perf_counter()
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path != server.path:
+                    self._respond(404)
+                    return
+                if server.secret_token and not hmac.compare_digest(
+                    self.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), server.secret_token
+                ):
+                    self._respond(403)
+                    return
+
+                try:
+                    update = types.Update.de_json(json.loads(body))
+                except (ValueError, KeyError, TypeError):
+                    self._respond(400)
+                    return
+
+                server.stats.add_received()
+                try:
+                    server._updates.put_nowait((update, received_at))
+                except queue.Full:
+                    server.stats.add_rejected()
+                    self._respond(503)
+                    return
+                self._respond(200)
+
+            def _respond(self, status_code: int) -> None:
+                self.send_response(status_code)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return WebhookRequestHandler
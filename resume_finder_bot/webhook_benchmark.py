@@ -0,0 +1,142 @@
+"""
+Local stand-in for Telegram that posts fake updates to the webhook server and measures latency and throughput.
+
+The bot handlers run as in production, but their calls to the Telegram API are answered locally, so only
+the webhook server, the workers and the handlers are measured. Searches are not started by the fake updates.
+
+Usage:
+    python -m resume_finder_bot.webhook_benchmark --updates 1000 --concurrency 20 --workers 4
+"""
+
+import argparse
+import http.client
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from time import perf_counter, sleep, time
+
+from telebot import apihelper
+
+COMMANDS = ["/start", "/help", "/check", "/clear"]
+
+
+class FakeTelegramResponse:
+    """
+    Response of the fake Telegram API in the form expected by telebot.
+    """
+
+    status_code = 200
+
+    def __init__(self, result: dict):
+        self.text = json.dumps({"ok": True, "result": result})
+
+    def json(self) -> dict:
+        return json.loads(self.text)
+
+
+def fake_telegram_api(method, url, params=None, **kwargs):
+    """
+    Answers the requests of the bot to the Telegram API without sending them.
+    """
+
+    params = params or {}
+    if url.endswith("sendMessage"):
+        return FakeTelegramResponse(
+            {
+                "message_id": 1,
+                "date": int(time()),
+                "chat": {"id": int(params.get("chat_id", 0)), "type": "private"},
+                "text": params.get("text", ""),
+            }
+        )
+    return FakeTelegramResponse(True)
+
+
+def create_fake_update(update_id: int, chat_id: int, text: str) -> bytes:
+    """
+    Creates the body of a fake Telegram update with a text message.
+    """
+
+    message = {
+        "message_id": update_id,
+        "date": int(time()),
+        "chat": {"id": chat_id, "type": "private"},
+        "from": {"id": chat_id, "is_bot": False, "first_name": "Benchmark"},
+        "text": text,
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text)}]
+    return json.dumps({"update_id": update_id, "message": message}).encode()
+
+
+def run_benchmark(updates: int, concurrency: int, workers: int, chats: int, rate_limits: bool) -> dict:
+    """
+    Starts the webhook server with the bot handlers on a local port and posts fake updates to it.
+
+    Args:
+        updates (int): The number of updates to post.
+        concurrency (int): The number of concurrent senders of updates.
+        workers (int): The number of update-processing workers of the server.
+        chats (int): The number of different chats the updates come from.
+        rate_limits (bool): Whether to keep the Telegram rate limits of the message sender.
+
+    Returns:
+        dict: Statistics of the server with the throughput in updates per second.
+    """
+
+    apihelper.CUSTOM_REQUEST_SENDER = fake_telegram_api
+    os.environ.setdefault("TOKEN", "0:benchmark")
+
+    from resume_finder_bot import bot as bot_module
+    from resume_finder_bot.message_sender import MessageSender
+    from resume_finder_bot.webhook import WebhookServer
+
+    if not rate_limits:
+        bot_module.message_sender = MessageSender(bot_module.bot, chat_interval=0, global_interval=0)
+
+    server = WebhookServer(bot_module.bot, host="127.0.0.1", port=0, workers=workers, queue_size=updates)
+    server.start()
+    host, port = server.server_address
+    update_ids = count(1)
+
+    def post_updates(updates_count: int) -> None:
+        connection = http.client.HTTPConnection(host, port)
+        for _ in range(updates_count):
+            update_id = next(update_ids)
+            body = create_fake_update(update_id, update_id % chats + 1, COMMANDS[update_id % len(COMMANDS)])
+            connection.request("POST", server.path, body, {"Content-Type": "application/json"})
+            connection.getresponse().read()
+        connection.close()
+
+    started_at = perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        sender_updates = [updates // concurrency + (index < updates % concurrency) for index in range(concurrency)]
+        list(executor.map(post_updates, sender_updates))
+    while server.stats.processed_count + server.stats.rejected_count < updates:
+        sleep(0.01)
+    elapsed = perf_counter() - started_at
+    server.stop()
+
+    summary = server.stats.summary()
+    summary["elapsed_s"] = round(elapsed, 3)
+    summary["throughput_per_s"] = round(summary["processed"] / elapsed, 1)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure latency and throughput of the webhook mode of the bot.")
+    parser.add_argument("--updates", type=int, default=1000, help="number of fake updates to post")
+    parser.add_argument("--concurrency", type=int, default=20, help="number of concurrent senders")
+    parser.add_argument("--workers", type=int, default=4, help="number of update-processing workers")
+    parser.add_argument("--chats", type=int, default=500, help="number of different chats")
+    parser.add_argument("--rate-limits", action="store_true", help="keep the Telegram rate limits of the bot")
+    args = parser.parse_args()
+
+    summary = run_benchmark(args.updates, args.concurrency, args.workers, args.chats, args.rate_limits)
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""
+Headless batch search: runs many searches from a JSONL file of criteria through a process pool, without Telegram.
+
+Every line of the input file is a CriteriaDTO record, optionally with the "platform" field ("work_ua",
+"robota_ua" or "all"). Ranked results are written to a JSONL or CSV file as soon as each search finishes.
+
+Usage:
+    python -m resume_parser.batch criteria.jsonl --output results.jsonl --workers 4
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from .budget import SearchBudget
+from .exporters import EXPORTERS, create_exporter, to_match_list
+from .interfaces import ResumeParserInterface
+from .platforms import PLATFORMS
+
+RESULT_FIELDS = [
+    "search_index",
+    "platform",
+    "search_position",
+    "rank",
+    "link",
+    "position",
+    "points",
+    "matching_keywords",
+    "matching_skills",
+    "experience",
+    "education",
+    "is_file",
+    "experience_years",
+    "salary",
+    "currency",
+    "city",
+    "updated_at",
+    "budget_exhausted",
+]
+
+
+def read_criteria(path: str, default_platform: str) -> list[tuple[int, str, dict]]:
+    """
+    Reads search criteria from a JSONL file.
+
+    Args:
+        path (str): The path to the JSONL file.
+        default_platform (str): The platform for records without the "platform" field.
+
+    Returns:
+        list[tuple[int, str, dict]]: Searches as tuples of the record index, the platform and the criteria.
+        Records with the "all" platform are split into one search per platform.
+    """
+
+    searches = []
+    with open(path, encoding="utf-8") as criteria_file:
+        for index, line in enumerate(criteria_file):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            platform = record.pop("platform", default_platform)
+            platforms = list(PLATFORMS) if platform == "all" else [platform]
+            searches.extend((index, search_platform, record) for search_platform in platforms)
+    return searches
+
+
+@dataclass
+class SearchOptions:
+    """
+    Options shared by every search of a batch, passed to the worker processes.
+
+    Attributes:
+        budget_limits (dict): The arguments of SearchBudget.
+        parser_options (dict): The arguments of the parser.
+        max_results (int): The maximum number of ranked results of a search.
+        corpus_path (str | None): The path to the resume corpus. Parsed resumes are added to it.
+        from_corpus (bool): Whether to search in the corpus instead of live searches.
+        export_path (str | None): Every parsed resume of a live search is exported to a file named after this path,
+            the index of the search and the platform.
+        export_chunk_size (int | None): The maximum number of rows in an export file.
+        queue_path (str | None): The path to the work queue of distributed searches. Live searches are put on
+            the queue and processed by the workers of the queue. None runs them in the worker processes.
+        planned_queries (int): The number of narrower queries with the keywords sent to the website instead of
+            the position alone, 0 for one query.
+        cassette_dir (str | None): The directory of the cassettes of the searches, one per search named after its
+            index and platform. None runs live searches.
+        cassette_mode (str): "record" or "replay".
+        replay_speed (float): How many times faster than recorded the responses are replayed, 0 without delays.
+    """
+
+    budget_limits: dict = field(default_factory=dict)
+    parser_options: dict = field(default_factory=dict)
+    max_results: int = 20
+    corpus_path: str | None = None
+    from_corpus: bool = False
+    export_path: str | None = None
+    export_chunk_size: int | None = None
+    queue_path: str | None = None
+    planned_queries: int = 0
+    cassette_dir: str | None = None
+    cassette_mode: str = "replay"
+    replay_speed: float = 0.0
+
+
+def run_search(index: int, platform: str, criteria_data: dict, options: SearchOptions) -> dict:
+    """
+    Runs one search in a worker process.
+
+    Args:
+        index (int): The index of the criteria record in the input file.
+        platform (str): The name of the platform.
+        criteria_data (dict): The fields of CriteriaDTO.
+        options (SearchOptions): The options of the search.
+
+    Returns:
+        dict: The summary of the search with its ranked results, or with the error if the search failed.
+    """
+
+    from .cassettes import Cassette
+    from .corpus import ResumeCorpus
+    from .distributed import CrawlCoordinator
+    from .dto import CriteriaDTO
+    from .planning import SearchPlanner
+    from .search import search_corpus, search_resumes
+    from .work_queue import SQLiteWorkQueue
+
+    started_at = perf_counter()
+    summary = {"search_index": index, "platform": platform, "search_position": criteria_data.get("position")}
+    budget = SearchBudget(**options.budget_limits)
+    exporter = None
+    queue = None
+    cassette = None
+    try:
+        corpus = ResumeCorpus(options.corpus_path) if options.corpus_path else None
+        if options.from_corpus:
+            resume_results = search_corpus(CriteriaDTO(**criteria_data), corpus, [platform])
+        else:
+            if options.export_path:
+                stem, extension = os.path.splitext(options.export_path)
+                exporter = create_exporter(f"{stem}-{index}-{platform}{extension}", options.export_chunk_size)
+            parser_options = {**options.parser_options, "sinks": [sink for sink in (corpus, exporter) if sink]}
+            if options.queue_path:
+                queue = SQLiteWorkQueue(options.queue_path)
+                coordinator = CrawlCoordinator(queue)
+                resume_results = (
+                    coordinator.search(CriteriaDTO(**criteria_data), platform, budget, parser_options) or {}
+                )
+            else:
+                planner = SearchPlanner(max_queries=options.planned_queries) if options.planned_queries else None
+                if options.cassette_dir:
+                    cassette_path = os.path.join(options.cassette_dir, f"{index}-{platform}.jsonl.gz")
+                    cassette = Cassette(cassette_path, options.cassette_mode, options.replay_speed)
+                resume_results = (
+                    search_resumes(
+                        CriteriaDTO(**criteria_data),
+                        platform,
+                        budget,
+                        parser_options,
+                        planner=planner,
+                        cassette=cassette,
+                    )
+                    or {}
+                )
+    except Exception as error:
+        summary.update(error=repr(error), results={}, parsed_count=0)
+    else:
+        summary.update(
+            results=ResumeParserInterface.rank_resumes(resume_results, options.max_results),
+            parsed_count=len(resume_results),
+        )
+    finally:
+        if exporter:
+            exporter.close()
+        if queue:
+            queue.close()
+        if cassette:
+            cassette.close()
+    summary.update(budget_exhausted=budget.is_exhausted, duration=perf_counter() - started_at)
+    return summary
+
+
+class ResultWriter:
+    """
+    Streams ranked results of searches to a JSONL or CSV file.
+
+    Attributes:
+        path (str): The path to the output file.
+        output_format (str): "jsonl" or "csv".
+
+    Methods:
+        write(summary: dict) -> None: Writes the ranked results of a finished search.
+        close() -> None: Closes the output file.
+    """
+
+    def __init__(self, path: str, output_format: str):
+        self.path = path
+        self.output_format = output_format
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._csv_writer = None
+        if output_format == "csv":
+            self._csv_writer = csv.DictWriter(self._file, fieldnames=RESULT_FIELDS)
+            self._csv_writer.writeheader()
+
+    def write(self, summary: dict) -> None:
+        """
+        Writes the ranked results of a finished search and flushes them to the file.
+
+        Args:
+            summary (dict): The summary of the search returned by run_search.
+        """
+
+        for rank, (link, resume) in enumerate(summary["results"].items(), start=1):
+            row = {
+                "search_index": summary["search_index"],
+                "platform": summary["platform"],
+                "search_position": summary["search_position"],
+                "rank": rank,
+                "link": link,
+                "position": resume.get("position"),
+                "points": resume.get("points"),
+                "matching_keywords": to_match_list(resume.get("matching_keywords")),
+                "matching_skills": to_match_list(resume.get("matching_skills")),
+                "experience": resume.get("experience"),
+                "education": resume.get("education"),
+                "is_file": resume.get("is_file", False),
+                "experience_years": resume.get("experience_years"),
+                "salary": resume.get("salary"),
+                "currency": resume.get("currency"),
+                "city": resume.get("city"),
+                "updated_at": resume.get("updated_at"),
+                "budget_exhausted": summary["budget_exhausted"],
+            }
+            if self._csv_writer:
+                row["matching_keywords"] = "; ".join(row["matching_keywords"])
+                row["matching_skills"] = "; ".join(row["matching_skills"])
+                self._csv_writer.writerow(row)
+            else:
+                self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def run_batch(
+    searches: list[tuple[int, str, dict]], writer: ResultWriter, workers: int, options: SearchOptions
+) -> dict:
+    """
+    Runs searches in a process pool and streams their results to the writer as each search finishes.
+
+    Args:
+        searches (list[tuple[int, str, dict]]): Searches returned by read_criteria.
+        writer (ResultWriter): The writer of the results.
+        workers (int): The number of worker processes.
+        options (SearchOptions): The options of every search.
+
+    Returns:
+        dict: The throughput summary of the batch.
+    """
+
+    started_at = perf_counter()
+    totals = {"searches": len(searches), "succeeded": 0, "failed": 0, "budget_exhausted": 0, "parsed_resumes": 0}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_search, index, platform, criteria_data, options)
+            for index, platform, criteria_data in searches
+        ]
+        for future in as_completed(futures):
+            summary = future.result()
+            writer.write(summary)
+            if "error" in summary:
+                totals["failed"] += 1
+                print(f"Search {summary['search_index']} on {summary['platform']} failed: {summary['error']}")
+                continue
+            totals["succeeded"] += 1
+            totals["budget_exhausted"] += summary["budget_exhausted"]
+            totals["parsed_resumes"] += summary["parsed_count"]
+            print(
+                f"Search {summary['search_index']} on {summary['platform']} finished in {summary['duration']:.1f} s, "
+                f"{summary['parsed_count']} resumes parsed"
+            )
+
+    elapsed = perf_counter() - started_at
+    totals["elapsed_s"] = round(elapsed, 1)
+    totals["searches_per_min"] = round(totals["searches"] / elapsed * 60, 2)
+    totals["resumes_per_s"] = round(totals["parsed_resumes"] / elapsed, 2)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run resume searches from a JSONL file of criteria.")
+    parser.add_argument("criteria", help="JSONL file with one CriteriaDTO record per line")
+    parser.add_argument("--output", required=True, help="output file for the ranked results")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="output format, by default from the extension")
+    parser.add_argument("--platform", choices=[*PLATFORMS, "all"], default="all", help="default platform")
+    parser.add_argument("--workers", type=int, default=2, help="number of parallel searches")
+    parser.add_argument(
+        "--fetch-workers", type=int, help="concurrent downloads per search, by default the platform's own number"
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        help="parser processes per search, 0 parses in the search process, by default the platform's own number",
+    )
+    parser.add_argument(
+        "--early-stop-slack",
+        type=int,
+        help="stop fetching when the ranked results cannot be beaten, assuming a resume has at most this many "
+        "more keywords than its result card shows",
+    )
+    parser.add_argument(
+        "--shortlist", type=int, help="download only this many resumes, the ones whose result cards score best"
+    )
+    parser.add_argument("--corpus", help="SQLite file of the resume corpus, parsed resumes are added to it")
+    parser.add_argument(
+        "--from-corpus", action="store_true", help="search in the corpus instead of live searches, needs --corpus"
+    )
+    parser.add_argument(
+        "--export",
+        help="export every parsed resume to files named after this path, the search and the platform, "
+        "as .jsonl, .csv or .parquet (needs pyarrow)",
+    )
+    parser.add_argument("--export-chunk-size", type=int, help="maximum number of rows in an export file")
+    parser.add_argument(
+        "--queue",
+        help="SQLite file of the work queue, live searches are split into units processed by "
+        "'python -m resume_parser.distributed' workers",
+    )
+    parser.add_argument(
+        "--planned-queries",
+        type=int,
+        default=0,
+        help="send this many queries of the position with one of the keywords instead of the position alone, "
+        "and merge their links",
+    )
+    parser.add_argument("--record", metavar="DIR", help="record the found links and the responses of every search")
+    parser.add_argument("--replay", metavar="DIR", help="replay the searches recorded with --record, offline")
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=0.0,
+        help="replay responses this many times faster than recorded, 0 without delays",
+    )
+    parser.add_argument("--max-results", type=int, default=20, help="ranked results kept per search")
+    parser.add_argument("--max-resumes", type=int, help="maximum number of resumes per search")
+    parser.add_argument("--max-pages", type=int, help="maximum number of listing pages per search")
+    parser.add_argument("--deadline", type=float, help="maximum duration of a search in seconds")
+    args = parser.parse_args()
+    if args.from_corpus and not args.corpus:
+        parser.error("--from-corpus needs --corpus")
+    if args.export and os.path.splitext(args.export)[1].lower() not in EXPORTERS:
+        parser.error("--export must end with .jsonl, .csv or .parquet")
+    if args.queue and args.planned_queries:
+        parser.error("--planned-queries cannot be used with --queue")
+    if args.record and args.replay:
+        parser.error("--record and --replay cannot be used together")
+    if (args.record or args.replay) and (args.queue or args.from_corpus):
+        parser.error("--record and --replay need live searches without --queue")
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+
+    output_format = args.format or ("csv" if args.output.endswith(".csv") else "jsonl")
+    options = SearchOptions(
+        budget_limits={"max_resumes": args.max_resumes, "max_pages": args.max_pages, "deadline": args.deadline},
+        # Options that are not set are left out, so the parsers use their own defaults.
+        parser_options={
+            key: value
+            for key, value in {
+                "fetch_workers": args.fetch_workers,
+                "parse_workers": args.parse_workers,
+                "max_results": args.max_results,
+                "early_stop_slack": args.early_stop_slack,
+                "shortlist_size": args.shortlist,
+            }.items()
+            if value is not None
+        },
+        max_results=args.max_results,
+        corpus_path=args.corpus,
+        from_corpus=args.from_corpus,
+        export_path=args.export,
+        export_chunk_size=args.export_chunk_size,
+        queue_path=args.queue,
+        planned_queries=args.planned_queries,
+        cassette_dir=args.record or args.replay,
+        cassette_mode="record" if args.record else "replay",
+        replay_speed=args.replay_speed,
+    )
+    searches = read_criteria(args.criteria, args.platform)
+
+    writer = ResultWriter(args.output, output_format)
+    try:
+        totals = run_batch(searches, writer, args.workers, options)
+    finally:
+        writer.close()
+
+    for key, value in totals.items():
+        print(f"{key}: {value}")
+    return 0 if not totals["failed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
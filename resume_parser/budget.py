@@ -0,0 +1,109 @@
+from math import ceil
+from time import monotonic
+
+
+class SearchBudget:
+    """
+    Limits of a single resume search: the number of resumes, the number of listing pages and wall-clock time.
+
+    One instance is shared by the searcher and the parser of a search. They check it cooperatively between
+    listing pages and resumes and stop early when any limit is reached, so the ranking is built from the
+    resumes processed so far.
+
+    Attributes:
+        max_resumes (int | None): The maximum number of resumes to collect and parse. None means no limit.
+        max_pages (int | None): The maximum number of listing pages to go through. None means no limit.
+        deadline (float | None): The maximum duration of the search in seconds. None means no limit.
+        is_exhausted (bool): True if the search was stopped because one of the limits was reached.
+
+    Methods:
+        start() -> None: Starts the wall-clock timer if it is not started yet.
+        is_time_over() -> bool: Checks if the deadline has passed.
+        can_load_page(loaded_pages: int) -> bool: Checks if one more listing page may be loaded.
+        can_load_resume(loaded_resumes: int) -> bool: Checks if one more resume may be collected or parsed.
+        split(parts: int) -> list[SearchBudget]: Splits the budget between parts of the search run at once.
+    """
+
+    def __init__(self, max_resumes: int = None, max_pages: int = None, deadline: float = None):
+        self.max_resumes = max_resumes
+        self.max_pages = max_pages
+        self.deadline = deadline
+        self.is_exhausted = False
+        self._started_at = None
+
+    def start(self) -> None:
+        """
+        Starts the wall-clock timer if it is not started yet.
+        """
+
+        if self._started_at is None:
+            self._started_at = monotonic()
+
+    def is_time_over(self) -> bool:
+        """
+        Checks if the deadline has passed.
+
+        Returns:
+            bool: True if the deadline is set and has passed, False otherwise.
+        """
+
+        if self.deadline is None or self._started_at is None:
+            return False
+        return monotonic() - self._started_at >= self.deadline
+
+    def can_load_page(self, loaded_pages: int) -> bool:
+        """
+        Checks if one more listing page may be loaded and marks the budget as exhausted if not.
+
+        Args:
+            loaded_pages (int): The number of listing pages already loaded.
+
+        Returns:
+            bool: True if the next page may be loaded, False otherwise.
+        """
+
+        if self.is_time_over() or (self.max_pages is not None and loaded_pages >= self.max_pages):
+            self.is_exhausted = True
+            return False
+        return True
+
+    def can_load_resume(self, loaded_resumes: int) -> bool:
+        """
+        Checks if one more resume may be collected or parsed and marks the budget as exhausted if not.
+
+        Args:
+            loaded_resumes (int): The number of resumes already collected or parsed.
+
+        Returns:
+            bool: True if the next resume may be loaded, False otherwise.
+        """
+
+        if self.is_time_over() or (self.max_resumes is not None and loaded_resumes >= self.max_resumes):
+            self.is_exhausted = True
+            return False
+        return True
+
+    def split(self, parts: int) -> list["SearchBudget"]:
+        """
+        Splits the budget between parts of the search, e.g. its planned queries. The limits of resumes and pages
+        are divided between the parts, and their deadline counts from the start of this budget, so parts that
+        start later do not get more time. The budget is started if it is not started yet.
+
+        Args:
+            parts (int): The number of the parts.
+
+        Returns:
+            list[SearchBudget]: The budgets of the parts. The budget is not marked as exhausted by them.
+        """
+
+        self.start()
+        budgets = []
+        for _ in range(parts):
+            budget = SearchBudget(
+                ceil(self.max_resumes / parts) if self.max_resumes is not None else None,
+                ceil(self.max_pages / parts) if self.max_pages is not None else None,
+                self.deadline,
+            )
+            budget._started_at = self._started_at
+            budgets.append(budget)
+        return budgets
@@ -0,0 +1,131 @@
+import json
+import sqlite3
+import threading
+from time import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .budget import SearchBudget
+    from .dto import CriteriaDTO
+
+
+class LinkCache:
+    """
+    Cache of the links and the result cards found by the searchers, in a SQLite database.
+
+    A search on the website is identified by the criteria that the searcher uses: the position, the location,
+    the salary and the experience. The keywords only score the resumes, so searches with different keywords share
+    the cached links. A cached search serves a new one while it is younger than 'ttl', without starting a browser.
+
+    Searches stopped by their budget found only a part of the links. They serve new searches only if they found
+    as many links as the new budget allows.
+
+    Attributes:
+        path (str): The path to the database file.
+        ttl (float): The age in seconds after which cached links are not used.
+
+    Methods:
+        get(platform: str, criteria: CriteriaDTO, budget: SearchBudget = None) -> tuple[list[str], dict] | None:
+            Gets the cached links of a search.
+        put(platform: str, criteria: CriteriaDTO, resume_links: list[str], resume_cards: dict = None,
+            is_complete: bool = True) -> None: Caches the links found by a search.
+        close() -> None: Closes the database.
+    """
+
+    def __init__(self, path: str = "search_cache.sqlite3", ttl: float = 6 * 60 * 60):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_links (
+                key TEXT PRIMARY KEY,
+                platform TEXT NOT NULL,
+                links TEXT NOT NULL,
+                cards TEXT NOT NULL,
+                is_complete INTEGER NOT NULL,
+                stored_at REAL NOT NULL
+            )
+            """
+        )
+
+    def get(
+        self, platform: str, criteria: "CriteriaDTO", budget: "SearchBudget" = None
+    ) -> tuple[list[str], dict] | None:
+        """
+        Gets the cached links of a search.
+
+        Args:
+            platform (str): The name of the platform.
+            criteria (CriteriaDTO): The criteria of the search.
+            budget (SearchBudget, optional): Limits of the search. The links are cut to its maximum number of
+                resumes, then the budget is marked as exhausted. Defaults to None.
+
+        Returns:
+            tuple[list[str], dict] | None: The found links and their result cards, or None if the search is not
+            cached, is older than 'ttl' or found fewer links than the budget allows.
+        """
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT links, cards, is_complete FROM search_links WHERE key = ? AND stored_at >= ?",
+                (self._get_key(platform, criteria), time() - self.ttl),
+            ).fetchone()
+        if row is None:
+            return None
+
+        resume_links, resume_cards = json.loads(row[0]), json.loads(row[1])
+        max_resumes = budget.max_resumes if budget else None
+        if max_resumes is not None and len(resume_links) >= max_resumes:
+            if len(resume_links) > max_resumes:
+                resume_links = resume_links[:max_resumes]
+                resume_cards = {link: resume_cards[link] for link in resume_links if link in resume_cards}
+            budget.is_exhausted = True
+        elif not row[2]:
+            return None
+        return resume_links, resume_cards
+
+    def put(
+        self,
+        platform: str,
+        criteria: "CriteriaDTO",
+        resume_links: list[str],
+        resume_cards: dict = None,
+        is_complete: bool = True,
+    ) -> None:
+        """
+        Caches the links found by a search, replacing the earlier ones.
+
+        Args:
+            platform (str): The name of the platform.
+            criteria (CriteriaDTO): The criteria of the search.
+            resume_links (list[str]): The found links.
+            resume_cards (dict, optional): The result cards of the resumes by their links. Defaults to None.
+            is_complete (bool, optional): False if the search was stopped by its budget. Defaults to True.
+        """
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO search_links (key, platform, links, cards, is_complete, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    self._get_key(platform, criteria),
+                    platform,
+                    json.dumps(resume_links, ensure_ascii=False),
+                    json.dumps(resume_cards or {}, ensure_ascii=False),
+                    int(is_complete),
+                    time(),
+                ),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _get_key(platform: str, criteria: "CriteriaDTO") -> str:
+        from .dto import search_key
+
+        return json.dumps(search_key(criteria, platform), ensure_ascii=False)
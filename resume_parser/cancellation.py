@@ -0,0 +1,91 @@
+import logging
+import threading
+from typing import Callable
+
+from .exceptions import SearchCancelledError
+
+logger = logging.getLogger(__name__)
+
+
+class CancellationToken:
+    """
+    Cancellation of a single search, shared by its searcher and parser.
+
+    The searcher checks the token in its waits and the parser before each download, and they raise
+    SearchCancelledError when the search is cancelled. Blocking calls, e.g. WebDriver commands, are interrupted
+    by callbacks that release their resources, e.g. quit the browser, as soon as the search is cancelled.
+
+    Attributes:
+        is_cancelled (bool): True if the search is cancelled.
+
+    Methods:
+        cancel() -> None: Cancels the search and runs the callbacks.
+        add_callback(callback: Callable[[], None]) -> None: Adds a callback run when the search is cancelled.
+        raise_if_cancelled() -> None: Raises SearchCancelledError if the search is cancelled.
+        sleep(seconds: float) -> None: Waits unless the search is cancelled.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """
+        Cancels the search and runs the callbacks. Cancelling a cancelled search does nothing.
+        """
+
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Failed to release the resources of a cancelled search")
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Adds a callback run when the search is cancelled, or runs it at once if the search is already cancelled.
+
+        Args:
+            callback (Callable[[], None]): The callback, it is run in the thread that cancels the search.
+        """
+
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raises SearchCancelledError if the search is cancelled.
+
+        Raises:
+            SearchCancelledError: If the search is cancelled.
+        """
+
+        if self._event.is_set():
+            raise SearchCancelledError()
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Waits unless the search is cancelled.
+
+        Args:
+            seconds (float): The duration of the wait in seconds.
+
+        Raises:
+            SearchCancelledError: If the search is cancelled before or during the wait.
+        """
+
+        if self._event.wait(seconds):
+            raise SearchCancelledError()
@@ -0,0 +1,266 @@
+import gzip
+import json
+import logging
+import threading
+from base64 import b64decode, b64encode
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING
+
+from .exceptions import CassetteMissError, DocumentGoneError
+from .http_client import HttpClientInterface
+
+if TYPE_CHECKING:
+    from .dto import CriteriaDTO
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_MODES = ("record", "replay")
+
+
+class Cassette:
+    """
+    Recording of the searches and HTTP responses of a run, replayed offline to compare runs on the same data.
+
+    In the record mode, every search writes the links and the result cards it found, and every response of
+    the HTTP clients of the parsers is written with its duration. The searchers work in a browser, so their
+    pages are not recorded, only their results. In the replay mode, searches return the recorded links without
+    a browser, and responses are served from the cassette, delayed by their recorded durations divided by
+    'speed'.
+
+    The cassette is a gzip-compressed JSON Lines file with one search or response per line, written as it is
+    recorded. Bodies are stored as text, or in base64 if they are not UTF-8.
+
+    Attributes:
+        path (str): The path to the cassette file.
+        mode (str): "record" or "replay".
+        speed (float): How many times faster than recorded the responses are replayed. 0 replays them without
+            delays.
+        misses (int): The number of replayed requests that are not in the cassette.
+
+    Methods:
+        record_search(platform: str, criteria: CriteriaDTO, resume_links: list[str] | None,
+            resume_cards: dict = None) -> None: Writes the results of a search.
+        get_search(platform: str, criteria: CriteriaDTO) -> tuple[list[str], dict] | None: Reads the results
+            of a search.
+        record_response(url: str, content: bytes | None, elapsed: float) -> None: Writes a response.
+        get_response(url: str) -> tuple[bytes | None, float] | None: Reads a response.
+        wrap_http_client(http_client: HttpClientInterface) -> HttpClientInterface: Wraps the HTTP client of
+            a parser to record or replay its responses.
+        close() -> None: Finishes the cassette file.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", speed: float = 0.0):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}, use one of {', '.join(CASSETTE_MODES)}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._searches = {}
+        self._responses = {}
+        self._file = None
+        if mode == "record":
+            self._file = gzip.open(path, "wt", encoding="utf-8")
+        else:
+            self._load()
+
+    def record_search(
+        self, platform: str, criteria: "CriteriaDTO", resume_links: list[str] | None, resume_cards: dict = None
+    ) -> None:
+        """
+        Writes the results of a search.
+
+        Args:
+            platform (str): The name of the platform.
+            criteria (CriteriaDTO): The criteria of the search.
+            resume_links (list[str] | None): The found links, or None if no resumes were found.
+            resume_cards (dict, optional): The result cards of the resumes by their links. Defaults to None.
+        """
+
+        self._write(
+            {
+                "type": "search",
+                "platform": platform,
+                "criteria": criteria.model_dump(),
+                "links": resume_links,
+                "cards": resume_cards or {},
+            }
+        )
+
+    def get_search(self, platform: str, criteria: "CriteriaDTO") -> tuple[list[str], dict] | None:
+        """
+        Reads the results of a search.
+
+        Args:
+            platform (str): The name of the platform.
+            criteria (CriteriaDTO): The criteria of the search.
+
+        Returns:
+            tuple[list[str], dict] | None: The found links and their result cards, or None if no resumes were
+            found.
+
+        Raises:
+            CassetteMissError: If the search is not in the cassette.
+        """
+
+        key = self._get_search_key(platform, criteria.model_dump())
+        if key not in self._searches:
+            raise CassetteMissError(f"The search for {criteria.position!r} on {platform} is not in the cassette")
+        return self._searches[key]
+
+    def record_response(self, url: str, content: bytes | None, elapsed: float) -> None:
+        """
+        Writes a response.
+
+        Args:
+            url (str): The URL of the request.
+            content (bytes | None): The body of the response, or None if the document is not accessible.
+            elapsed (float): The duration of the request in seconds.
+        """
+
+        record = {"type": "response", "url": url, "elapsed": round(elapsed, 4)}
+        if content is not None:
+            try:
+                record["text"] = content.decode("utf-8")
+            except UnicodeDecodeError:
+                record["base64"] = b64encode(content).decode("ascii")
+        self._write(record)
+
+    def get_response(self, url: str) -> tuple[bytes | None, float] | None:
+        """
+        Reads a response.
+
+        Args:
+            url (str): The URL of the request.
+
+        Returns:
+            tuple[bytes | None, float] | None: The body of the response and the duration of the request, or None
+            if the request is not in the cassette, then it is counted in 'misses'.
+        """
+
+        response = self._responses.get(url)
+        if response is None:
+            with self._lock:
+                self.misses += 1
+        return response
+
+    def wrap_http_client(self, http_client: HttpClientInterface) -> HttpClientInterface:
+        """
+        Wraps the HTTP client of a parser to record or replay its responses.
+
+        Args:
+            http_client (HttpClientInterface): The HTTP client of the parser.
+
+        Returns:
+            HttpClientInterface: The recording client in the record mode, or the replaying client in the replay
+            mode, which closes the given client when it is closed.
+        """
+
+        if self.mode == "record":
+            return RecordingHttpClient(http_client, self)
+        return ReplayHttpClient(self, http_client)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if self.misses:
+            logger.warning("%d requests were not in the cassette %s", self.misses, self.path)
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _write(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def _load(self) -> None:
+        """
+        Reads the cassette file. Later records of the same search or URL replace earlier ones.
+        """
+
+        with gzip.open(self.path, "rt", encoding="utf-8") as cassette_file:
+            for line in cassette_file:
+                record = json.loads(line)
+                if record["type"] == "search":
+                    key = self._get_search_key(record["platform"], record["criteria"])
+                    links = record["links"]
+                    self._searches[key] = None if links is None else (links, record["cards"])
+                elif "text" in record:
+                    self._responses[record["url"]] = (record["text"].encode("utf-8"), record["elapsed"])
+                elif "base64" in record:
+                    self._responses[record["url"]] = (b64decode(record["base64"]), record["elapsed"])
+                else:
+                    self._responses[record["url"]] = (None, record["elapsed"])
+        logger.info(
+            "Loaded %d searches and %d responses from the cassette %s",
+            len(self._searches),
+            len(self._responses),
+            self.path,
+        )
+
+    @staticmethod
+    def _get_search_key(platform: str, criteria_data: dict) -> str:
+        return json.dumps([platform, criteria_data], sort_keys=True, ensure_ascii=False)
+
+
+class RecordingHttpClient(HttpClientInterface):
+    """
+    HTTP client that writes every response of another client to a cassette.
+
+    Attributes:
+        http_client (HttpClientInterface): The client that sends the requests.
+        cassette (Cassette): The cassette in the record mode.
+    """
+
+    def __init__(self, http_client: HttpClientInterface, cassette: Cassette):
+        self.http_client = http_client
+        self.cassette = cassette
+
+    def fetch(self, url: str, headers: dict = None) -> bytes | None:
+        started_at = perf_counter()
+        try:
+            content = self.http_client.fetch(url, headers)
+        except DocumentGoneError:
+            self.cassette.record_response(url, None, perf_counter() - started_at)
+            raise
+        self.cassette.record_response(url, content, perf_counter() - started_at)
+        return content
+
+    def close(self) -> None:
+        self.http_client.close()
+
+
+class ReplayHttpClient(HttpClientInterface):
+    """
+    HTTP client that serves the responses of a cassette without network requests. Requests that are not in
+    the cassette are counted in its 'misses' and answered as inaccessible documents.
+
+    Attributes:
+        cassette (Cassette): The cassette in the replay mode.
+        http_client (HttpClientInterface | None): The client of the parser, only closed with this client.
+    """
+
+    def __init__(self, cassette: Cassette, http_client: HttpClientInterface = None):
+        self.cassette = cassette
+        self.http_client = http_client
+
+    def fetch(self, url: str, headers: dict = None) -> bytes | None:
+        response = self.cassette.get_response(url)
+        if response is None:
+            logger.warning("The response of %s is not in the cassette", url)
+            return None
+        content, elapsed = response
+        if self.cassette.speed:
+            sleep(elapsed / self.cassette.speed)
+        return content
+
+    def close(self) -> None:
+        if self.http_client is not None:
+            self.http_client.close()
@@ -0,0 +1,266 @@
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+from .budget import SearchBudget
+from .cancellation import CancellationToken
+from .exceptions import SearchCancelledError
+from .filters import filter_resumes, without_filters
+from .interfaces import ResumeSinkInterface
+from .planning import SearchPlanner
+from .platforms import load_parser
+from .search import search_resumes
+
+if TYPE_CHECKING:
+    from .caching import LinkCache
+    from .dto import CriteriaDTO
+    from .profiling import SearchProfiler
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentCollector(ResumeSinkInterface):
+    """
+    Sink that keeps the documents of all parsed resumes by their links, e.g. of a crawl.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        self._lock = threading.Lock()
+
+    def add(self, platform: str, resume_link: str, document: dict, resume: dict = None) -> None:
+        with self._lock:
+            self.documents[resume_link] = document
+
+
+class _Crawl:
+    """
+    A search on a platform shared by all identical requests that arrive while it runs.
+    """
+
+    def __init__(self, key: tuple, budget: SearchBudget):
+        self.key = key
+        self.budget = budget
+        self.cancellation_token = CancellationToken()
+        self.collector = DocumentCollector()
+        self.participants = 0
+        self.documents = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class SearchCoalescer:
+    """
+    Runs identical concurrent searches once.
+
+    Searches are identical if they are on the same platform and have the same criteria except for the keywords.
+    The first search starts a crawl in a background thread, and the ones that arrive while it runs attach to it.
+    The crawl keeps the documents of all parsed resumes, and every search scores them with its own keywords,
+    so one browser session and one set of downloads serve all of them. The crawl uses the budget and
+    the parser options of the first search.
+
+    The shortlist and the early stop choose the downloaded resumes by the keywords, so searches with either of them
+    are identical only if they also have the same keywords and the same shortlist, early stop and results options.
+
+    The crawl passes the documents to the sinks that keep only documents, e.g. the corpus. Sinks that keep scored
+    resumes, e.g. exporters, get all resumes of the crawl from every search, scored with its keywords.
+
+    A profiled search does not attach to a running crawl, it starts its own one, so the profile shows the whole
+    search. Identical searches that arrive later attach to the crawl registered first.
+
+    A cancelled search detaches from the crawl at once. The crawl is cancelled when all of its searches
+    are cancelled.
+
+    With 'local_filters', the salary and experience filters are not set on the websites. Crawls find resumes
+    with any salary and experience, and every search keeps the ones matching its filters by the structured
+    fields of the documents, so one crawl serves searches with different filters.
+
+    With a 'planner', the queries of a crawl depend on the keywords, so only searches with the same planned
+    queries are identical.
+
+    With a 'link_cache', crawls take the links of recent identical searches from it instead of the websites.
+
+    Attributes:
+        poll_interval (float): How often waiting searches check their cancellation, in seconds.
+        local_filters (bool): Whether the salary and experience filters are applied to the parsed resumes
+            instead of the searches on the websites.
+        planner (SearchPlanner | None): The planner of narrower queries of the crawls.
+        link_cache (LinkCache | None): The cache of the links found by the crawls.
+
+    Methods:
+        search(criteria: CriteriaDTO, platform: str, budget: SearchBudget = None, parser_options: dict = None,
+            trace_memory: bool = False, profiler: SearchProfiler = None,
+            cancellation_token: CancellationToken = None) -> dict | None: Searches resumes on a platform,
+            attaching to a running identical search.
+        get_key(criteria: CriteriaDTO, platform: str, parser_options: dict = None) -> tuple: Builds the key of
+            identical searches.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = 0.1,
+        local_filters: bool = False,
+        planner: SearchPlanner = None,
+        link_cache: "LinkCache" = None,
+    ):
+        self.poll_interval = poll_interval
+        self.local_filters = local_filters
+        self.planner = planner
+        self.link_cache = link_cache
+        self._crawls = {}
+        self._lock = threading.Lock()
+
+    def search(
+        self,
+        criteria: "CriteriaDTO",
+        platform: str,
+        budget: SearchBudget = None,
+        parser_options: dict = None,
+        trace_memory: bool = False,
+        profiler: "SearchProfiler" = None,
+        cancellation_token: CancellationToken = None,
+    ) -> dict | None:
+        """
+        Searches resumes on a platform and parses them, attaching to a running identical search if there is one.
+
+        Args:
+            criteria (CriteriaDTO): Criteria data transfer object containing search parameters.
+            platform (str): The name of the platform, one of the PLATFORMS keys.
+            budget (SearchBudget, optional): Limits of the search. An attached search takes the state of the budget
+                of the crawl. Defaults to None.
+            parser_options (dict, optional): Arguments of the parser. Its sinks that keep scored resumes get
+                the resumes scored for this search. Defaults to None.
+            trace_memory (bool, optional): Whether to measure the peak of Python allocations. Defaults to False.
+            profiler (SearchProfiler, optional): The profiler of the search run. An active profiler makes
+                the search start its own crawl. Defaults to None.
+            cancellation_token (CancellationToken, optional): The cancellation of the search. Defaults to None.
+
+        Returns:
+            dict | None: Resumes scored with the keywords of the criteria by their links, or None if no resumes
+            were found for the criteria.
+
+        Raises:
+            SearchCancelledError: If the search is cancelled.
+        """
+
+        key = self.get_key(criteria, platform, parser_options)
+        budget = budget or SearchBudget()
+        with self._lock:
+            crawl = self._crawls.get(key)
+            if crawl is None or (profiler is not None and profiler.is_active):
+                crawl = _Crawl(key, budget)
+                self._crawls.setdefault(key, crawl)
+                crawl_criteria = without_filters(criteria) if self.local_filters else criteria
+                crawl_options = dict(parser_options or {})
+                crawl_options["sinks"] = [sink for sink in crawl_options.get("sinks") or [] if not sink.uses_scores]
+                threading.Thread(
+                    target=self._run_crawl,
+                    args=(crawl, crawl_criteria, platform, crawl_options, trace_memory, profiler),
+                    name=f"crawl-{platform}",
+                    daemon=True,
+                ).start()
+            else:
+                logger.info("Search on %s is attached to a running identical search", platform)
+            crawl.participants += 1
+
+        try:
+            while not crawl.done.wait(self.poll_interval):
+                if cancellation_token and cancellation_token.is_cancelled:
+                    raise SearchCancelledError()
+        finally:
+            self._detach(crawl)
+
+        if crawl.error is not None:
+            raise crawl.error
+        budget.is_exhausted = budget.is_exhausted or crawl.budget.is_exhausted
+        if crawl.documents is None:
+            return None
+
+        parser_class = load_parser(platform)
+        resume_results = {
+            resume_link: parser_class.score_document(document, criteria.skills_and_keywords)
+            for resume_link, document in crawl.documents.items()
+        }
+        scored_sinks = [sink for sink in (parser_options or {}).get("sinks") or [] if sink.uses_scores]
+        for sink in scored_sinks:
+            for resume_link, resume in resume_results.items():
+                sink.add(platform, resume_link, crawl.documents[resume_link], resume)
+            sink.flush()
+        return filter_resumes(resume_results, criteria) if self.local_filters else resume_results
+
+    def get_key(self, criteria: "CriteriaDTO", platform: str, parser_options: dict = None) -> tuple:
+        """
+        Builds the key of identical searches from the keys of their queries to the website, and from the keywords
+        if the parser options choose the downloaded resumes by them.
+
+        Args:
+            criteria (CriteriaDTO): Criteria data transfer object containing search parameters.
+            platform (str): The name of the platform.
+            parser_options (dict, optional): Arguments of the parser. Defaults to None.
+
+        Returns:
+            tuple: The key of the search.
+        """
+
+        from .dto import search_key
+
+        if self.local_filters:
+            criteria = without_filters(criteria)
+        queries = self.planner.plan(criteria) if self.planner else [criteria]
+        key = tuple(search_key(query, platform) for query in queries)
+        parser_options = parser_options or {}
+        if parser_options.get("shortlist_size") is not None or parser_options.get("early_stop_slack") is not None:
+            key += (
+                tuple(sorted(criteria.skills_and_keywords or [])),
+                parser_options.get("shortlist_size"),
+                parser_options.get("early_stop_slack"),
+                parser_options.get("max_results"),
+            )
+        return key
+
+    def _run_crawl(
+        self,
+        crawl: _Crawl,
+        criteria: "CriteriaDTO",
+        platform: str,
+        parser_options: dict,
+        trace_memory: bool,
+        profiler: "SearchProfiler",
+    ) -> None:
+        parser_options = dict(parser_options or {})
+        parser_options["sinks"] = [*(parser_options.get("sinks") or []), crawl.collector]
+        try:
+            resume_results = search_resumes(
+                criteria,
+                platform,
+                crawl.budget,
+                parser_options,
+                trace_memory,
+                profiler,
+                crawl.cancellation_token,
+                self.planner,
+                link_cache=self.link_cache,
+            )
+        except BaseException as error:
+            crawl.error = error
+        else:
+            crawl.documents = None if resume_results is None else crawl.collector.documents
+        finally:
+            with self._lock:
+                self._remove(crawl)
+            crawl.done.set()
+
+    def _detach(self, crawl: _Crawl) -> None:
+        with self._lock:
+            crawl.participants -= 1
+            is_abandoned = crawl.participants == 0 and not crawl.done.is_set()
+            if is_abandoned:
+                # New identical searches start a new crawl instead of attaching to the cancelled one.
+                self._remove(crawl)
+        if is_abandoned:
+            logger.info("All searches of a crawl are cancelled, cancelling the crawl")
+            crawl.cancellation_token.cancel()
+
+    def _remove(self, crawl: _Crawl) -> None:
+        if self._crawls.get(crawl.key) is crawl:
+            del self._crawls[crawl.key]
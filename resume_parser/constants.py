@@ -9,3 +9,25 @@ class ResumeStatus:
     NO_SKILL_MATCHES = "Збігів у розділі навичок не знайдено"
     RESUME_NOT_FILLED = "Резюме не заповнено"
     NO_KEYWORD_MATCHES = "Збігів з ключовими словами у резюме не знайдено"
+
+
+SALARY = {
+    None: "0",
+    1: "1",
+    2000: "2",
+    3000: "3",
+    4000: "4",
+    5000: "5",
+    6000: "6",
+    7000: "7",
+    8000: "8",
+    9000: "9",
+    10000: "10",
+    15000: "11",
+    20000: "12",
+    25000: "13",
+    30000: "14",
+    40000: "15",
+    50000: "16",
+    100000: "17",
+}
@@ -0,0 +1,238 @@
+import json
+import re
+import sqlite3
+import threading
+from time import time
+from typing import TYPE_CHECKING
+
+from .interfaces import ResumeParserInterface, ResumeSinkInterface
+
+if TYPE_CHECKING:
+    from .dto import CriteriaDTO
+
+_TERM_PATTERN = re.compile(r"\w+")
+_MAX_SQL_VARIABLES = 500
+
+
+class ResumeCorpus(ResumeSinkInterface):
+    """
+    Local store of every parsed resume in a SQLite database with an inverted index.
+
+    Parsers add the documents of parsed resumes to the corpus as a sink. The index maps terms of four fields to
+    resume links: words of the position, skills and their words, words of the resume text (keywords) and
+    the city. Queries find candidates in the index, so they do not scan the documents.
+
+    Attributes:
+        path (str): The path to the database file.
+        flush_size (int): The number of buffered resumes after which they are written without waiting for 'flush'.
+
+    Methods:
+        add(platform: str, resume_link: str, document: dict, resume: dict) -> None: Buffers a parsed resume.
+        flush() -> None: Writes buffered resumes and their index terms.
+        query(criteria: CriteriaDTO, platforms: list[str] = None, max_candidates: int = 1000) -> dict: Finds
+            stored resumes for the search criteria.
+        get_documents(resume_links: list[str], max_age: float) -> dict: Gets the documents of resumes fetched
+            recently.
+        delete(resume_links: list[str]) -> None: Removes resumes from the corpus.
+        count() -> int: Returns the number of stored resumes.
+    """
+
+    def __init__(self, path: str = "resumes.sqlite3", flush_size: int = 100):
+        self.path = path
+        self.flush_size = flush_size
+        self._pending = []
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS resumes (
+                link TEXT PRIMARY KEY,
+                platform TEXT NOT NULL,
+                document TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS terms (
+                field TEXT NOT NULL,
+                term TEXT NOT NULL,
+                link TEXT NOT NULL,
+                PRIMARY KEY (field, term, link)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS terms_link ON terms (link);
+            """
+        )
+
+    def add(self, platform: str, resume_link: str, document: dict, resume: dict = None) -> None:
+        """
+        Buffers a parsed resume until 'flush', or writes the buffer once it holds 'flush_size' resumes.
+
+        Args:
+            platform (str): The name of the platform of the resume.
+            resume_link (str): The URL of the resume.
+            document (dict): The document of the resume.
+            resume (dict, optional): The scored resume, not stored. Defaults to None.
+        """
+
+        with self._lock:
+            self._pending.append((platform, resume_link, document, time()))
+            is_full = len(self._pending) >= self.flush_size
+        if is_full:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes buffered resumes and their index terms in one transaction. Resumes already in the corpus are
+        replaced.
+        """
+
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return
+            self._connection.execute("BEGIN")
+            try:
+                for platform, resume_link, document, fetched_at in pending:
+                    self._connection.execute("DELETE FROM terms WHERE link = ?", (resume_link,))
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO resumes (link, platform, document, fetched_at) VALUES (?, ?, ?, ?)",
+                        (resume_link, platform, json.dumps(document, ensure_ascii=False), fetched_at),
+                    )
+                    self._connection.executemany(
+                        "INSERT OR IGNORE INTO terms (field, term, link) VALUES (?, ?, ?)",
+                        ((field, term, resume_link) for field, term in self._get_index_terms(document)),
+                    )
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def query(self, criteria: "CriteriaDTO", platforms: list[str] = None, max_candidates: int = 1000) -> dict:
+        """
+        Finds stored resumes for the search criteria.
+
+        Candidates contain every word of the position and, if the location is set, are from that city. If there
+        are more candidates than 'max_candidates', the ones with more keyword and skill terms are chosen.
+        The salary and experience criteria are not applied here, 'search_corpus' filters the found resumes.
+
+        Args:
+            criteria (CriteriaDTO): Criteria data transfer object containing search parameters.
+            platforms (list[str], optional): The platforms of the resumes. Defaults to all platforms.
+            max_candidates (int, optional): The maximum number of returned resumes. Defaults to 1000.
+
+        Returns:
+            dict: The found resumes by their links, as dicts with the 'platform', the 'document' and the time
+            it was fetched, 'fetched_at'.
+        """
+
+        conditions = [("position", term) for term in self._get_terms(criteria.position)]
+        if criteria.location:
+            conditions.append(("city", self._normalize(criteria.location)))
+        if not conditions:
+            return {}
+
+        candidates_sql = " INTERSECT ".join(["SELECT link FROM terms WHERE field = ? AND term = ?"] * len(conditions))
+        platform_sql = f"WHERE resumes.platform IN ({', '.join('?' * len(platforms))})" if platforms else ""
+
+        keyword_terms = sorted(
+            {term for keyword in criteria.skills_and_keywords or [] for term in self._get_terms(keyword)}
+        )[:_MAX_SQL_VARIABLES]
+        keyword_placeholders = ", ".join("?" * len(keyword_terms)) or "NULL"
+        sql = f"""
+            SELECT resumes.link, resumes.platform, resumes.document, resumes.fetched_at
+            FROM ({candidates_sql}) AS candidates
+            JOIN resumes ON resumes.link = candidates.link
+            LEFT JOIN terms ON terms.link = candidates.link
+                AND terms.field IN ('keyword', 'skill') AND terms.term IN ({keyword_placeholders})
+            {platform_sql}
+            GROUP BY resumes.link
+            ORDER BY COUNT(terms.term) DESC, resumes.fetched_at DESC
+            LIMIT ?
+        """
+        # Parameters follow the order of the placeholders: candidates, keywords, platforms, limit.
+        parameters = [value for condition in conditions for value in condition] + keyword_terms + list(platforms or [])
+        parameters.append(max_candidates)
+
+        with self._lock:
+            rows = self._connection.execute(sql, parameters).fetchall()
+        return {
+            link: {"platform": platform, "document": self._load_document(document), "fetched_at": fetched_at}
+            for link, platform, document, fetched_at in rows
+        }
+
+    def get_documents(self, resume_links: list[str], max_age: float) -> dict:
+        """
+        Gets the documents of resumes fetched recently, so a search can score them without downloading them.
+
+        Args:
+            resume_links (list[str]): The URLs of the resumes.
+            max_age (float): The maximum age of a document in seconds.
+
+        Returns:
+            dict: The documents of the stored resumes not older than 'max_age' by their links.
+        """
+
+        documents = {}
+        min_fetched_at = time() - max_age
+        for start in range(0, len(resume_links), _MAX_SQL_VARIABLES):
+            links = resume_links[start : start + _MAX_SQL_VARIABLES]
+            with self._lock:
+                rows = self._connection.execute(
+                    f"SELECT link, document FROM resumes WHERE link IN ({', '.join('?' * len(links))}) "
+                    "AND fetched_at >= ?",
+                    [*links, min_fetched_at],
+                ).fetchall()
+            documents.update((link, self._load_document(document)) for link, document in rows)
+        return documents
+
+    def delete(self, resume_links: list[str]) -> None:
+        """
+        Removes resumes from the corpus, e.g. the ones that are no longer available.
+
+        Args:
+            resume_links (list[str]): The URLs of the resumes.
+        """
+
+        with self._lock:
+            self._connection.execute("BEGIN")
+            for resume_link in resume_links:
+                self._connection.execute("DELETE FROM terms WHERE link = ?", (resume_link,))
+                self._connection.execute("DELETE FROM resumes WHERE link = ?", (resume_link,))
+            self._connection.execute("COMMIT")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    @classmethod
+    def _get_index_terms(cls, document: dict) -> set[tuple[str, str]]:
+        """
+        Builds the index terms of a document.
+
+        Args:
+            document (dict): The document of the resume.
+
+        Returns:
+            set[tuple[str, str]]: Pairs of the field and the term.
+        """
+
+        terms = {("position", term) for term in cls._get_terms(document.get("position"))}
+        if document.get("city"):
+            terms.add(("city", cls._normalize(document["city"])))
+        for skill in document.get("skills") or []:
+            terms.add(("skill", cls._normalize(skill)))
+            terms.update(("skill", term) for term in cls._get_terms(skill))
+        for text in document.get("text_blocks") or [document.get("text") or ""]:
+            terms.update(("keyword", term) for term in cls._get_terms(text))
+        return terms
+
+    @staticmethod
+    def _get_terms(text: str | None) -> set[str]:
+        return {term for term in _TERM_PATTERN.findall((text or "").lower()) if len(term) > 1}
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    @staticmethod
+    def _load_document(data: str) -> dict:
+        return ResumeParserInterface.restore_document(json.loads(data))
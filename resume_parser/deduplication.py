@@ -0,0 +1,158 @@
+import re
+import zlib
+from collections import defaultdict
+
+_VALUE_SEED = 0x9E3779B9
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+class MinHash:
+    """
+    MinHash fingerprints of resume texts.
+
+    The text is split into word shingles. Every shingle is hashed once and falls into one of 'num_perm' bins,
+    and the fingerprint keeps the minimum hash value of each bin (one permutation hashing), so building
+    a fingerprint costs one hash per shingle. Empty bins borrow the value of the next filled bin.
+    The share of equal values in two fingerprints estimates the Jaccard similarity of the shingle sets.
+
+    Attributes:
+        num_perm (int): The number of bins, i.e. the length of a fingerprint.
+        shingle_size (int): The number of words in a shingle.
+        min_words (int): The minimum number of words in a text to build a fingerprint for it.
+
+    Methods:
+        signature(text: str) -> tuple[int, ...] | None: Builds the fingerprint of a text.
+        similarity(first: tuple, second: tuple) -> float: Estimates the Jaccard similarity of two fingerprints.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, min_words: int = 20):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+
+    def signature(self, text: str) -> tuple[int, ...] | None:
+        """
+        Builds the fingerprint of a text.
+
+        Args:
+            text (str): The text of the resume.
+
+        Returns:
+            tuple[int, ...] | None: The fingerprint, or None if the text is too short to be compared reliably.
+        """
+
+        words = _WORD_PATTERN.findall(text.lower())
+        if len(words) < self.min_words:
+            return None
+
+        bins = [None] * self.num_perm
+        for index in range(len(words) - self.shingle_size + 1):
+            shingle = " ".join(words[index : index + self.shingle_size]).encode()
+            position = zlib.crc32(shingle) % self.num_perm
+            value = zlib.crc32(shingle, _VALUE_SEED)
+            if bins[position] is None or value < bins[position]:
+                bins[position] = value
+
+        signature = []
+        for position in range(self.num_perm):
+            offset = 0
+            while bins[(position + offset) % self.num_perm] is None:
+                offset += 1
+            signature.append(bins[(position + offset) % self.num_perm] + offset)
+        return tuple(signature)
+
+    @staticmethod
+    def similarity(first: tuple, second: tuple) -> float:
+        """
+        Estimates the Jaccard similarity of two fingerprints.
+
+        Args:
+            first (tuple): The first fingerprint.
+            second (tuple): The second fingerprint.
+
+        Returns:
+            float: The share of equal values in the fingerprints.
+        """
+
+        return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+class ResumeDeduplicator:
+    """
+    Merges near-duplicate resumes by their MinHash fingerprints.
+
+    Fingerprints are split into bands and indexed in LSH buckets, so only resumes sharing a bucket are compared
+    with each other instead of comparing every pair.
+
+    Attributes:
+        threshold (float): The minimum estimated similarity of two resumes to treat them as duplicates.
+        bands (int): The number of LSH bands a fingerprint is split into.
+
+    Methods:
+        deduplicate(resume_results: dict[str, dict]) -> dict[str, dict]: Merges near-duplicate resumes.
+    """
+
+    def __init__(self, threshold: float = 0.7, bands: int = 16):
+        self.threshold = threshold
+        self.bands = bands
+
+    def deduplicate(self, resume_results: dict[str, dict]) -> dict[str, dict]:
+        """
+        Merges near-duplicate resumes.
+
+        From each group of duplicates the resume with the most points is kept, and the links to the other
+        resumes of the group are added to its 'duplicates' list. Resumes without a fingerprint are kept as is.
+
+        Args:
+            resume_results (dict[str, dict]): Parsed resumes by their links, possibly from several platforms.
+
+        Returns:
+            dict[str, dict]: Resumes without near-duplicates, in the original order.
+        """
+
+        links = list(resume_results)
+        parents = list(range(len(links)))
+
+        def find(index: int) -> int:
+            while parents[index] != index:
+                parents[index] = parents[parents[index]]
+                index = parents[index]
+            return index
+
+        buckets = defaultdict(list)
+        for index, link in enumerate(links):
+            signature = resume_results[link].get("fingerprint")
+            if not signature:
+                continue
+            rows = len(signature) // self.bands
+            for band in range(self.bands):
+                buckets[(band, signature[band * rows : (band + 1) * rows])].append(index)
+
+        for bucket in buckets.values():
+            for position, candidate in enumerate(bucket):
+                candidate_signature = resume_results[links[candidate]]["fingerprint"]
+                for other in bucket[:position]:
+                    if find(other) == find(candidate):
+                        break
+                    if MinHash.similarity(resume_results[links[other]]["fingerprint"], candidate_signature) >= (
+                        self.threshold
+                    ):
+                        parents[find(candidate)] = find(other)
+                        break
+
+        groups = defaultdict(list)
+        for index in range(len(links)):
+            groups[find(index)].append(index)
+
+        kept = {}
+        for group in groups.values():
+            best = max(group, key=lambda index: resume_results[links[index]]["points"])
+            kept[best] = [links[index] for index in group if index != best]
+
+        deduplicated_results = {}
+        for index in sorted(kept):
+            resume = resume_results[links[index]]
+            if kept[index]:
+                resume = {**resume, "duplicates": kept[index]}
+            deduplicated_results[links[index]] = resume
+        return deduplicated_results
@@ -0,0 +1,463 @@
+"""
+Distributed crawl: one search is split into work units on a durable queue and processed by any number of workers.
+
+The coordinator puts a listing unit on the queue. The worker that leases it runs the searcher, orders the found
+links by their result cards and splits them into batches of resumes, which are leased by all workers and parsed
+in parallel. The coordinator merges the documents of the batches into one ranking, the same as 'pars_resumes'
+of a single parser builds for the same links.
+
+Usage:
+    python -m resume_parser.distributed --queue crawl_queue.sqlite3 --fetch-workers 4
+"""
+
+import argparse
+import heapq
+import logging
+import os
+import socket
+import sys
+import threading
+import uuid
+from contextlib import contextmanager
+from time import sleep
+from typing import TYPE_CHECKING, Iterator
+
+from .budget import SearchBudget
+from .cancellation import CancellationToken
+from .coalescing import DocumentCollector
+from .exceptions import CrawlFailedError, ResumeNotFoundError, SearchCancelledError
+from .interfaces import ResumeSinkInterface
+from .platforms import load_parser, load_platform
+from .work_queue import SQLiteWorkQueue, WorkQueueInterface, WorkUnit
+
+if TYPE_CHECKING:
+    from .dto import CriteriaDTO
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlCoordinator:
+    """
+    Splits searches into work units on a queue and merges the results of the workers into one ranking.
+
+    The early stop is not used, every resume of the shortlist is parsed, so the ranking does not depend on
+    the order in which the workers finish their batches.
+
+    Attributes:
+        queue (WorkQueueInterface): The queue shared with the workers.
+        batch_size (int): The number of resumes in a work unit.
+        poll_interval (float): How often the progress of a job is checked, in seconds.
+
+    Methods:
+        search(criteria: CriteriaDTO, platform: str, budget: SearchBudget = None, parser_options: dict = None,
+            cancellation_token: CancellationToken = None) -> dict | None: Searches resumes on a platform with
+            the workers and ranks them.
+        submit(criteria: CriteriaDTO, platform: str, budget: SearchBudget = None,
+            shortlist_size: int | None = None) -> str: Puts a search on the queue.
+        wait(job_id: str, budget: SearchBudget = None, cancellation_token: CancellationToken = None) -> bool:
+            Waits until all units of a job are finished.
+        merge(job_id: str, criteria: CriteriaDTO, platform: str, max_results: int | None = None,
+            sinks: list[ResumeSinkInterface] = None, budget: SearchBudget = None) -> dict | None: Merges
+            the results of a job into one ranking.
+    """
+
+    def __init__(self, queue: WorkQueueInterface, batch_size: int = 25, poll_interval: float = 1.0):
+        self.queue = queue
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+
+    def search(
+        self,
+        criteria: "CriteriaDTO",
+        platform: str,
+        budget: SearchBudget = None,
+        parser_options: dict = None,
+        cancellation_token: CancellationToken = None,
+    ) -> dict | None:
+        """
+        Searches resumes on a platform with the workers of the queue and ranks them, as 'search_resumes' does
+        on a single node.
+
+        Args:
+            criteria (CriteriaDTO): Criteria data transfer object containing search parameters.
+            platform (str): The name of the platform, one of the PLATFORMS keys.
+            budget (SearchBudget, optional): Limits of the search. The searcher of the worker applies the limits
+                of resumes and pages, and the coordinator stops waiting at the deadline and ranks the resumes
+                parsed so far. Defaults to None.
+            parser_options (dict, optional): Arguments of the parser. 'shortlist_size', 'max_results' and 'sinks'
+                are used, the workers have their own fetch and parse workers. Defaults to None.
+            cancellation_token (CancellationToken, optional): The cancellation of the search. Defaults to None.
+
+        Returns:
+            dict | None: Parsed resumes by their links, or None if no resumes were found for the criteria.
+
+        Raises:
+            SearchCancelledError: If the search is cancelled. The units of the job are cancelled.
+            CrawlFailedError: If the search on the website failed on every attempt.
+        """
+
+        parser_options = parser_options or {}
+        budget = budget or SearchBudget()
+        budget.start()
+        job_id = self.submit(criteria, platform, budget, parser_options.get("shortlist_size"))
+        try:
+            if not self.wait(job_id, budget, cancellation_token):
+                logger.info("The deadline of the search on %s is reached, ranking the parsed resumes", platform)
+                self.queue.cancel_job(job_id)
+                budget.is_exhausted = True
+            return self.merge(
+                job_id, criteria, platform, parser_options.get("max_results"), parser_options.get("sinks"), budget
+            )
+        except SearchCancelledError:
+            self.queue.cancel_job(job_id)
+            raise
+        finally:
+            self.queue.delete_job(job_id)
+
+    def submit(
+        self, criteria: "CriteriaDTO", platform: str, budget: SearchBudget = None, shortlist_size: int | None = None
+    ) -> str:
+        """
+        Puts a search on the queue as a job with its listing unit.
+
+        Args:
+            criteria (CriteriaDTO): Criteria data transfer object containing search parameters.
+            platform (str): The name of the platform.
+            budget (SearchBudget, optional): Limits of the search, the listing applies its limits of resumes
+                and pages. Defaults to None.
+            shortlist_size (int | None, optional): The number of resumes parsed of the ones with result cards.
+                Defaults to None, every resume.
+
+        Returns:
+            str: The ID of the job.
+        """
+
+        spec = {
+            "platform": platform,
+            "criteria": criteria.model_dump(),
+            "budget": {
+                "max_resumes": budget.max_resumes if budget else None,
+                "max_pages": budget.max_pages if budget else None,
+                "deadline": budget.deadline if budget else None,
+            },
+            "shortlist_size": shortlist_size,
+            "batch_size": self.batch_size,
+        }
+        job_id = self.queue.create_job(spec, [("listing", {})])
+        logger.info("Search on %s is queued as job %s", platform, job_id)
+        return job_id
+
+    def wait(self, job_id: str, budget: SearchBudget = None, cancellation_token: CancellationToken = None) -> bool:
+        """
+        Waits until no unit of a job is pending or leased.
+
+        Args:
+            job_id (str): The ID of the job.
+            budget (SearchBudget, optional): Limits of the search, waiting stops at its deadline. Defaults to None.
+            cancellation_token (CancellationToken, optional): The cancellation of the search. Defaults to None.
+
+        Returns:
+            bool: True if all units are finished, False if the deadline is reached.
+
+        Raises:
+            SearchCancelledError: If the search is cancelled.
+        """
+
+        while True:
+            progress = self.queue.get_progress(job_id)
+            # The units of the batches are added with the result of the listing, so there is no gap between them.
+            if not progress["pending"] and not progress["leased"]:
+                return True
+            if budget and budget.is_time_over():
+                return False
+            if cancellation_token:
+                cancellation_token.sleep(self.poll_interval)
+            else:
+                sleep(self.poll_interval)
+
+    def merge(
+        self,
+        job_id: str,
+        criteria: "CriteriaDTO",
+        platform: str,
+        max_results: int | None = None,
+        sinks: list[ResumeSinkInterface] = None,
+        budget: SearchBudget = None,
+    ) -> dict | None:
+        """
+        Scores the documents parsed by the workers and keeps the most relevant ones, as 'pars_resumes' does.
+
+        Args:
+            job_id (str): The ID of the job.
+            criteria (CriteriaDTO): Criteria data transfer object containing search parameters.
+            platform (str): The name of the platform.
+            max_results (int | None, optional): The maximum number of the most relevant resumes kept.
+                Defaults to None, every resume.
+            sinks (list[ResumeSinkInterface], optional): Receivers of every parsed resume. Defaults to None.
+            budget (SearchBudget, optional): Limits of the search, marked as exhausted if the listing was.
+                Defaults to None.
+
+        Returns:
+            dict | None: Parsed resumes by their links in the order of fetching, or None if no resumes were found
+            for the criteria.
+
+        Raises:
+            CrawlFailedError: If the listing unit failed.
+        """
+
+        listing = None
+        documents = {}
+        for kind, _, result in self.queue.get_results(job_id):
+            if kind == "listing":
+                listing = result
+            else:
+                documents.update(result["documents"])
+
+        if listing is None:
+            if budget and budget.is_exhausted:
+                return {}
+            raise CrawlFailedError()
+        if listing["links"] is None:
+            return None
+        if budget and listing["budget_exhausted"]:
+            budget.is_exhausted = True
+        failed_units = self.queue.get_progress(job_id)["failed"]
+        if failed_units:
+            logger.warning("%d batches of resumes of job %s failed, their resumes are skipped", failed_units, job_id)
+
+        parser_class = load_parser(platform)
+        sinks = sinks or []
+        # Items of (points, -position, link, resume), as in the heap of 'pars_resumes'.
+        scored_resumes = []
+        for position, resume_link in enumerate(listing["links"]):
+            document = documents.get(resume_link)
+            if document is None:
+                continue
+            document = parser_class.restore_document(document)
+            resume = parser_class.score_document(document, criteria.skills_and_keywords)
+            for sink in sinks:
+                sink.add(platform, resume_link, document, resume)
+            scored_resumes.append((resume["points"], -position, resume_link, resume))
+        for sink in sinks:
+            sink.flush()
+
+        if max_results is not None:
+            scored_resumes = heapq.nlargest(max_results, scored_resumes, key=lambda item: item[:2])
+        return {resume_link: resume for _, _, resume_link, resume in sorted(scored_resumes, key=lambda item: -item[1])}
+
+
+class CrawlWorker:
+    """
+    Processes the units of crawl jobs from a queue: searches on the websites and batches of resumes.
+
+    While a unit is processed, its lease is renewed in the background. If the lease is lost, e.g. the job is
+    cancelled, the work is cancelled too.
+
+    Attributes:
+        queue (WorkQueueInterface): The queue of the jobs.
+        worker_id (str): The ID of the worker, unique across hosts.
+        lease_timeout (float): The duration of a lease in seconds.
+        fetch_workers (int | None): The number of concurrent downloads, None for the default of the platform.
+        parse_workers (int | None): The number of parser processes, 0 parses in the worker process. None for
+            the default of the platform.
+        poll_interval (float): How long to wait when the queue is empty, in seconds.
+
+    Methods:
+        run(stop_event: threading.Event = None, exit_when_idle: bool = False) -> int: Processes units until
+            stopped.
+        run_once() -> bool: Processes the next available unit.
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueueInterface,
+        lease_timeout: float = 120,
+        fetch_workers: int | None = None,
+        parse_workers: int | None = None,
+        poll_interval: float = 1.0,
+    ):
+        self.queue = queue
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.lease_timeout = lease_timeout
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.poll_interval = poll_interval
+
+    def run(self, stop_event: threading.Event = None, exit_when_idle: bool = False) -> int:
+        """
+        Processes units until stopped.
+
+        Args:
+            stop_event (threading.Event, optional): Stops the worker after the current unit. Defaults to None.
+            exit_when_idle (bool, optional): Whether to stop when the queue is empty. Defaults to False.
+
+        Returns:
+            int: The number of processed units.
+        """
+
+        stop_event = stop_event or threading.Event()
+        processed_units = 0
+        while not stop_event.is_set():
+            if self.run_once():
+                processed_units += 1
+            elif exit_when_idle:
+                break
+            else:
+                stop_event.wait(self.poll_interval)
+        return processed_units
+
+    def run_once(self) -> bool:
+        """
+        Leases the next available unit and processes it. A unit that raised an error is released for a retry.
+
+        Returns:
+            bool: False if no unit is available.
+        """
+
+        unit = self.queue.lease(self.worker_id, self.lease_timeout)
+        if unit is None:
+            return False
+        job = self.queue.get_job(unit.job_id)
+        if job is None:
+            self.queue.fail(unit.id, self.worker_id, "The job does not exist")
+            return True
+
+        logger.info("Processing %s unit %d of job %s, attempt %d", unit.kind, unit.id, unit.job_id, unit.attempts)
+        cancellation_token = CancellationToken()
+        try:
+            with self._keep_leased(unit, cancellation_token):
+                if unit.kind == "listing":
+                    result, new_units = self._run_listing(job, cancellation_token)
+                else:
+                    result, new_units = self._run_resumes(unit, job, cancellation_token)
+        except SearchCancelledError:
+            logger.info("The lease of unit %d is lost, the unit is dropped", unit.id)
+        except Exception as error:
+            logger.exception("Unit %d of job %s failed", unit.id, unit.job_id)
+            self.queue.fail(unit.id, self.worker_id, repr(error))
+        else:
+            if not self.queue.complete(unit.id, self.worker_id, result, new_units):
+                logger.info("The lease of unit %d is lost, its result is dropped", unit.id)
+        return True
+
+    def _run_listing(self, job: dict, cancellation_token: CancellationToken) -> tuple[dict, list[tuple[str, dict]]]:
+        """
+        Searches resumes on the website, orders and shortlists the found links by their result cards, and splits
+        them into batches.
+
+        Args:
+            job (dict): The spec of the job.
+            cancellation_token (CancellationToken): The cancellation of the unit.
+
+        Returns:
+            tuple[dict, list[tuple[str, dict]]]: The result of the unit with the ordered links, None if no resumes
+            were found, and the units of the batches.
+        """
+
+        from .dto import CriteriaDTO
+
+        criteria = CriteriaDTO(**job["criteria"])
+        budget = SearchBudget(**job["budget"])
+        searcher_class, parser_class = load_platform(job["platform"])
+        searcher = searcher_class(cancellation_token)
+        try:
+            searcher.set_params(criteria, budget)
+        except ResumeNotFoundError:
+            return {"links": None, "budget_exhausted": False}, []
+        except Exception as error:
+            if cancellation_token.is_cancelled:
+                raise SearchCancelledError() from error
+            raise
+        finally:
+            searcher.close()
+
+        resume_links, _ = parser_class.order_resume_links(
+            searcher.resume_links, criteria.skills_and_keywords or [], searcher.resume_cards, job["shortlist_size"]
+        )
+        batch_size = job["batch_size"]
+        new_units = [
+            ("resumes", {"links": resume_links[start : start + batch_size]})
+            for start in range(0, len(resume_links), batch_size)
+        ]
+        return {"links": resume_links, "budget_exhausted": budget.is_exhausted}, new_units
+
+    def _run_resumes(
+        self, unit: WorkUnit, job: dict, cancellation_token: CancellationToken
+    ) -> tuple[dict, list[tuple[str, dict]]]:
+        """
+        Downloads a batch of resumes and extracts their documents, which are scored by the coordinator.
+
+        Args:
+            unit (WorkUnit): The unit with the links of the batch.
+            job (dict): The spec of the job.
+            cancellation_token (CancellationToken): The cancellation of the unit.
+
+        Returns:
+            tuple[dict, list[tuple[str, dict]]]: The result of the unit with the documents by the links, and no
+            new units. Resumes that are not accessible are missing.
+        """
+
+        from .dto import CriteriaDTO
+
+        collector = DocumentCollector()
+        worker_options = {"fetch_workers": self.fetch_workers, "parse_workers": self.parse_workers}
+        parser = load_parser(job["platform"])(
+            **{key: value for key, value in worker_options.items() if value is not None},
+            sinks=[collector],
+            cancellation_token=cancellation_token,
+        )
+        parser.pars_resumes(unit.payload["links"], CriteriaDTO(**job["criteria"]))
+        return {"documents": collector.documents}, []
+
+    @contextmanager
+    def _keep_leased(self, unit: WorkUnit, cancellation_token: CancellationToken) -> Iterator[None]:
+        """
+        Renews the lease of a unit in the background and cancels the work if the lease is lost.
+        """
+
+        stopped = threading.Event()
+
+        def renew() -> None:
+            while not stopped.wait(self.lease_timeout / 3):
+                if not self.queue.renew(unit.id, self.worker_id, self.lease_timeout):
+                    cancellation_token.cancel()
+                    return
+
+        renewer = threading.Thread(target=renew, name=f"lease-{unit.id}", daemon=True)
+        renewer.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            renewer.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a worker of distributed resume searches.")
+    parser.add_argument("--queue", default="crawl_queue.sqlite3", help="SQLite file of the work queue")
+    parser.add_argument("--fetch-workers", type=int, help="concurrent downloads, by default the platform's own number")
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        help="parser processes, 0 parses in the worker process, by default the platform's own number",
+    )
+    parser.add_argument("--lease-timeout", type=float, default=120, help="duration of a lease in seconds")
+    parser.add_argument("--max-attempts", type=int, default=3, help="attempts of a unit before it fails")
+    parser.add_argument("--exit-when-idle", action="store_true", help="stop when the queue is empty")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    queue = SQLiteWorkQueue(args.queue, args.max_attempts)
+    worker = CrawlWorker(queue, args.lease_timeout, args.fetch_workers, args.parse_workers)
+    try:
+        processed_units = worker.run(exit_when_idle=args.exit_when_idle)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        queue.close()
+    print(f"processed_units: {processed_units}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
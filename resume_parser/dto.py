@@ -10,3 +10,27 @@ class CriteriaDTO(BaseModel):
     salary_to: Optional[int] = None
     experience: Optional[float] = None
     skills_and_keywords: Optional[list] = None
+
+
+def search_key(criteria: CriteriaDTO, platform: str) -> tuple:
+    """
+    Builds the key of a search on a website from the criteria used by the searchers: the position, the location,
+    the salary and the experience, with the case and the spaces of the texts normalized. The keywords only score
+    the found resumes, so they are not a part of the key.
+
+    Args:
+        criteria (CriteriaDTO): Criteria data transfer object containing search parameters.
+        platform (str): The name of the platform.
+
+    Returns:
+        tuple: The key of the search, JSON serializable.
+    """
+
+    return (
+        platform,
+        " ".join(criteria.position.lower().split()),
+        " ".join((criteria.location or "").lower().split()),
+        criteria.salary_from,
+        criteria.salary_to,
+        criteria.experience,
+    )
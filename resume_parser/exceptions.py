@@ -3,3 +3,31 @@ class ResumeNotFoundError(Exception):
 
     def __init__(self, message: str = "Resume candidates were not found for the query or search parameters"):
         super().__init__(message)
+
+
+class SearchCancelledError(Exception):
+    """Exception raised when a search is cancelled by the user"""
+
+    def __init__(self, message: str = "The search was cancelled"):
+        super().__init__(message)
+
+
+class CrawlFailedError(Exception):
+    """Exception raised when the workers of a distributed search fail to search on the website"""
+
+    def __init__(self, message: str = "The search on the website failed on every attempt"):
+        super().__init__(message)
+
+
+class DocumentGoneError(Exception):
+    """Exception raised when a downloaded document no longer exists on the website"""
+
+    def __init__(self, message: str = "The document no longer exists on the website"):
+        super().__init__(message)
+
+
+class CassetteMissError(Exception):
+    """Exception raised when a replayed search is not in the cassette"""
+
+    def __init__(self, message: str = "The search is not in the cassette"):
+        super().__init__(message)
@@ -0,0 +1,317 @@
+import csv
+import json
+import os
+import re
+import threading
+from abc import abstractmethod
+from datetime import datetime, timezone
+
+from .constants import ResumeStatus
+from .fields import parse_iso_date
+from .interfaces import ResumeSinkInterface
+
+EXPORT_FIELDS = [
+    "platform",
+    "link",
+    "position",
+    "points",
+    "matching_keywords",
+    "matching_skills",
+    "is_file",
+    "has_experience",
+    "has_education",
+    "experience_years",
+    "salary",
+    "currency",
+    "city",
+    "updated_at",
+    "parsed_at",
+]
+
+
+class ResumeExporter(ResumeSinkInterface):
+    """
+    Base class of sinks that stream every parsed resume to files for analytics.
+
+    Rows are written as resumes are parsed, so the result set is never kept in memory. Every row has the same
+    typed columns, EXPORT_FIELDS: matches are lists of strings, and status messages, such as "no matches",
+    give empty lists. With 'chunk_size', a new file is started after every 'chunk_size' rows, and its name gets
+    the number of the chunk, e.g. "resumes-00001.csv", so finished files can be processed while the export goes on.
+
+    Exports of earlier runs are kept: numbering continues after the last existing chunk, and a single file is
+    appended to. Formats that cannot be appended to start a numbered file instead of an existing single file.
+
+    Exporters are thread-safe, so one exporter may be shared by concurrent searches.
+
+    Attributes:
+        path (str): The path to the output file, or the template of the paths of chunks.
+        chunk_size (int | None): The maximum number of rows in a file. None writes all rows to one file.
+        can_append (bool): Whether rows can be appended to an existing file of the format.
+
+    Methods:
+        add(platform: str, resume_link: str, document: dict, resume: dict) -> None: Writes a parsed resume.
+        flush() -> None: Writes buffered rows to the file.
+        close() -> None: Finishes the current file.
+        get_row(platform: str, resume_link: str, resume: dict) -> dict: Builds the row of a parsed resume.
+    """
+
+    can_append = True
+    uses_scores = True
+
+    def __init__(self, path: str, chunk_size: int = None):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._is_open = False
+        self._chunk_index = 0
+        self._file_rows = 0
+
+    def add(self, platform: str, resume_link: str, document: dict, resume: dict) -> None:
+        row = self.get_row(platform, resume_link, resume)
+        with self._lock:
+            if self._is_open and self.chunk_size and self._file_rows >= self.chunk_size:
+                self._close_file()
+                self._is_open = False
+            if not self._is_open:
+                path = self._get_file_path()
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self._open_file(path)
+                self._is_open = True
+                self._file_rows = 0
+            self._write_row(row)
+            self._file_rows += 1
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._is_open:
+                self._flush_file()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._is_open:
+                self._close_file()
+                self._is_open = False
+
+    def __enter__(self) -> "ResumeExporter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def get_row(platform: str, resume_link: str, resume: dict) -> dict:
+        """
+        Builds the row of a parsed resume.
+
+        Args:
+            platform (str): The name of the platform of the resume.
+            resume_link (str): The URL of the resume.
+            resume (dict): The parsed resume.
+
+        Returns:
+            dict: The values of EXPORT_FIELDS. 'has_experience' and 'has_education' are None if the resume does not
+            have the sections, e.g. if it is uploaded as a file.
+        """
+
+        experience = resume.get("experience")
+        education = resume.get("education")
+        return {
+            "platform": platform,
+            "link": resume_link,
+            "position": resume.get("position"),
+            "points": resume.get("points"),
+            "matching_keywords": to_match_list(resume.get("matching_keywords")),
+            "matching_skills": to_match_list(resume.get("matching_skills")),
+            "is_file": bool(resume.get("is_file", False)),
+            "has_experience": None if experience is None else experience == ResumeStatus.EXPERIENCE_PROVIDED,
+            "has_education": None if education is None else education == ResumeStatus.EDUCATION_PROVIDED,
+            "experience_years": resume.get("experience_years"),
+            "salary": resume.get("salary"),
+            "currency": resume.get("currency"),
+            "city": resume.get("city"),
+            "updated_at": resume.get("updated_at"),
+            "parsed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+
+    def _get_file_path(self) -> str:
+        if not self.chunk_size and (self.can_append or not os.path.exists(self.path)):
+            return self.path
+        stem, extension = os.path.splitext(self.path)
+        if not self._chunk_index:
+            self._chunk_index = self._get_last_chunk_index(stem, extension)
+        self._chunk_index += 1
+        return f"{stem}-{self._chunk_index:05d}{extension}"
+
+    @staticmethod
+    def _get_last_chunk_index(stem: str, extension: str) -> int:
+        """
+        Finds the number of the last chunk written by earlier runs, or 0 if there are none.
+        """
+
+        directory, name = os.path.split(stem)
+        pattern = re.compile(rf"{re.escape(name)}-(\d{{5,}}){re.escape(extension)}")
+        try:
+            file_names = os.listdir(directory or ".")
+        except FileNotFoundError:
+            return 0
+        return max((int(match[1]) for file_name in file_names if (match := pattern.fullmatch(file_name))), default=0)
+
+    @abstractmethod
+    def _open_file(self, path: str) -> None:
+        pass
+
+    @abstractmethod
+    def _write_row(self, row: dict) -> None:
+        pass
+
+    @abstractmethod
+    def _flush_file(self) -> None:
+        pass
+
+    @abstractmethod
+    def _close_file(self) -> None:
+        pass
+
+
+class JsonlExporter(ResumeExporter):
+    """
+    Exporter of parsed resumes to JSON Lines files, one resume per line.
+    """
+
+    def _open_file(self, path: str) -> None:
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _write_row(self, row: dict) -> None:
+        self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def _flush_file(self) -> None:
+        self._file.flush()
+
+    def _close_file(self) -> None:
+        self._file.close()
+
+
+class CsvExporter(ResumeExporter):
+    """
+    Exporter of parsed resumes to CSV files with a header in every file. Lists of matches are joined with "; ".
+    Rows appended to a file of an earlier run must have the same columns.
+    """
+
+    def _open_file(self, path: str) -> None:
+        self._file = open(path, "a", encoding="utf-8", newline="")
+        self._csv_writer = csv.DictWriter(self._file, fieldnames=EXPORT_FIELDS)
+        if not self._file.tell():
+            self._csv_writer.writeheader()
+
+    def _write_row(self, row: dict) -> None:
+        row["matching_keywords"] = "; ".join(row["matching_keywords"])
+        row["matching_skills"] = "; ".join(row["matching_skills"])
+        self._csv_writer.writerow(row)
+
+    def _flush_file(self) -> None:
+        self._file.flush()
+
+    def _close_file(self) -> None:
+        self._file.close()
+
+
+class ParquetExporter(ResumeExporter):
+    """
+    Exporter of parsed resumes to Parquet files with typed columns, based on pyarrow, an optional dependency
+    installed with 'pip install pyarrow'.
+
+    Rows are buffered and written in row groups of 'row_group_size' rows, and on every flush, i.e. when a search
+    is parsed. A Parquet file is readable only when it is closed, so a long-running export needs 'chunk_size'.
+
+    Attributes:
+        row_group_size (int): The maximum number of buffered rows.
+    """
+
+    can_append = False
+
+    def __init__(self, path: str, chunk_size: int = None, row_group_size: int = 10000):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        super().__init__(path, chunk_size)
+        self.row_group_size = row_group_size
+        self._pa = pa
+        self._pq = pq
+        self._schema = pa.schema(
+            [
+                ("platform", pa.string()),
+                ("link", pa.string()),
+                ("position", pa.string()),
+                ("points", pa.int32()),
+                ("matching_keywords", pa.list_(pa.string())),
+                ("matching_skills", pa.list_(pa.string())),
+                ("is_file", pa.bool_()),
+                ("has_experience", pa.bool_()),
+                ("has_education", pa.bool_()),
+                ("experience_years", pa.float64()),
+                ("salary", pa.int64()),
+                ("currency", pa.string()),
+                ("city", pa.string()),
+                ("updated_at", pa.date32()),
+                ("parsed_at", pa.timestamp("s", tz="UTC")),
+            ]
+        )
+        self._rows = []
+
+    def _open_file(self, path: str) -> None:
+        self._writer = self._pq.ParquetWriter(path, self._schema)
+
+    def _write_row(self, row: dict) -> None:
+        row["updated_at"] = parse_iso_date(row["updated_at"])
+        row["parsed_at"] = datetime.fromisoformat(row["parsed_at"])
+        self._rows.append(row)
+        if len(self._rows) >= self.row_group_size:
+            self._flush_file()
+
+    def _flush_file(self) -> None:
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+    def _close_file(self) -> None:
+        self._flush_file()
+        self._writer.close()
+
+
+EXPORTERS = {".jsonl": JsonlExporter, ".csv": CsvExporter, ".parquet": ParquetExporter}
+
+
+def create_exporter(path: str, chunk_size: int = None) -> ResumeExporter:
+    """
+    Creates the exporter for the format given by the extension of the path.
+
+    Args:
+        path (str): The path to the output file, ending with ".jsonl", ".csv" or ".parquet".
+        chunk_size (int, optional): The maximum number of rows in a file. Defaults to None, one file.
+
+    Returns:
+        ResumeExporter: The exporter.
+
+    Raises:
+        ValueError: If the format is not supported.
+        ImportError: If the format needs an optional dependency that is not installed.
+    """
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXPORTERS:
+        raise ValueError(f"Unsupported export format {extension!r}, use one of {', '.join(EXPORTERS)}")
+    return EXPORTERS[extension](path, chunk_size)
+
+
+def to_match_list(value) -> list[str]:
+    """
+    Converts the matching keywords or skills of a parsed resume to a sorted list.
+
+    Args:
+        value (set | list | tuple | str | None): The matches, or a status message such as "no matches".
+
+    Returns:
+        list[str]: The sorted matches, or an empty list for a status message.
+    """
+
+    return sorted(value) if isinstance(value, (set, list, tuple)) else []
@@ -0,0 +1,139 @@
+import re
+from datetime import date, datetime
+
+_SALARY_PATTERN = re.compile(r"(\d[\d\s]*)\s*(грн|₴|\$|usd|€|eur)", re.IGNORECASE)
+_PERIOD_PATTERN = re.compile(r"\(([^()]*)\)")
+_YEARS_PATTERN = re.compile(r"(\d+)\s*(?:рік|роки|років)")
+_MONTHS_PATTERN = re.compile(r"(\d+)\s*(?:місяць|місяці|місяців)")
+_DATE_PATTERN = re.compile(r"(\d{1,2})\s+([а-яєіїґ']+)\s+(\d{4})", re.IGNORECASE)
+
+CURRENCIES = {"грн": "UAH", "₴": "UAH", "$": "USD", "usd": "USD", "€": "EUR", "eur": "EUR"}
+MONTHS = {
+    "січня": 1,
+    "лютого": 2,
+    "березня": 3,
+    "квітня": 4,
+    "травня": 5,
+    "червня": 6,
+    "липня": 7,
+    "серпня": 8,
+    "вересня": 9,
+    "жовтня": 10,
+    "листопада": 11,
+    "грудня": 12,
+}
+
+
+def parse_salary(text: str | None) -> tuple[int | None, str | None]:
+    """
+    Finds the expected salary in a text, e.g. "Python developer, 30 000 грн".
+
+    Args:
+        text (str | None): The text with the salary.
+
+    Returns:
+        tuple[int | None, str | None]: The salary and the ISO code of its currency, or Nones if there is no salary.
+    """
+
+    match = _SALARY_PATTERN.search(text or "")
+    if match is None:
+        return None, None
+    salary = int(re.sub(r"\D", "", match.group(1)))
+    return (salary, normalize_currency(match.group(2))) if salary else (None, None)
+
+
+def normalize_currency(currency: str | None) -> str | None:
+    """
+    Converts a currency sign or name to its ISO code.
+
+    Args:
+        currency (str | None): The currency sign or name, e.g. "грн" or "$".
+
+    Returns:
+        str | None: The ISO code, the currency as it is given if it is unknown, or None if it is empty.
+    """
+
+    if not currency:
+        return None
+    currency = currency.strip()
+    return CURRENCIES.get(currency.lower(), currency)
+
+
+def parse_experience_years(text: str | None) -> float | None:
+    """
+    Sums the periods of work given in parentheses, e.g. "(2 роки 3 місяці)", in a text.
+
+    Args:
+        text (str | None): The text of the work experience.
+
+    Returns:
+        float | None: The years of experience rounded to tenths, or None if no period is found.
+    """
+
+    months = None
+    for period in _PERIOD_PATTERN.findall(text or ""):
+        years_match = _YEARS_PATTERN.search(period)
+        months_match = _MONTHS_PATTERN.search(period)
+        if years_match is None and months_match is None:
+            continue
+        months = (months or 0) + 12 * int(years_match.group(1) if years_match else 0)
+        months += int(months_match.group(1) if months_match else 0)
+    return None if months is None else round(months / 12, 1)
+
+
+def get_years_between(start: str | None, end: str | None = None) -> float | None:
+    """
+    Counts the years between two ISO dates.
+
+    Args:
+        start (str | None): The start date, e.g. "2020-03-01" or "2020-03-01T00:00:00".
+        end (str | None, optional): The end date. Defaults to None, which means today.
+
+    Returns:
+        float | None: The years between the dates, or None if the start date is not a valid date.
+    """
+
+    start_date = parse_iso_date(start)
+    if start_date is None:
+        return None
+    end_date = parse_iso_date(end) or date.today()
+    return max(0.0, (end_date - start_date).days / 365.25)
+
+
+def parse_iso_date(value: str | None) -> date | None:
+    """
+    Parses the date part of an ISO date or date and time.
+
+    Args:
+        value (str | None): The date, e.g. "2024-03-05T10:00:00".
+
+    Returns:
+        date | None: The date, or None if the value is not a valid date.
+    """
+
+    try:
+        return datetime.strptime((value or "")[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def parse_ukrainian_date(text: str | None) -> str | None:
+    """
+    Finds a date written in Ukrainian, e.g. "5 березня 2024", in a text.
+
+    Args:
+        text (str | None): The text with the date.
+
+    Returns:
+        str | None: The date in the ISO format, or None if there is no valid date.
+    """
+
+    for day, month, year in _DATE_PATTERN.findall(text or ""):
+        month_number = MONTHS.get(month.lower())
+        if month_number is None:
+            continue
+        try:
+            return date(int(year), month_number, int(day)).isoformat()
+        except ValueError:
+            continue
+    return None
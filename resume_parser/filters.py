@@ -0,0 +1,96 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .dto import CriteriaDTO
+
+# The ranges of years of experience offered by the filters of the websites. A required experience selects
+# every range that contains it, as the searchers do.
+EXPERIENCE_RANGES = [(0, 0), (0, 1), (1, 2), (2, 5), (5, 10), (10, None)]
+# Salaries in other currencies are not compared, the filters of the websites are in hryvnias.
+SALARY_CURRENCY = "UAH"
+
+
+def has_filters(criteria: "CriteriaDTO") -> bool:
+    """
+    Checks if the criteria have the salary or experience filters.
+
+    Args:
+        criteria (CriteriaDTO): Criteria data transfer object containing search parameters.
+
+    Returns:
+        bool: True if any of the filters is set.
+    """
+
+    return criteria.salary_from is not None or criteria.salary_to is not None or criteria.experience is not None
+
+
+def without_filters(criteria: "CriteriaDTO") -> "CriteriaDTO":
+    """
+    Removes the salary and experience filters from the criteria, so the searchers do not set them on the websites.
+
+    Args:
+        criteria (CriteriaDTO): Criteria data transfer object containing search parameters.
+
+    Returns:
+        CriteriaDTO: A copy of the criteria without the filters.
+    """
+
+    return criteria.model_copy(update={"salary_from": None, "salary_to": None, "experience": None})
+
+
+def matches_filters(resume: dict, criteria: "CriteriaDTO") -> bool:
+    """
+    Checks the structured fields of a parsed resume or a document against the salary and experience filters.
+
+    A resume that does not state its salary or experience, or states the salary in another currency, matches
+    the filter, since it cannot be compared.
+
+    Args:
+        resume (dict): The parsed resume or the document with the 'salary', 'currency' and 'experience_years'.
+        criteria (CriteriaDTO): Criteria data transfer object containing search parameters.
+
+    Returns:
+        bool: True if the resume matches all filters of the criteria.
+    """
+
+    salary = resume.get("salary")
+    if salary is not None and resume.get("currency") in (None, SALARY_CURRENCY):
+        if criteria.salary_from is not None and salary < criteria.salary_from:
+            return False
+        if criteria.salary_to is not None and salary > criteria.salary_to:
+            return False
+
+    experience_years = resume.get("experience_years")
+    if criteria.experience is not None and experience_years is not None:
+        return any(
+            _is_in_range(experience_years, experience_range)
+            for experience_range in EXPERIENCE_RANGES
+            if _is_in_range(criteria.experience, experience_range)
+        )
+    return True
+
+
+def filter_resumes(resume_results: dict, criteria: "CriteriaDTO") -> dict:
+    """
+    Keeps the resumes that match the salary and experience filters of the criteria.
+
+    Args:
+        resume_results (dict): Parsed resumes by their links.
+        criteria (CriteriaDTO): Criteria data transfer object containing search parameters.
+
+    Returns:
+        dict: The matching resumes by their links.
+    """
+
+    if not has_filters(criteria):
+        return resume_results
+    return {resume_link: resume for resume_link, resume in resume_results.items() if matches_filters(resume, criteria)}
+
+
+def _is_in_range(years: float, experience_range: tuple[float, float | None]) -> bool:
+    low, high = experience_range
+    if low == high:
+        return years == low
+    # Ranges share their bounds, as the checkboxes on the websites do, except for no experience.
+    is_above_low = years > low if low == 0 else years >= low
+    return is_above_low and (high is None or years <= high)
@@ -0,0 +1,134 @@
+import threading
+from abc import ABCMeta, abstractmethod
+from urllib.parse import urlsplit
+
+from .exceptions import DocumentGoneError
+
+# Status codes of documents removed from the website, unlike errors and rate limits that may pass.
+GONE_STATUS_CODES = frozenset({404, 410})
+
+
+class HttpClientInterface(metaclass=ABCMeta):
+    """
+    Abstract base class for HTTP clients used by the parsers to download resumes.
+
+    Clients keep connections to a host alive between requests and are shared by all fetch workers of a parser,
+    so they must be thread-safe.
+
+    Methods:
+        fetch(url: str, headers: dict = None) -> bytes | None: Abstract method to download a document.
+        close() -> None: Abstract method to close all connections.
+    """
+
+    @abstractmethod
+    def fetch(self, url: str, headers: dict = None) -> bytes | None:
+        """
+        Abstract method to download a document.
+
+        Args:
+            url (str): The URL of the document.
+            headers (dict, optional): Request headers. Defaults to None.
+
+        Returns:
+            bytes | None: The content of the document, or None if the status code is other than 200.
+
+        Raises:
+            DocumentGoneError: If the status code is one of GONE_STATUS_CODES.
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Abstract method to close all connections.
+        """
+        pass
+
+
+class RequestsHttpClient(HttpClientInterface):
+    """
+    HTTP/1.1 client with keep-alive connection pools based on requests.
+
+    Attributes:
+        max_connections_per_host (int): The maximum number of connections to a host. Requests wait for a free
+            connection when all of them are busy.
+        timeout (float): The timeout of a request in seconds.
+
+    Methods:
+        fetch(url: str, headers: dict = None) -> bytes | None: Downloads a document.
+        close() -> None: Closes all connections.
+    """
+
+    def __init__(self, max_connections_per_host: int = 8, timeout: float = 30):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max_connections_per_host, pool_block=True)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def fetch(self, url: str, headers: dict = None) -> bytes | None:
+        with self._session.get(url, headers=headers, timeout=self.timeout) as response:
+            if response.status_code in GONE_STATUS_CODES:
+                raise DocumentGoneError()
+            if response.status_code != 200:
+                return None
+            return response.content
+
+    def close(self) -> None:
+        self._session.close()
+
+
+class Http2Client(HttpClientInterface):
+    """
+    HTTP/2 client based on httpx, an optional dependency installed with 'pip install httpx[http2]'.
+
+    Concurrent requests to a host are multiplexed as streams over a few keep-alive connections, so many small
+    documents are downloaded without a TLS handshake per request. Every host has its own connection pool.
+
+    Attributes:
+        max_connections_per_host (int): The maximum number of connections to a host.
+        timeout (float): The timeout of a request in seconds.
+
+    Methods:
+        fetch(url: str, headers: dict = None) -> bytes | None: Downloads a document.
+        close() -> None: Closes all connections.
+    """
+
+    def __init__(self, max_connections_per_host: int = 2, timeout: float = 30):
+        # httpx fails only on the first request without h2, so its absence is checked here.
+        import h2  # noqa: F401
+        import httpx
+
+        self._httpx = httpx
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str, headers: dict = None) -> bytes | None:
+        response = self._get_client(urlsplit(url).netloc).get(url, headers=headers)
+        if response.status_code in GONE_STATUS_CODES:
+            raise DocumentGoneError()
+        if response.status_code != 200:
+            return None
+        return response.content
+
+    def close(self) -> None:
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+    def _get_client(self, host: str):
+        with self._lock:
+            if host not in self._clients:
+                limits = self._httpx.Limits(
+                    max_connections=self.max_connections_per_host,
+                    max_keepalive_connections=self.max_connections_per_host,
+                )
+                self._clients[host] = self._httpx.Client(http2=True, limits=limits, timeout=self.timeout)
+            return self._clients[host]
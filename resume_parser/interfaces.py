@@ -1,15 +1,32 @@
+import heapq
+import logging
+import threading
 from abc import ABCMeta, abstractmethod
+from time import sleep
+from typing import TYPE_CHECKING
 
-import fake_useragent
-from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.support.ui import Select
-
+from .budget import SearchBudget
+from .cancellation import CancellationToken
 from .constants import ResumeStatus
-from .dto import CriteriaDTO
-from .exceptions import ResumeNotFoundError
+from .deduplication import MinHash
+from .exceptions import DocumentGoneError, ResumeNotFoundError
+from .http_client import HttpClientInterface, RequestsHttpClient
+from .pipeline import ResumePipeline
+from .user_agents import user_agent_provider
+
+if TYPE_CHECKING:
+    from selenium.webdriver import ChromeOptions
+    from selenium.webdriver.remote.webelement import WebElement
+    from selenium.webdriver.support.ui import Select
+
+    from .corpus import ResumeCorpus
+    from .dto import CriteriaDTO
+
+logger = logging.getLogger(__name__)
+_min_hash = MinHash()
+
+# Fields of documents that are copied to parsed resumes as they are, for filtering and export.
+STRUCTURED_FIELDS = ("experience_years", "salary", "currency", "city", "updated_at")
 
 
 class ResumeSearcherInterface(metaclass=ABCMeta):
@@ -18,39 +35,105 @@ class ResumeSearcherInterface(metaclass=ABCMeta):
 
     Attributes:
     - browser (WebDriver): Instance of Selenium WebDriver.
+    - resume_links (list[str]): Links to the found resumes.
+    - resume_cards (dict[str, dict]): The 'title' and the 'text' of the result card of every found resume,
+      by the resume link.
+    - cancellation_token (CancellationToken | None): The cancellation of the search. The browser is closed as
+      soon as the search is cancelled.
 
     Methods:
 
-    - __init__(): Initializes the WebDriver.
-    - set_params(params: CriteriaDTO): Abstract method to set the search parameters for searching resumes.
+    - __init__(cancellation_token: CancellationToken = None): Initializes the WebDriver.
+    - close() -> None: Closes the browser.
+    - _create_browser_options() -> ChromeOptions: Creates the options of the browser.
+    - _sleep(seconds: float) -> None: Waits for the page, unless the search is cancelled.
+    - set_params(params: CriteriaDTO, budget: SearchBudget = None): Abstract method to set the search parameters
+      for searching resumes.
     - _try_find_element_by_xpath(xpath: str) -> WebElement: Tries to find an element on the page by XPath.
     - _try_select_by_value(select: Select, value: str) -> None: Tries to select an option by value from a dropdown menu.
     """
 
-    def __init__(self):
+    def __init__(self, cancellation_token: CancellationToken = None):
         """
         Initializes the WebDriver.
+
+        Args:
+            cancellation_token (CancellationToken, optional): The cancellation of the search. Defaults to None.
         """
 
+        from selenium import webdriver
+
         self._resume_links = []
-        self.browser = webdriver.Chrome()
+        self._resume_cards = {}
+        self._browser_lock = threading.Lock()
+        self.cancellation_token = cancellation_token
+        self.browser = webdriver.Chrome(options=self._create_browser_options())
+        if cancellation_token:
+            cancellation_token.add_callback(self.close)
         self.browser.maximize_window()
 
+    def close(self) -> None:
+        """
+        Closes the browser if it is not closed yet. It may be called from another thread, e.g. on cancellation,
+        then WebDriver commands running in the search thread fail.
+        """
+
+        with self._browser_lock:
+            browser, self.browser = self.browser, None
+        if browser is not None:
+            try:
+                browser.quit()
+            except Exception:
+                logger.warning("Failed to close the browser", exc_info=True)
+
+    def _sleep(self, seconds: float) -> None:
+        """
+        Waits for the page, unless the search is cancelled.
+
+        Args:
+            seconds (float): The duration of the wait in seconds.
+
+        Raises:
+            SearchCancelledError: If the search is cancelled.
+        """
+
+        if self.cancellation_token:
+            self.cancellation_token.sleep(seconds)
+        else:
+            sleep(seconds)
+
+    def _create_browser_options(self) -> "ChromeOptions":
+        """
+        Creates the options of the browser. Searchers override it to enable browser features they need.
+
+        Returns:
+            ChromeOptions: The options of the browser.
+        """
+
+        from selenium import webdriver
+
+        return webdriver.ChromeOptions()
+
     @property
     def resume_links(self):
         return self._resume_links
 
+    @property
+    def resume_cards(self):
+        return self._resume_cards
+
     @abstractmethod
-    def set_params(self, params: CriteriaDTO):
+    def set_params(self, params: "CriteriaDTO", budget: SearchBudget = None):
         """
         Abstract method to set the search parameters for searching resumes.
 
         Args:
             params (CriteriaDTO): Criteria data transfer object containing search parameters.
+            budget (SearchBudget, optional): Limits of the search. Defaults to None.
         """
         pass
 
-    def _try_find_element_by_xpath(self, xpath: str) -> WebElement:
+    def _try_find_element_by_xpath(self, xpath: str) -> "WebElement":
         """
         Tries to find an element on the page by XPath.
 
@@ -63,6 +146,10 @@ class ResumeSearcherInterface(metaclass=ABCMeta):
         Raises:
             ResumeNotFoundError: If the element is not found or not enabled.
         """
+
+        from selenium.common.exceptions import NoSuchElementException
+        from selenium.webdriver.common.by import By
+
         try:
             element = self.browser.find_element(By.XPATH, xpath)
         except NoSuchElementException:
@@ -73,7 +160,7 @@ class ResumeSearcherInterface(metaclass=ABCMeta):
             return element
 
     @staticmethod
-    def _try_select_by_value(select: Select, value: str) -> None:
+    def _try_select_by_value(select: "Select", value: str) -> None:
         """
         Tries to select an option by value from a dropdown menu.
 
@@ -84,42 +171,450 @@ class ResumeSearcherInterface(metaclass=ABCMeta):
         Raises:
             ResumeNotFoundError: If the option is not found.
         """
+
+        from selenium.common.exceptions import NoSuchElementException
+
         try:
             select.select_by_value(value)
         except NoSuchElementException:
             raise ResumeNotFoundError()
 
 
+class ResumeSinkInterface(metaclass=ABCMeta):
+    """
+    Abstract base class for receivers of parsed resumes, e.g. the local resume corpus.
+
+    Parsers pass every parsed resume to their sinks as soon as it is ready. Sinks may buffer resumes and write
+    them in 'flush', which is called when the parser is done.
+
+    Attributes:
+        uses_scores (bool): Whether the sink keeps the scored resume, not only the document. Such sinks get
+            the resumes of a shared search from every search that uses it, scored with its own keywords.
+
+    Methods:
+        add(platform: str, resume_link: str, document: dict, resume: dict) -> None: Abstract method to receive
+            a parsed resume.
+        flush() -> None: Writes buffered resumes.
+    """
+
+    uses_scores = False
+
+    @abstractmethod
+    def add(self, platform: str, resume_link: str, document: dict, resume: dict) -> None:
+        """
+        Abstract method to receive a parsed resume.
+
+        Args:
+            platform (str): The name of the platform of the resume.
+            resume_link (str): The URL of the resume.
+            document (dict): The fields extracted from the resume that do not depend on the search criteria.
+            resume (dict): The resume scored for the search criteria.
+        """
+        pass
+
+    def flush(self) -> None:
+        """
+        Writes buffered resumes. Does nothing by default.
+        """
+        pass
+
+
 class ResumeParserInterface(metaclass=ABCMeta):
     """
     An abstract base class for parsing resumes.
 
+    Resumes are processed by a pipeline: I/O workers download resumes with '_fetch_resume', and the downloaded
+    content is parsed with '_parse_resume', in a process pool if 'parse_workers' is not 0.
+
+    Parsing has two steps. '_extract_document' extracts the fields of a resume that do not depend on the search
+    criteria, and 'score_document' matches them with the required keywords. Documents are passed to the sinks,
+    so stored resumes can be scored again for other criteria without downloading them.
+
     Attributes:
-        user_agent (fake_useragent.UserAgent): An instance of the UserAgent class for generating random user agents.
+        user_agent (UserAgentProvider): The shared pool of user agents for generating random user agents.
         resume_results (dict): A dictionary to store parsed resume results.
+        gone_links (set[str]): The links of resumes that no longer exist on the website.
+        fetch_workers (int): The number of concurrent downloads, 'default_fetch_workers' if not given or None.
+        parse_workers (int | None): The number of parser processes, 'default_parse_workers' if not given or None.
+            0 means parsing in the calling thread, a default of None means one process per CPU core.
+        max_results (int | None): The maximum number of the most relevant resumes kept in 'resume_results'.
+            None keeps every parsed resume.
+        http_client (HttpClientInterface): The HTTP client shared by the fetch workers.
+        sinks (list[ResumeSinkInterface]): Receivers of every parsed resume.
+        early_stop_slack (int | None): How many more keywords than its result card shows a resume is assumed
+            to contain at most, for the early stop. None disables the early stop.
+        shortlist_size (int | None): The number of resumes downloaded of the ones with result cards, those whose
+            cards show the most required keywords. None downloads every resume.
+        cancellation_token (CancellationToken | None): The cancellation of the search. Downloads stop as soon as
+            the search is cancelled, and the HTTP client created by the parser is closed.
+        resume_cache (ResumeCorpus | None): The corpus whose recently fetched documents are scored instead of
+            downloading the resumes again.
+        resume_cache_max_age (float | None): The maximum age of a cached document in seconds.
+        platform (str): The name of the platform, one of the PLATFORMS keys.
+        default_fetch_workers (int): The number of concurrent downloads of the platform by default.
+        default_parse_workers (int | None): The number of parser processes of the platform by default.
 
     Methods:
-        __init__(): Initializes the ResumeParserInterface class.
-        pars_resumes(resume_links: list[str], params: CriteriaDTO) -> None: Abstract method to parse resumes.
+        __init__(fetch_workers: int | None = None, parse_workers: int | None = None, max_results: int | None = None,
+            http_client: HttpClientInterface = None, sinks: list[ResumeSinkInterface] = None,
+            early_stop_slack: int | None = None, shortlist_size: int | None = None,
+            cancellation_token: CancellationToken = None, resume_cache: ResumeCorpus = None,
+            resume_cache_max_age: float | None = None): Initializes the ResumeParserInterface class.
+        pars_resumes(resume_links: list[str], params: CriteriaDTO, budget: SearchBudget = None,
+            resume_cards: dict = None) -> None: Parses resumes and populates 'resume_results'.
+        order_resume_links(resume_links: list[str], required_keywords: list[str], resume_cards: dict = None,
+            shortlist_size: int | None = None) -> tuple[list[str], dict]: Orders resume links for fetching by
+            their result cards.
+        get_card_score(card: dict | None, required_keywords: list[str]) -> int | None: Counts the required
+            keywords shown on the result card of a resume.
+        _create_http_client() -> HttpClientInterface: Creates the HTTP client if none is provided.
+        _fetch_resume(resume_link: str) -> bytes | None: Abstract method to download a resume.
+        _parse_resume(content: bytes, required_keywords: list[str]) -> dict: Parses a resume and scores it.
+        _extract_document(content: bytes) -> dict: Abstract method to extract the fields of a resume.
+        _get_structured_fields(document: dict) -> dict: Gets the structured fields of a document.
+        restore_document(document: dict) -> dict: Restores a document decoded from JSON.
+        score_document(document: dict, required_keywords: list[str]) -> dict: Abstract method to match
+            the fields of a resume with the required keywords.
+        get_relevant_resumes(max_count: int) -> dict: Retrieves the most relevant resumes based on their points.
+        rank_resumes(resume_results: dict, max_count: int) -> dict: Sorts parsed resumes by their points.
     """
 
-    def __init__(self):
-        self.user_agent = fake_useragent.UserAgent()
+    platform = None
+    default_fetch_workers = 4
+    default_parse_workers = 0
+
+    def __init__(
+        self,
+        fetch_workers: int | None = None,
+        parse_workers: int | None = None,
+        max_results: int | None = None,
+        http_client: HttpClientInterface = None,
+        sinks: list[ResumeSinkInterface] = None,
+        early_stop_slack: int | None = None,
+        shortlist_size: int | None = None,
+        cancellation_token: CancellationToken = None,
+        resume_cache: "ResumeCorpus" = None,
+        resume_cache_max_age: float | None = None,
+    ):
+        self.user_agent = user_agent_provider
         self.resume_results = {}
-
-    @abstractmethod
-    def pars_resumes(self, resume_links: list[str], params: CriteriaDTO) -> None:
+        self.gone_links = set()
+        self.fetch_workers = self.default_fetch_workers if fetch_workers is None else fetch_workers
+        self.parse_workers = self.default_parse_workers if parse_workers is None else parse_workers
+        self.max_results = max_results
+        self._owns_http_client = http_client is None
+        self.http_client = http_client or self._create_http_client()
+        self.sinks = sinks or []
+        self.early_stop_slack = early_stop_slack
+        self.shortlist_size = shortlist_size
+        self.cancellation_token = cancellation_token
+        self.resume_cache = resume_cache
+        self.resume_cache_max_age = resume_cache_max_age
+
+    def pars_resumes(
+        self, resume_links: list[str], params: "CriteriaDTO", budget: SearchBudget = None, resume_cards: dict = None
+    ) -> None:
         """
-        Abstract method to parse resumes.
+        Parses resumes from the provided list of resume links and extracts relevant information.
 
         Args:
             resume_links (list[str]): A list of URLs pointing to resumes to be parsed.
             params (CriteriaDTO): An instance of the CriteriaDTO class containing search parameters.
+            budget (SearchBudget, optional): Limits of the search. When the budget is exhausted, the remaining
+                links are skipped and the results parsed so far are kept. Defaults to None.
+            resume_cards (dict, optional): The result cards of the resumes by their links, as collected by
+                the searcher. Resumes whose cards show more required keywords are fetched first. Defaults to None.
+
+        Returns:
+            None: The method does not return a value directly, but populates the 'resume_results' dictionary
+            in the order of fetching.
+
+        Raises:
+            SearchCancelledError: If the search is cancelled. The resumes parsed so far are kept.
+
+        Note:
+            If a resume is not accessible, it skips to the next resume link. Links of resumes that no longer
+            exist are added to 'gone_links'.
+            If 'max_results' is set, only the most relevant resumes are kept while parsing, so the memory used by
+            the results does not grow with the number of links. Of resumes with equal points, the earlier ones
+            are kept, as in 'rank_resumes'.
+            If 'max_results' and 'early_stop_slack' are set, fetching stops when no remaining resume can have
+            more points than the kept ones. A remaining resume is assumed to have at most 'early_stop_slack'
+            more keywords than its card shows, so a slack of the number of keywords makes the stop exact.
+            If 'shortlist_size' is set, resumes are scored by their cards first, and only the shortlist of
+            the best ones is downloaded. Resumes without a card are always downloaded.
+            If 'resume_cache' and 'resume_cache_max_age' are set, resumes fetched recently are scored from
+            the cache instead of being downloaded. They are not added to the cache again.
+        """
+
+        if budget:
+            budget.start()
+        if self.cancellation_token and self._owns_http_client:
+            # Closing the client releases its connections and interrupts the downloads it can.
+            self.cancellation_token.add_callback(self.http_client.close)
+
+        required_keywords = params.skills_and_keywords or []
+        resume_links, card_scores = self.order_resume_links(
+            resume_links, required_keywords, resume_cards, self.shortlist_size
+        )
+
+        max_points = len(set(required_keywords)) + 2
+        min_kept_points = None
+
+        def get_max_points(resume_link: str) -> int:
+            card_score = card_scores.get(resume_link)
+            if card_score is None:
+                return max_points
+            return min(max_points, card_score + self.early_stop_slack + 2)
+
+        def should_stop(loaded_resumes: int) -> bool:
+            if self.cancellation_token and self.cancellation_token.is_cancelled:
+                return True
+            if budget and not budget.can_load_resume(loaded_resumes):
+                return True
+            if min_kept_points is None or loaded_resumes >= len(resume_links):
+                return False
+            if min_kept_points >= get_max_points(resume_links[loaded_resumes]):
+                logger.info("Early stop after %d of %d resumes", loaded_resumes, len(resume_links))
+                return True
+            return False
+
+        cached_documents = {}
+        if self.resume_cache is not None and self.resume_cache_max_age:
+            cached_documents = self.resume_cache.get_documents(resume_links, self.resume_cache_max_age)
+            if cached_documents:
+                logger.info("%d of %d resumes are cached", len(cached_documents), len(resume_links))
+
+        def fetch(resume_link: str) -> bytes | dict | None:
+            document = cached_documents.get(resume_link)
+            if document is not None:
+                return document
+            try:
+                return self._fetch_resume(resume_link)
+            except DocumentGoneError:
+                self.gone_links.add(resume_link)
+                return None
+
+        pipeline = ResumePipeline(
+            fetch, self._parse_resume, fetch_workers=self.fetch_workers, parse_workers=self.parse_workers
+        )
+        is_early_stop = self.max_results is not None and self.early_stop_slack is not None
+        link_positions = {resume_link: position for position, resume_link in enumerate(resume_links)}
+
+        # Min-heap of (points, -position, link, resume): the least relevant kept resume is on top.
+        kept_resumes = []
+        try:
+            is_cancelled = (lambda: self.cancellation_token.is_cancelled) if self.cancellation_token else None
+            for resume_link, resume in pipeline.run(
+                resume_links, (params.skills_and_keywords,), should_stop, is_cancelled
+            ):
+                if self.cancellation_token:
+                    self.cancellation_token.raise_if_cancelled()
+                document = resume.pop("document")
+                # Resumes without a city are found by the location filter of the search.
+                document["city"] = document.get("city") or params.location
+                for sink in self.sinks:
+                    if sink is not self.resume_cache or resume_link not in cached_documents:
+                        sink.add(self.platform, resume_link, document, resume)
+
+                item = (resume["points"], -link_positions[resume_link], resume_link, resume)
+                if self.max_results is None or len(kept_resumes) < self.max_results:
+                    heapq.heappush(kept_resumes, item)
+                elif item[:2] > kept_resumes[0][:2]:
+                    heapq.heapreplace(kept_resumes, item)
+                if is_early_stop and len(kept_resumes) >= self.max_results:
+                    min_kept_points = kept_resumes[0][0]
+        finally:
+            for _, _, resume_link, resume in sorted(kept_resumes, key=lambda item: -item[1]):
+                self.resume_results[resume_link] = resume
+            if self._owns_http_client:
+                self.http_client.close()
+            for sink in self.sinks:
+                sink.flush()
+        if self.cancellation_token:
+            self.cancellation_token.raise_if_cancelled()
+
+    @classmethod
+    def order_resume_links(
+        cls,
+        resume_links: list[str],
+        required_keywords: list[str],
+        resume_cards: dict = None,
+        shortlist_size: int | None = None,
+    ) -> tuple[list[str], dict]:
+        """
+        Orders resume links for fetching by the required keywords shown on their result cards.
+
+        Args:
+            resume_links (list[str]): Links to the found resumes.
+            required_keywords (list[str]): List of required skills and keywords.
+            resume_cards (dict, optional): The result cards of the resumes by their links. Defaults to None,
+                when the order is kept.
+            shortlist_size (int | None, optional): The number of resumes with cards to keep. Defaults to None,
+                when every resume is kept.
+
+        Returns:
+            tuple[list[str], dict]: The links in the order of fetching, resumes without a card first, and
+            the card scores by the links.
+        """
+
+        if not resume_cards:
+            return resume_links, {}
+
+        card_scores = {
+            resume_link: cls.get_card_score(resume_cards.get(resume_link), required_keywords)
+            for resume_link in resume_links
+        }
+        # Resumes without a card are fetched first, nothing is known about them.
+        resume_links = sorted(resume_links, key=lambda link: -1 if card_scores[link] is None else -card_scores[link])
+        if shortlist_size is not None:
+            without_card_count = sum(1 for card_score in card_scores.values() if card_score is None)
+            shortlist_count = without_card_count + shortlist_size
+            if len(resume_links) > shortlist_count:
+                logger.info("Shortlisted %d of %d resumes by their cards", shortlist_count, len(resume_links))
+                resume_links = resume_links[:shortlist_count]
+        return resume_links, card_scores
+
+    def _create_http_client(self) -> HttpClientInterface:
+        """
+        Creates the HTTP client if none is provided, with a keep-alive connection for every fetch worker.
+
+        Returns:
+            HttpClientInterface: The HTTP client.
+        """
+
+        return RequestsHttpClient(max_connections_per_host=self.fetch_workers)
 
-        This method should be implemented by subclasses to parse resumes and extract relevant information.
+    @staticmethod
+    def get_card_score(card: dict | None, required_keywords: list[str]) -> int | None:
+        """
+        Counts the required keywords shown on the result card of a resume, a cheap estimate of its relevance.
+
+        Args:
+            card (dict | None): The 'title' and the 'text' of the card.
+            required_keywords (list[str]): List of required skills and keywords.
+
+        Returns:
+            int | None: The number of the required keywords on the card, or None if the card is unknown.
+        """
+
+        if card is None:
+            return None
+        card_text = f"{card.get('title') or ''} {card.get('text') or ''}".lower()
+        return sum(1 for keyword in set(required_keywords) if keyword.lower() in card_text)
+
+    @abstractmethod
+    def _fetch_resume(self, resume_link: str) -> bytes | None:
+        """
+        Abstract method to download a resume.
+
+        Args:
+            resume_link (str): The URL of the resume.
+
+        Returns:
+            bytes | None: The content of the resume, or None if the resume is not accessible.
+        """
+        pass
+
+    @classmethod
+    def _parse_resume(cls, content: bytes | dict, required_keywords: list[str] = None) -> dict:
+        """
+        Parses a downloaded resume and matches it with the required keywords.
+
+        It runs in parser worker processes, so it must not use the state of the parser instance.
+
+        Args:
+            content (bytes | dict): The content of the resume returned by '_fetch_resume', or its cached document.
+            required_keywords (list[str]): List of required skills and keywords.
+
+        Returns:
+            dict: The parsed resume with its points. The extracted document is under the 'document' key,
+            'pars_resumes' passes it to the sinks and removes it.
+        """
+
+        document = content if isinstance(content, dict) else cls._extract_document(content)
+        resume = cls.score_document(document, required_keywords)
+        resume["document"] = document
+        return resume
+
+    @classmethod
+    @abstractmethod
+    def _extract_document(cls, content: bytes) -> dict:
+        """
+        Abstract method to extract the fields of a resume that do not depend on the search criteria.
+
+        Args:
+            content (bytes): The content of the resume returned by '_fetch_resume'.
+
+        Returns:
+            dict: The document of the resume. Its values must be JSON serializable, except for the 'fingerprint'
+            tuple. It contains the STRUCTURED_FIELDS: 'experience_years', 'salary' with its 'currency' ISO code,
+            'city' and the date of the last update, 'updated_at', in the ISO format. They are None if the resume
+            does not state them.
+        """
+        pass
+
+    @classmethod
+    @abstractmethod
+    def score_document(cls, document: dict, required_keywords: list[str] = None) -> dict:
+        """
+        Abstract method to match the document of a resume with the required keywords.
+
+        Args:
+            document (dict): The document returned by '_extract_document'.
+            required_keywords (list[str]): List of required skills and keywords.
+
+        Returns:
+            dict: The parsed resume with its points and the STRUCTURED_FIELDS of the document.
         """
         pass
 
+    @staticmethod
+    def _get_structured_fields(document: dict) -> dict:
+        """
+        Gets the structured fields of a document. Documents stored before a field was added do not have it.
+
+        Args:
+            document (dict): The document of the resume.
+
+        Returns:
+            dict: The STRUCTURED_FIELDS of the document, None for missing ones.
+        """
+
+        return {field: document.get(field) for field in STRUCTURED_FIELDS}
+
+    @staticmethod
+    def restore_document(document: dict) -> dict:
+        """
+        Restores a document decoded from JSON, e.g. from the corpus or a work queue: JSON has no tuples, so its
+        fingerprint is a list, which cannot be hashed by the deduplication.
+
+        Args:
+            document (dict): The decoded document, changed in place.
+
+        Returns:
+            dict: The document with the 'fingerprint' tuple.
+        """
+
+        if document.get("fingerprint") is not None:
+            document["fingerprint"] = tuple(document["fingerprint"])
+        return document
+
+    @staticmethod
+    def _get_fingerprint(position: str, text: str):
+        """
+        Builds the MinHash fingerprint of a resume used to find the same candidate on different platforms.
+
+        Args:
+            position (str): The position from the resume.
+            text (str): The description text of the resume.
+
+        Returns:
+            tuple[int, ...] | None: The fingerprint, or None if the resume text is too short to compare.
+        """
+
+        return _min_hash.signature(f"{position} {text}")
+
     @staticmethod
     def _get_resume_points(resume: dict):
         """
@@ -149,6 +644,22 @@ class ResumeParserInterface(metaclass=ABCMeta):
         Args:
             max_count (int): The maximum number of relevant resumes to retrieve.
 
+        Returns:
+            dict: A dictionary containing the top relevant resumes and their corresponding
+            information, sorted by relevance.
+        """
+
+        return self.rank_resumes(self.resume_results, max_count)
+
+    @staticmethod
+    def rank_resumes(resume_results: dict, max_count: int):
+        """
+        Sorts parsed resumes by their points and keeps the most relevant ones.
+
+        Args:
+            resume_results (dict): Parsed resumes by their links, possibly from several parsers.
+            max_count (int): The maximum number of relevant resumes to retrieve.
+
         Returns:
             dict: A dictionary containing the top relevant resumes and their corresponding
             information, sorted by relevance.
@@ -156,7 +667,7 @@ class ResumeParserInterface(metaclass=ABCMeta):
             the function returns all sorted resumes. Otherwise, it returns only the top resumes.
         """
 
-        sorted_resume_results = sorted(self.resume_results.items(), key=lambda x: x[1]["points"], reverse=True)
+        sorted_resume_results = sorted(resume_results.items(), key=lambda x: x[1]["points"], reverse=True)
 
         if max_count >= len(sorted_resume_results):
             return dict(sorted_resume_results)
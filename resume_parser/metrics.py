@@ -0,0 +1,121 @@
+import logging
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def measure(stage: str):
+    """
+    Measures the duration of a stage and reports it to the log.
+
+    Args:
+        stage (str): The name of the stage.
+
+    Yields:
+        dict: The measurement, its 'duration' in seconds is set when the stage is over.
+    """
+
+    measurement = {"stage": stage}
+    started_at = perf_counter()
+    try:
+        yield measurement
+    finally:
+        measurement["duration"] = perf_counter() - started_at
+        logger.info("%s took %.1f ms", stage, measurement["duration"] * 1000)
+
+
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+
+
+@contextmanager
+def measure_memory(stage: str, interval: float = 0.05, trace_allocations: bool = False):
+    """
+    Samples the memory of the process during a stage and reports its peak to the log.
+
+    The resident set size (RSS) is sampled by a background thread. Parser worker processes are not included.
+    With 'trace_allocations', the peak of memory allocated by Python is also measured with tracemalloc, which
+    slows allocations down, so it is meant for diagnostics. Stages measured at the same time share the tracing,
+    so the peak of a stage may include allocations of the others.
+
+    Args:
+        stage (str): The name of the stage.
+        interval (float, optional): The interval between RSS samples in seconds. Defaults to 0.05.
+        trace_allocations (bool, optional): Whether to measure allocations with tracemalloc. Defaults to False.
+
+    Yields:
+        dict: The measurement, its 'peak_rss' and 'peak_traced' in bytes are set when the stage is over.
+        They are None if the value is not available.
+    """
+
+    measurement = {"stage": stage, "peak_rss": get_rss(), "peak_traced": None}
+    stop_event = threading.Event()
+
+    def sample_rss():
+        while not stop_event.wait(interval):
+            rss = get_rss()
+            if rss is not None and rss > (measurement["peak_rss"] or 0):
+                measurement["peak_rss"] = rss
+
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sampler.start()
+    if trace_allocations:
+        _start_tracing()
+    try:
+        yield measurement
+    finally:
+        stop_event.set()
+        sampler.join()
+        rss = get_rss()
+        if rss is not None and rss > (measurement["peak_rss"] or 0):
+            measurement["peak_rss"] = rss
+        if trace_allocations:
+            measurement["peak_traced"] = _stop_tracing()
+        logger.info(
+            "%s peak memory: RSS %s, Python allocations %s",
+            stage,
+            _format_size(measurement["peak_rss"]),
+            _format_size(measurement["peak_traced"]),
+        )
+
+
+def get_rss() -> int | None:
+    """
+    Returns the current resident set size of the process.
+
+    Returns:
+        int | None: The RSS in bytes, or None if it cannot be read on this system.
+    """
+
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _start_tracing() -> None:
+    global _tracing_users
+    with _tracing_lock:
+        if not _tracing_users:
+            tracemalloc.start()
+        _tracing_users += 1
+
+
+def _stop_tracing() -> int:
+    global _tracing_users
+    with _tracing_lock:
+        peak = tracemalloc.get_traced_memory()[1]
+        _tracing_users -= 1
+        if not _tracing_users:
+            tracemalloc.stop()
+        return peak
+
+
+def _format_size(size: int | None) -> str:
+    return "n/a" if size is None else f"{size / 2**20:.1f} MiB"
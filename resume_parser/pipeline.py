@@ -0,0 +1,215 @@
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Iterable, Iterator
+
+_parse_pools = {}
+_parse_pools_lock = threading.Lock()
+_DONE = object()
+_POLL_INTERVAL = 0.05
+
+
+def get_parse_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Returns the shared process pool of parser workers of the given size, creating it on first use.
+
+    The pool is reused by all searches of the process, so worker processes are started only once. Workers are
+    started by a fork server, which is safe in the multithreaded bot process.
+
+    Args:
+        workers (int): The number of worker processes.
+
+    Returns:
+        ProcessPoolExecutor: The process pool.
+    """
+
+    with _parse_pools_lock:
+        if workers not in _parse_pools:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _parse_pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        return _parse_pools[workers]
+
+
+class ResumePipeline:
+    """
+    Two-stage pipeline of resume processing: fetching pages and parsing them.
+
+    I/O workers (threads) download resume pages into a bounded queue. Downloaded pages are parsed by a process
+    pool, so CPU-bound extraction and matching run on every core while the network is busy with the next pages.
+    The stages are connected with backpressure: fetchers wait while the queue is full, and no more pages are
+    taken from the queue while every parser worker has enough work.
+
+    A cancelled run stops within the polling interval of the queue and does not wait for the downloads in
+    progress, their fetchers exit when the downloads return.
+
+    Attributes:
+        fetch (Callable[[str], object]): Downloads a resume by its link and returns its content, or None if
+            the resume is not available.
+        parse (Callable[..., dict]): Parses the content of a resume. It must be picklable when 'parse_workers'
+            is not 0.
+        fetch_workers (int): The number of I/O workers.
+        parse_workers (int): The number of parser processes. 0 means parsing in the calling thread.
+        queue_size (int): The maximum number of downloaded pages waiting for parsing.
+
+    Methods:
+        run(resume_links: Iterable[str], parse_args: tuple, should_stop: Callable[[int], bool],
+            is_cancelled: Callable[[], bool]) -> Iterator[tuple[str, dict]]: Processes resumes and yields
+            the results as they are ready.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], object],
+        parse: Callable[..., dict],
+        fetch_workers: int = 4,
+        parse_workers: int = None,
+        queue_size: int = 32,
+    ):
+        self.fetch = fetch
+        self.parse = parse
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = (os.cpu_count() or 1) if parse_workers is None else parse_workers
+        self.queue_size = queue_size
+
+    def run(
+        self,
+        resume_links: Iterable[str],
+        parse_args: tuple = (),
+        should_stop: Callable[[int], bool] = None,
+        is_cancelled: Callable[[], bool] = None,
+    ) -> Iterator[tuple[str, dict]]:
+        """
+        Processes resumes and yields the results as they are ready.
+
+        Args:
+            resume_links (Iterable[str]): Links to the resumes.
+            parse_args (tuple, optional): Additional arguments passed to 'parse' after the content.
+            should_stop (Callable[[int], bool], optional): Called with the number of resumes taken for fetching
+                before each next one. When it returns True, no more resumes are fetched. Defaults to None.
+            is_cancelled (Callable[[], bool], optional): Checked while waiting for downloaded pages. When it
+                returns True, the run stops without parsing the downloaded pages. Defaults to None.
+
+        Yields:
+            tuple[str, dict]: The link and the parsed result of a resume, in the order of completion.
+
+        Raises:
+            Exception: The first error raised by 'fetch' or 'parse'. Fetching stops after an error. Errors of
+                'fetch' are not raised if the run is cancelled.
+        """
+
+        links = iter(resume_links)
+        links_lock = threading.Lock()
+        taken_count = 0
+        stop_event = threading.Event()
+        closed_event = threading.Event()
+        fetch_errors = []
+        pages = queue.Queue(maxsize=self.queue_size)
+
+        def take_link() -> str | None:
+            nonlocal taken_count
+            with links_lock:
+                if stop_event.is_set() or (should_stop and should_stop(taken_count)):
+                    stop_event.set()
+                    return None
+                link = next(links, None)
+                if link is not None:
+                    taken_count += 1
+                return link
+
+        def put_page(item: object) -> None:
+            # Pages are dropped once nothing reads the queue, so no fetcher stays blocked on a full queue.
+            while not closed_event.is_set():
+                try:
+                    pages.put(item, timeout=_POLL_INTERVAL)
+                    return
+                except queue.Full:
+                    pass
+
+        def fetch_pages() -> None:
+            try:
+                while (link := take_link()) is not None:
+                    content = self.fetch(link)
+                    if content is not None:
+                        put_page((link, content))
+            except Exception as error:
+                fetch_errors.append(error)
+                stop_event.set()
+            finally:
+                put_page(_DONE)
+
+        fetchers = [threading.Thread(target=fetch_pages, daemon=True) for _ in range(self.fetch_workers)]
+        for fetcher in fetchers:
+            fetcher.start()
+
+        try:
+            if self.parse_workers:
+                yield from self._parse_in_processes(pages, parse_args, is_cancelled or _never)
+            else:
+                yield from self._parse_in_thread(pages, parse_args, is_cancelled or _never)
+        finally:
+            stop_event.set()
+            closed_event.set()
+            if not (is_cancelled and is_cancelled()):
+                for fetcher in fetchers:
+                    fetcher.join()
+        # Downloads of a cancelled run fail when their connections are closed, their errors are not raised.
+        if fetch_errors and not (is_cancelled and is_cancelled()):
+            raise fetch_errors[0]
+
+    @staticmethod
+    def _get_page(pages: queue.Queue, is_cancelled: Callable[[], bool]) -> object:
+        """
+        Waits for the next item of the queue, or returns _DONE if the run is cancelled.
+        """
+
+        while not is_cancelled():
+            try:
+                return pages.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                pass
+        return _DONE
+
+    def _parse_in_thread(
+        self, pages: queue.Queue, parse_args: tuple, is_cancelled: Callable[[], bool]
+    ) -> Iterator[tuple[str, dict]]:
+        finished_fetchers = 0
+        while finished_fetchers < self.fetch_workers and not is_cancelled():
+            item = self._get_page(pages, is_cancelled)
+            if item is _DONE:
+                finished_fetchers += 1
+                continue
+            link, content = item
+            yield link, self.parse(content, *parse_args)
+
+    def _parse_in_processes(
+        self, pages: queue.Queue, parse_args: tuple, is_cancelled: Callable[[], bool]
+    ) -> Iterator[tuple[str, dict]]:
+        pool = get_parse_pool(self.parse_workers)
+        max_in_flight = self.parse_workers * 2
+        in_flight: dict[Future, str] = {}
+        finished_fetchers = 0
+
+        while (finished_fetchers < self.fetch_workers or in_flight) and not is_cancelled():
+            while finished_fetchers < self.fetch_workers and len(in_flight) < max_in_flight:
+                try:
+                    item = self._get_page(pages, is_cancelled) if not in_flight else pages.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    finished_fetchers += 1
+                    continue
+                link, content = item
+                in_flight[pool.submit(self.parse, content, *parse_args)] = link
+
+            if not in_flight:
+                continue
+            done, _ = wait(in_flight, timeout=_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield in_flight.pop(future), future.result()
+
+
+def _never() -> bool:
+    return False
@@ -0,0 +1,86 @@
+import logging
+from itertools import zip_longest
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .dto import CriteriaDTO
+
+logger = logging.getLogger(__name__)
+
+
+class SearchPlanner:
+    """
+    Plans narrower queries to the websites from the required keywords of a search.
+
+    The websites search only by the position, so a broad position finds many resumes without the required skills.
+    The planner adds one key skill to the position in every query, e.g. "Python developer django" and
+    "Python developer sql". The queries run in parallel, and their links are merged into one set of candidates
+    that is parsed and ranked as one search.
+
+    Attributes:
+        max_queries (int): The maximum number of queries, one per keyword in the order of the keywords.
+        max_parallel (int): The maximum number of queries running at once, each in its own browser.
+        include_broad (bool): Whether to run the query with the position only too.
+
+    Methods:
+        plan(criteria: CriteriaDTO) -> list[CriteriaDTO]: Builds the queries of a search.
+        merge_links(found_resumes: list[tuple[list[str], dict]]) -> tuple[list[str], dict]: Merges the links
+            found by the queries.
+    """
+
+    def __init__(self, max_queries: int = 3, max_parallel: int = 2, include_broad: bool = False):
+        self.max_queries = max_queries
+        self.max_parallel = max_parallel
+        self.include_broad = include_broad
+
+    def plan(self, criteria: "CriteriaDTO") -> list["CriteriaDTO"]:
+        """
+        Builds the queries of a search: the position with each of the first keywords that it does not contain.
+
+        Args:
+            criteria (CriteriaDTO): Criteria data transfer object containing search parameters.
+
+        Returns:
+            list[CriteriaDTO]: The criteria of the queries, or the criteria of the search alone if there are
+            no keywords to add.
+        """
+
+        position = criteria.position.lower()
+        keywords = []
+        for keyword in criteria.skills_and_keywords or []:
+            keyword = " ".join(keyword.split())
+            if keyword and keyword.lower() not in position and keyword.lower() not in keywords:
+                keywords.append(keyword.lower())
+        keywords = keywords[: self.max_queries]
+        if not keywords:
+            return [criteria]
+
+        queries = [criteria.model_copy(update={"position": f"{criteria.position} {keyword}"}) for keyword in keywords]
+        return [criteria, *queries] if self.include_broad else queries
+
+    @staticmethod
+    def merge_links(found_resumes: list[tuple[list[str], dict]]) -> tuple[list[str], dict]:
+        """
+        Merges the links found by the queries into one list without duplicates. The links are interleaved,
+        so the first results of every query, the most relevant ones for the website, come first.
+
+        Args:
+            found_resumes (list[tuple[list[str], dict]]): The links and the result cards found by every query.
+
+        Returns:
+            tuple[list[str], dict]: The unique links and their result cards.
+        """
+
+        interleaved_links = (link for links in zip_longest(*(links for links, _ in found_resumes)) for link in links)
+        resume_links = list(dict.fromkeys(link for link in interleaved_links if link is not None))
+        resume_cards = {}
+        for _, cards in found_resumes:
+            for resume_link, card in cards.items():
+                resume_cards.setdefault(resume_link, card)
+
+        logger.info(
+            "Planned queries found %d links, %d of them unique",
+            sum(len(links) for links, _ in found_resumes),
+            len(resume_links),
+        )
+        return resume_links, resume_cards
@@ -0,0 +1,48 @@
+from importlib import import_module
+
+PLATFORMS = {
+    "work_ua": ("work_ua_resume_searcher.WorkUaResumeSearcher", "work_ua_resume_parser.WorkUaResumeParser"),
+    "robota_ua": ("robota_ua_resume_searcher.RobotaUaResumeSearcher", "robota_ua_resume_parser.RobotaUaResumeParser"),
+}
+
+
+def load_platform(platform: str) -> tuple[type, type]:
+    """
+    Imports the searcher and parser classes of a platform.
+
+    The classes are imported on first use, so Selenium, BeautifulSoup and the other heavy modules are not loaded
+    until a search needs them.
+
+    Args:
+        platform (str): The name of the platform, one of the PLATFORMS keys.
+
+    Returns:
+        tuple[type, type]: The searcher class and the parser class of the platform.
+
+    Raises:
+        KeyError: If the platform is unknown.
+    """
+
+    return tuple(_import_class(class_path) for class_path in PLATFORMS[platform])
+
+
+def load_parser(platform: str) -> type:
+    """
+    Imports the parser class of a platform without its searcher, so Selenium is not loaded.
+
+    Args:
+        platform (str): The name of the platform, one of the PLATFORMS keys.
+
+    Returns:
+        type: The parser class of the platform.
+
+    Raises:
+        KeyError: If the platform is unknown.
+    """
+
+    return _import_class(PLATFORMS[platform][1])
+
+
+def _import_class(class_path: str) -> type:
+    module_name, class_name = class_path.rsplit(".", 1)
+    return getattr(import_module(f".{module_name}", __package__), class_name)
@@ -0,0 +1,234 @@
+import json
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from time import time
+from typing import TYPE_CHECKING, Callable
+
+from .budget import SearchBudget
+from .cancellation import CancellationToken
+from .exceptions import SearchCancelledError
+
+if TYPE_CHECKING:
+    from .dto import CriteriaDTO
+
+logger = logging.getLogger(__name__)
+
+
+class SearchUsage:
+    """
+    Counter of the searches run by users, in a SQLite database.
+
+    Searches are counted by the platform and the criteria used by the searcher: the position, the location,
+    the salary and the experience. The keywords of the latest search are kept with the count, so a pre-warmed
+    search plans the same queries as the recent ones.
+
+    Attributes:
+        path (str): The path to the database file.
+
+    Methods:
+        record(criteria: CriteriaDTO, platform: str) -> None: Counts a search.
+        get_popular(limit: int, window: float = 7 * 24 * 60 * 60) -> list[tuple[str, CriteriaDTO]]: Gets
+            the most frequent recent searches.
+        close() -> None: Closes the database.
+    """
+
+    def __init__(self, path: str = "search_cache.sqlite3"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_usage (
+                key TEXT PRIMARY KEY,
+                platform TEXT NOT NULL,
+                criteria TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+            """
+        )
+
+    def record(self, criteria: "CriteriaDTO", platform: str) -> None:
+        """
+        Counts a search.
+
+        Args:
+            criteria (CriteriaDTO): The criteria of the search.
+            platform (str): The name of the platform.
+        """
+
+        from .dto import search_key
+
+        key = json.dumps(search_key(criteria, platform), ensure_ascii=False)
+        with self._lock:
+            self._connection.execute(
+                """
+                INSERT INTO search_usage (key, platform, criteria, count, last_used_at) VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    criteria = excluded.criteria, count = count + 1, last_used_at = excluded.last_used_at
+                """,
+                (key, platform, json.dumps(criteria.model_dump(), ensure_ascii=False), time()),
+            )
+
+    def get_popular(self, limit: int, window: float = 7 * 24 * 60 * 60) -> list[tuple[str, "CriteriaDTO"]]:
+        """
+        Gets the most frequent searches among the ones run recently. Older searches are removed.
+
+        Args:
+            limit (int): The maximum number of searches.
+            window (float, optional): The time in seconds since the last use of a search after which it is not
+                counted. Defaults to 7 days.
+
+        Returns:
+            list[tuple[str, CriteriaDTO]]: The platforms and the criteria of the searches, the most frequent first.
+        """
+
+        from .dto import CriteriaDTO
+
+        min_used_at = time() - window
+        with self._lock:
+            self._connection.execute("DELETE FROM search_usage WHERE last_used_at < ?", (min_used_at,))
+            rows = self._connection.execute(
+                "SELECT platform, criteria FROM search_usage ORDER BY count DESC, last_used_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [(platform, CriteriaDTO(**json.loads(criteria))) for platform, criteria in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class PrewarmScheduler:
+    """
+    Background scheduler that runs the most popular searches during off-peak hours, so their links and resumes
+    are in the caches when users search at peak time.
+
+    Once a day, when the off-peak hours start, the scheduler takes the most frequent searches from the usage and
+    runs them with 'max_parallel' searches at once. Every search has its own budget of resumes and pages.
+    Searches still running when the off-peak hours end are cancelled, and the rest are not started.
+
+    Attributes:
+        usage (SearchUsage): The counter of the searches run by users.
+        search (Callable[[CriteriaDTO, str, SearchBudget, CancellationToken], object]): Runs a search, it gets
+            the criteria, the platform, the budget and the cancellation token. Its results are not used.
+        hours (tuple[int, int]): The local hours when the off-peak time starts and ends. The end may be earlier
+            than the start, e.g. (22, 5).
+        max_searches (int): The maximum number of searches of a run.
+        max_parallel (int): The maximum number of searches running at once.
+        max_resumes (int | None): The maximum number of resumes of every search.
+        max_pages (int | None): The maximum number of listing pages of every search.
+        check_interval (float): How often the scheduler checks the time, in seconds.
+
+    Methods:
+        start() -> None: Starts the scheduler thread.
+        stop() -> None: Stops the scheduler and cancels the running searches.
+        is_off_peak(now: datetime = None) -> bool: Checks if the time is in the off-peak hours.
+        run_once() -> int: Runs the popular searches.
+    """
+
+    def __init__(
+        self,
+        usage: SearchUsage,
+        search: Callable[["CriteriaDTO", str, SearchBudget, CancellationToken], object],
+        hours: tuple[int, int] = (3, 6),
+        max_searches: int = 20,
+        max_parallel: int = 1,
+        max_resumes: int = None,
+        max_pages: int = None,
+        check_interval: float = 60,
+    ):
+        self.usage = usage
+        self.search = search
+        self.hours = hours
+        self.max_searches = max_searches
+        self.max_parallel = max_parallel
+        self.max_resumes = max_resumes
+        self.max_pages = max_pages
+        self.check_interval = check_interval
+        self._stop_event = threading.Event()
+        self._cancellation_token = CancellationToken()
+        self._thread = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="prewarm", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._cancellation_token.cancel()
+        if self._thread is not None:
+            self._thread.join()
+
+    def is_off_peak(self, now: datetime = None) -> bool:
+        """
+        Checks if the time is in the off-peak hours.
+
+        Args:
+            now (datetime, optional): The local time. Defaults to the current time.
+
+        Returns:
+            bool: True if the time is in the off-peak hours, False otherwise.
+        """
+
+        hour = (now or datetime.now()).hour
+        start_hour, end_hour = self.hours
+        if start_hour <= end_hour:
+            return start_hour <= hour < end_hour
+        return hour >= start_hour or hour < end_hour
+
+    def run_once(self) -> int:
+        """
+        Runs the popular searches until they are done or the off-peak hours end.
+
+        Returns:
+            int: The number of completed searches.
+        """
+
+        searches = self.usage.get_popular(self.max_searches)
+        logger.info("Pre-warming the caches with %d popular searches", len(searches))
+        self._cancellation_token = CancellationToken()
+        if self._stop_event.is_set():
+            self._cancellation_token.cancel()
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="prewarm-search") as executor:
+            futures = [executor.submit(self._search, platform, criteria) for platform, criteria in searches]
+            while wait(futures, timeout=self.check_interval).not_done:
+                if not self.is_off_peak() or self._stop_event.is_set():
+                    logger.info("Off-peak hours are over, cancelling the pre-warming searches")
+                    self._cancellation_token.cancel()
+                    break
+        completed = sum(future.result() for future in futures)
+        logger.info("Pre-warmed the caches with %d of %d searches", completed, len(searches))
+        return completed
+
+    def _run(self) -> None:
+        last_run_on = None
+        while not self._stop_event.is_set():
+            if self.is_off_peak():
+                now = datetime.now()
+                # Off-peak hours after midnight belong to the window that started the day before.
+                run_on = (now - timedelta(days=1)).date() if now.hour < self.hours[0] else now.date()
+                if run_on != last_run_on:
+                    last_run_on = run_on
+                    try:
+                        self.run_once()
+                    except Exception:
+                        logger.exception("Failed to pre-warm the caches")
+            self._stop_event.wait(self.check_interval)
+
+    def _search(self, platform: str, criteria: "CriteriaDTO") -> bool:
+        if self._cancellation_token.is_cancelled:
+            return False
+        try:
+            self.search(criteria, platform, SearchBudget(self.max_resumes, self.max_pages), self._cancellation_token)
+        except SearchCancelledError:
+            return False
+        except Exception:
+            logger.warning("Pre-warming search %r on %s failed", criteria.position, platform, exc_info=True)
+            return False
+        return True
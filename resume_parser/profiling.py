@@ -0,0 +1,159 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Only one search is profiled at a time, so profiles of concurrent searches are not mixed.
+_profiling_lock = threading.Lock()
+
+
+class SearchProfiler:
+    """
+    Profiles a single search run and saves the profiles to disk.
+
+    Every stage of the search is profiled by cProfile in the thread that runs the stage, which shows the exact
+    number of calls, e.g. of WebDriver commands or BeautifulSoup lookups. A background thread also samples
+    the stacks of all threads of the process, including fetch workers, and counts them in the folded format
+    of flame graph tools (flamegraph.pl, speedscope). Threads of other searches running at the same time are
+    sampled too. Parser processes are not profiled, so profiled searches parse resumes in the calling thread.
+
+    The profiles are saved when the profiler exits, to a new directory in 'output_dir':
+    '<stage>.prof' files for pstats or snakeviz, '<stage>.txt' summaries sorted by cumulative time and
+    'samples.folded'.
+
+    Attributes:
+        output_dir (str): The directory of the saved profiles.
+        name (str): The name of the search, a part of the directory name.
+        interval (float): The interval between stack samples in seconds.
+        path (str | None): The directory with the saved profiles, set when they are saved.
+        is_active (bool): True while the profiler runs. It is False if another search was being profiled when
+            the profiler was entered.
+
+    Methods:
+        stage(stage: str): Context manager that profiles a stage of the search.
+    """
+
+    def __init__(self, output_dir: str = "profiles", name: str = "search", interval: float = 0.005):
+        self.output_dir = output_dir
+        self.name = name
+        self.interval = interval
+        self.path = None
+        self._is_active = False
+        self._current_stage = None
+        self._profiles = {}
+        self._samples = Counter()
+        self._stop_event = threading.Event()
+        self._sampler = None
+
+    @property
+    def is_active(self) -> bool:
+        return self._is_active
+
+    def __enter__(self) -> "SearchProfiler":
+        if not _profiling_lock.acquire(blocking=False):
+            logger.warning("Another search is being profiled, %s is not profiled", self.name)
+            return self
+        self._is_active = True
+        self._sampler = threading.Thread(target=self._sample, name="search-profiler", daemon=True)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if not self._is_active:
+            return
+        self._stop_event.set()
+        self._sampler.join()
+        try:
+            self._save()
+        finally:
+            self._is_active = False
+            _profiling_lock.release()
+
+    @contextmanager
+    def stage(self, stage: str):
+        """
+        Profiles a stage of the search. A stage that runs several times is added to one profile.
+
+        Args:
+            stage (str): The name of the stage.
+        """
+
+        if not self._is_active:
+            yield
+            return
+
+        profile = self._profiles.setdefault(stage, cProfile.Profile())
+        previous_stage, self._current_stage = self._current_stage, stage
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._current_stage = previous_stage
+
+    def _sample(self) -> None:
+        sampler_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stage = self._current_stage or "other"
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(thread_names.get(thread_id, str(thread_id)))
+                stack.append(stage)
+                self._samples[";".join(reversed(stack))] += 1
+
+    def _save(self) -> None:
+        """
+        Saves the profiles of the stages and the stack samples to a new directory.
+        """
+
+        self.path = os.path.join(self.output_dir, f"{datetime.now():%Y%m%d-%H%M%S}-{_get_file_name(self.name)}")
+        os.makedirs(self.path, exist_ok=True)
+
+        for stage, profile in self._profiles.items():
+            file_name = os.path.join(self.path, _get_file_name(stage))
+            profile.dump_stats(f"{file_name}.prof")
+            summary = io.StringIO()
+            pstats.Stats(profile, stream=summary).sort_stats("cumulative").print_stats(50)
+            with open(f"{file_name}.txt", "w", encoding="utf-8") as summary_file:
+                summary_file.write(summary.getvalue())
+
+        with open(os.path.join(self.path, "samples.folded"), "w", encoding="utf-8") as samples_file:
+            for stack, count in self._samples.most_common():
+                samples_file.write(f"{stack} {count}\n")
+
+        logger.info("Profiles of %s are saved to %s", self.name, self.path)
+
+
+def profile_stage(profiler: SearchProfiler | None, stage: str):
+    """
+    Profiles a stage of a search if the search is profiled.
+
+    Args:
+        profiler (SearchProfiler | None): The profiler of the search, or None if it is not profiled.
+        stage (str): The name of the stage.
+
+    Returns:
+        The context manager of the stage.
+    """
+
+    return profiler.stage(stage) if profiler else nullcontext()
+
+
+def _get_file_name(name: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", name).strip("_")
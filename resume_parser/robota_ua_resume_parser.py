@@ -1,56 +1,119 @@
 import json
+import logging
 from typing import Union
 
-import requests
-
 from .constants import ResumeStatus
-from .dto import CriteriaDTO
+from .fields import get_years_between, normalize_currency, parse_iso_date
+from .http_client import Http2Client, HttpClientInterface, RequestsHttpClient
 from .interfaces import ResumeParserInterface
 
+logger = logging.getLogger(__name__)
+
 
 class RobotaUaResumeParser(ResumeParserInterface):
     """
     Class for parsing resumes on robota.ua website.
 
+    Resumes are fetched as small JSON documents from the employer API and parsed in the calling thread.
+    All documents come from one host, so by default many fetch workers share a few HTTP/2 connections.
+
     Methods:
 
-    - pars_resumes(resume_links: list[str], params: CriteriaDTO) -> None: Parses resumes from the provided list of
-      resume links and extracts relevant information.
+    - _create_http_client() -> HttpClientInterface: Creates an HTTP/2 client with a few connections to the API.
+    - _fetch_resume(resume_link: str) -> bytes | None: Downloads the resume data from the employer API.
+    - _extract_document(content: bytes) -> dict: Parses the resume data and extracts the fields of the resume.
+    - score_document(document: dict, required_keywords: list[str] = None) -> dict: Matches the fields of
+      the resume with the required keywords.
     """
 
-    def pars_resumes(self, resume_links: list[str], params: CriteriaDTO) -> None:
+    platform = "robota_ua"
+    default_fetch_workers = 16
+
+    def _create_http_client(self) -> HttpClientInterface:
+        """
+        Creates an HTTP/2 client with a few connections to the employer API, or an HTTP/1.1 client with a connection
+        for every fetch worker if HTTP/2 is not available.
+
+        Returns:
+            HttpClientInterface: The HTTP client.
+        """
+
+        try:
+            return Http2Client(max_connections_per_host=2)
+        except ImportError:
+            logger.warning("httpx[http2] is not installed, robota.ua resumes are fetched over HTTP/1.1")
+            return RequestsHttpClient(max_connections_per_host=self.fetch_workers)
+
+    def _fetch_resume(self, resume_link: str) -> bytes | None:
         """
-        Parses resumes from the provided list of resume links and extracts relevant information.
+        Downloads the resume data from the employer API.
 
         Args:
-            resume_links (list[str]): A list of URLs pointing to resumes to be parsed.
-            params (CriteriaDTO): An instance of the CriteriaDTO class containing search parameters.
+            resume_link (str): The URL of the resume.
 
         Returns:
-            None: The method does not return a value directly, but populates the 'resume_results' dictionary.
+            bytes | None: The resume data in JSON format, or None if the resume is not accessible
+            (status code other than 200).
+        """
 
-        Note:
-            If a resume page is not accessible (status code other than 200), it skips to the next resume link.
+        return self.http_client.fetch(
+            f"https://employer-api.robota.ua/resume/{resume_link.split('/')[-1]}?markView=true",
+            headers={"user-agent": self.user_agent.random},
+        )
+
+    @classmethod
+    def _extract_document(cls, content: bytes) -> dict:
         """
+        Parses the resume data and extracts the fields of the resume.
 
-        for resume_link in resume_links:
-            resume_page = requests.get(
-                url=f"https://employer-api.robota.ua/resume/{resume_link.split('/')[-1]}?markView=true",
-                headers={"user-agent": self.user_agent.random},
-            )
-            if resume_page.status_code != 200:
-                continue
+        Args:
+            content (bytes): The resume data in JSON format.
 
-            resume_data = json.loads(resume_page.content)
+        Returns:
+            dict: The document of the resume.
+        """
+
+        resume_data = json.loads(content)
+        position = cls._get_position(resume_data)
+        description = cls._get_description_resume(resume_data)
+        salary, currency = cls._get_salary(resume_data)
+        return {
+            "position": position,
+            "text": description.lower(),
+            "experience": cls._check_experience(resume_data),
+            "education": cls._check_education(resume_data),
+            "city": resume_data.get("cityName"),
+            "experience_years": cls._get_experience_years(resume_data),
+            "salary": salary,
+            "currency": currency,
+            "updated_at": cls._get_updated_at(resume_data),
+            "fingerprint": cls._get_fingerprint(position, description),
+        }
+
+    @classmethod
+    def score_document(cls, document: dict, required_keywords: list[str] = None) -> dict:
+        """
+        Matches the fields of the resume with the required keywords.
 
-            self.resume_results[resume_link] = {
-                "position": self._get_position(resume_data),
-                "matching_keywords": self._match_keywords(resume_data, params.skills_and_keywords),
-                "experience": self._check_experience(resume_data),
-                "education": self._check_education(resume_data),
-            }
+        Args:
+            document (dict): The document of the resume.
+            required_keywords (list[str]): List of required skills and keywords.
+
+        Returns:
+            dict: The parsed resume.
+        """
 
-            self.resume_results[resume_link]["points"] = self._get_resume_points(self.resume_results[resume_link])
+        resume_result = {
+            "position": document["position"],
+            "matching_keywords": cls._match_keywords(document["text"], required_keywords),
+            "experience": document["experience"],
+            "education": document["education"],
+        }
+
+        resume_result["points"] = cls._get_resume_points(resume_result)
+        resume_result.update(cls._get_structured_fields(document))
+        resume_result["fingerprint"] = document["fingerprint"]
+        return resume_result
 
     @staticmethod
     def _get_position(resume: dict) -> str:
@@ -70,12 +133,68 @@ class RobotaUaResumeParser(ResumeParserInterface):
             position += ", " + salary + resume["currencySign"]
         return position
 
-    def _match_keywords(self, resume: dict, required_keywords: list[str] = None) -> Union[str, set]:
+    @staticmethod
+    def _get_salary(resume: dict) -> tuple[int | None, str | None]:
         """
-        Matches required keywords with text blocks in the resume.
+        Gets the expected salary from the resume data.
+
+        Args:
+            resume (dict): Resume data in dictionary format.
+
+        Returns:
+            tuple[int | None, str | None]: The salary and the ISO code of its currency, or Nones if the salary
+            is not stated.
+        """
+
+        try:
+            salary = int(resume.get("salary") or 0)
+        except ValueError:
+            return None, None
+        if not salary:
+            return None, None
+        return salary, normalize_currency(resume.get("currencySign"))
+
+    @staticmethod
+    def _get_experience_years(resume: dict) -> float | None:
+        """
+        Sums the periods of the jobs from the resume data. A job without the end date lasts until today.
 
         Args:
             resume (dict): Resume data in dictionary format.
+
+        Returns:
+            float | None: The years of experience rounded to tenths, or None if no job has a start date.
+        """
+
+        years = None
+        for experience in resume.get("experiences") or []:
+            experience_years = get_years_between(experience.get("startWork"), experience.get("endWork"))
+            if experience_years is not None:
+                years = (years or 0) + experience_years
+        return None if years is None else round(years, 1)
+
+    @staticmethod
+    def _get_updated_at(resume: dict) -> str | None:
+        """
+        Gets the date of the last update of the resume from the resume data.
+
+        Args:
+            resume (dict): Resume data in dictionary format.
+
+        Returns:
+            str | None: The date in the ISO format, or None if it is not given.
+        """
+
+        updated_at = parse_iso_date(resume.get("updateDate") or resume.get("addDate"))
+        return updated_at.isoformat() if updated_at else None
+
+    @staticmethod
+    def _match_keywords(resume_text: str, required_keywords: list[str] = None) -> Union[str, set]:
+        """
+        Matches required keywords with text blocks in the resume.
+
+        Args:
+            resume_text (str): The description sections of the resume in lower case.
             required_keywords (list[str]): List of required keywords.
 
         Returns:
@@ -85,7 +204,6 @@ class RobotaUaResumeParser(ResumeParserInterface):
         if not required_keywords:
             return ResumeStatus.KEYWORDS_NOT_PROVIDED
 
-        resume_text = self._get_description_resume(resume).lower()
         matching_keywords = set()
 
         for required_keyword in required_keywords:
@@ -111,19 +229,19 @@ class RobotaUaResumeParser(ResumeParserInterface):
 
         key_information = resume.get("skills")
         if key_information:
-            resume_description += key_information[0].get("description")
+            resume_description += key_information[0].get("description") or ""
 
         experiences = resume.get("experiences")
         for experience in experiences:
-            resume_description += " " + experience.get("description")
+            resume_description += " " + (experience.get("description") or "")
 
         educations = resume.get("educations")
         for education in educations:
-            resume_description += " " + education.get("comment")
+            resume_description += " " + (education.get("comment") or "")
 
         additionals = resume.get("additionals")
         for additional in additionals:
-            resume_description += " " + additional.get("description")
+            resume_description += " " + (additional.get("description") or "")
 
         return resume_description
 
@@ -1,52 +1,98 @@
-from time import sleep
+import json
+import logging
+from base64 import b64decode
+from time import monotonic
 
-from selenium.common.exceptions import NoSuchElementException
+from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, WebDriverException
 from selenium.webdriver.common.by import By
 
+from .budget import SearchBudget
+from .cancellation import CancellationToken
 from .dto import CriteriaDTO
 from .exceptions import ResumeNotFoundError
 from .interfaces import ResumeSearcherInterface
 
+logger = logging.getLogger(__name__)
+
+# The search page loads every page of results from this endpoint of the employer API.
+CV_LIST_URL = "https://employer-api.robota.ua/cvdb/resumes"
+CANDIDATE_URL = "https://robota.ua/candidates/"
+
 
 class RobotaUaResumeSearcher(ResumeSearcherInterface):
     """
     Class for searching resumes on robota.ua website.
 
+    The browser logs its network events, so the found resumes are read from the JSON responses of the search
+    page instead of its rendered cards. If no response is captured, the cards are read from the page.
+
     Attributes:
         browser (WebDriver): Instance of Selenium WebDriver.
+        response_timeout (float): How long to wait for the results of a page in seconds.
 
     Methods:
 
-    - __init__(): Initializes the WebDriver and navigates to the robota.ua resumes page.
-    - set_params(params: CriteriaDTO): Sets the search parameters for searching resumes.
+    - __init__(cancellation_token: CancellationToken = None): Initializes the WebDriver and navigates to
+      the robota.ua resumes page.
+    - set_params(params: CriteriaDTO, budget: SearchBudget = None): Sets the search parameters for searching resumes.
     - set_position_and_location(self, position: str, location: str = None) -> None: Set the position and
       location parameters, and search resume.
     - set_experience(experience: float | None) -> None: Sets the experience filter for searching resumes.
     - set_salary(salary_from: int | None, salary_to: int | None) -> None: Sets
       the experience filter for searching resumes.
-    - get_resume_links(self) -> None: Gets a link to all found resumes.
+    - get_resume_links(self, budget: SearchBudget = None) -> None: Gets a link to all found resumes.
+    - _get_captured_resumes() -> list[dict] | None: Gets the resumes of the last page of results from
+      the network events of the browser.
+    - _clear_network_events() -> None: Removes the network events received so far from the performance log.
+    - _read_cv_list_events(sent_ids: set[str], response_ids: list[str], finished_ids: set[str]) -> None: Collects
+      the network events of the requests for the search results.
+    - _wait_for_page_change(previous_card: WebElement | None) -> bool: Waits until the cards of the previous
+      page are replaced.
     """
 
-    def __init__(self):
+    response_timeout = 5
+    _CARD_XPATH = "div//alliance-employer-cvdb-cv-list-card"
+
+    def __init__(self, cancellation_token: CancellationToken = None):
         """
         Initializes the WebDriver and navigates to the robota.ua resumes page.
+
+        Args:
+            cancellation_token (CancellationToken, optional): The cancellation of the search. Defaults to None.
         """
 
-        super().__init__()
+        super().__init__(cancellation_token)
         self.browser.get("https://robota.ua/employer/")
-        sleep(5)
+        self._sleep(5)
+
+    def _create_browser_options(self) -> webdriver.ChromeOptions:
+        """
+        Creates the options of the browser with the performance log, which contains the network events.
 
-    def set_params(self, params: CriteriaDTO):
+        Returns:
+            ChromeOptions: The options of the browser.
+        """
+
+        options = webdriver.ChromeOptions()
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        return options
+
+    def set_params(self, params: CriteriaDTO, budget: SearchBudget = None):
         """
         Sets the search parameters for searching resumes.
 
         Args:
             params (CriteriaDTO): Criteria data transfer object containing search parameters.
+            budget (SearchBudget, optional): Limits of the search. Defaults to None.
 
         Raises:
             ResumeNotFoundError: If the resume is not found.
         """
 
+        if budget:
+            budget.start()
+
         self.set_position_and_location(params.position, params.location)
 
         if not self._is_resume_found():
@@ -56,16 +102,18 @@ class RobotaUaResumeSearcher(ResumeSearcherInterface):
 
         self.set_salary(params.salary_from, params.salary_to)
 
+        # The results of the earlier filter changes must not be taken for the results of the search.
+        self._clear_network_events()
         self.browser.find_element(
             By.XPATH,
             "/html/body/div/div[3]/div/div/alliance-employer-cvdb-header-filters/section/div/"
             "alliance-employer-cvdb-desktop-filter-keyword/santa-suggest-input/santa-drop-down/"
             "div/div[1]/santa-input/div/div[2]/div/santa-button/button",
         ).click()
-        sleep(2)
+        self._sleep(2)
 
-        self.get_resume_links()
-        self.browser.quit()
+        self.get_resume_links(budget)
+        self.close()
 
     def set_position_and_location(self, position: str, location: str = None) -> None:
         """
@@ -85,7 +133,7 @@ class RobotaUaResumeSearcher(ResumeSearcherInterface):
             By.XPATH, search_elements_xpath + "santa-suggest-input/santa-drop-down/div/div[1]/santa-input/div/input"
         )
         position_input.send_keys(position)
-        sleep(1)
+        self._sleep(1)
 
         if location:
             self.browser.find_element(
@@ -93,7 +141,7 @@ class RobotaUaResumeSearcher(ResumeSearcherInterface):
                 search_elements_xpath + "santa-suggest-input/santa-drop-down/div/div[1]/santa-input/div/"
                 "div[2]/alliance-employer-home-page-filter-city/santa-drop-down",
             ).click()
-            sleep(1)
+            self._sleep(1)
             location_input = self.browser.find_element(
                 By.XPATH,
                 search_elements_xpath + "santa-suggest-input/santa-drop-down/div/div[1]/"
@@ -101,7 +149,7 @@ class RobotaUaResumeSearcher(ResumeSearcherInterface):
                 "santa-drop-down/div/div[2]/div/div[1]/santa-input/div/input",
             )
             location_input.send_keys(location)
-            sleep(1)
+            self._sleep(1)
             self._try_find_element_by_xpath(
                 search_elements_xpath + "santa-suggest-input/santa-drop-down/div/div[1]/"
                 "santa-input/div/div[2]/alliance-employer-home-page-filter-city/"
@@ -110,7 +158,7 @@ class RobotaUaResumeSearcher(ResumeSearcherInterface):
 
         search_candidates_button = self.browser.find_element(By.XPATH, search_elements_xpath + "santa-button")
         search_candidates_button.click()
-        sleep(5)
+        self._sleep(5)
 
     def set_experience(self, experience: float | None) -> None:
         """
@@ -131,26 +179,26 @@ class RobotaUaResumeSearcher(ResumeSearcherInterface):
             return
 
         self.browser.execute_script("window.scrollTo(0, 1000);")
-        sleep(1)
+        self._sleep(1)
 
         if experience == 0:
             self._try_find_element_by_xpath(experience_checkbox_xpath + "div[1]/santa-checkbox").click()
         if 0 < experience <= 1:
             self._try_find_element_by_xpath(experience_checkbox_xpath + "div[2]/santa-checkbox").click()
-        sleep(1)
+        self._sleep(1)
         if 1 <= experience <= 2:
             self._try_find_element_by_xpath(experience_checkbox_xpath + "div[3]/santa-checkbox").click()
-        sleep(1)
+        self._sleep(1)
         if 2 <= experience <= 5:
             self._try_find_element_by_xpath(experience_checkbox_xpath + "div[4]/santa-checkbox").click()
-        sleep(1)
+        self._sleep(1)
         if 5 <= experience <= 10:
             self._try_find_element_by_xpath(experience_checkbox_xpath + "div[5]/santa-checkbox").click()
-        sleep(1)
+        self._sleep(1)
         if experience >= 10:
             self._try_find_element_by_xpath(experience_checkbox_xpath + "div[6]/santa-checkbox").click()
 
-        sleep(1)
+        self._sleep(1)
 
     def set_salary(self, salary_from: int | None, salary_to: int | None) -> None:
         """
@@ -169,21 +217,21 @@ class RobotaUaResumeSearcher(ResumeSearcherInterface):
         salary_inputs_xpath = salary_block_xpath + "alliance-employer-cvdb-simple-salary/lib-input-range/div/"
 
         self.browser.execute_script("window.scrollTo(0, 500);")
-        sleep(1)
+        self._sleep(1)
 
         self._try_find_element_by_xpath(salary_block_xpath + "lib-without-salary/santa-toggler/label/span").click()
-        sleep(1)
+        self._sleep(1)
 
         if salary_from:
             input_salary_from = self._try_find_element_by_xpath(salary_inputs_xpath + "div[1]/santa-input/div/input")
             input_salary_from.send_keys(salary_from)
-            sleep(1)
+            self._sleep(1)
 
         if salary_to:
             input_salary_to = self._try_find_element_by_xpath(salary_inputs_xpath + "div[2]/santa-input/div/input")
             input_salary_to.click()
             input_salary_to.send_keys(salary_to)
-        sleep(1)
+        self._sleep(1)
 
     def _is_resume_found(self) -> bool:
         """
@@ -205,29 +253,189 @@ class RobotaUaResumeSearcher(ResumeSearcherInterface):
             return True
         return False
 
-    def get_resume_links(self) -> None:
+    def get_resume_links(self, budget: SearchBudget = None) -> None:
         """
         Gets a link to all found resumes.
 
-        This method iterates through the resume cards on the page and extracts the links to the resumes.
+        This method reads the found resumes of every page from the response of the employer API captured by
+        the browser, or from the resume cards on the page if the response is not captured, and extracts
+        the links to the resumes and the texts of the cards.
         It also handles pagination by clicking on the next page link until no more resumes are available.
+        Links that are already collected are skipped.
+
+        Args:
+            budget (SearchBudget, optional): Limits of the search. When the budget is exhausted, the links
+                collected so far are kept. Defaults to None.
         """
 
         cv_list_xpath = (
             "/html/body/app-root/div/alliance-cv-list-page/main/article/div[1]/div/alliance-employer-cvdb-cv-list/div/"
         )
 
+        loaded_pages = 1
+        previous_card = None
         while True:
-            resume_cards = self._try_find_element_by_xpath(cv_list_xpath + "div").find_elements(
-                By.TAG_NAME, "alliance-employer-cvdb-cv-list-card"
-            )
-            for card in resume_cards:
-                self._resume_links.append(card.find_element(By.TAG_NAME, "a").get_attribute("href"))
+            captured_resumes = self._get_captured_resumes()
+            if captured_resumes is None:
+                # The page is read only when the cards of the previous page are replaced.
+                if not self._wait_for_page_change(previous_card):
+                    return
+                resume_cards = self._iter_page_cards(cv_list_xpath)
+            else:
+                resume_cards = (self._get_resume_card(resume) for resume in captured_resumes)
+            for resume_link, resume_card in resume_cards:
+                if resume_link in self._resume_cards:
+                    continue
+                if budget and not budget.can_load_resume(len(self._resume_links)):
+                    return
+                self._resume_links.append(resume_link)
+                self._resume_cards[resume_link] = resume_card
 
             try:
                 pagination = self.browser.find_element(By.XPATH, cv_list_xpath + "nav/santa-pagination-with-links/div")
-                current_page_number = int(pagination.find_element(By.CLASS_NAME, "active").text)
-                pagination.find_element(By.LINK_TEXT, f"{current_page_number + 1}").click()
+                # The active page may not be rendered yet when the results are captured, so it is counted.
+                next_page_link = pagination.find_element(By.LINK_TEXT, f"{loaded_pages + 1}")
             except NoSuchElementException:
                 return
-            sleep(1)
+            if budget and not budget.can_load_page(loaded_pages):
+                return
+            previous_card = next(iter(self.browser.find_elements(By.XPATH, cv_list_xpath + self._CARD_XPATH)), None)
+            next_page_link.click()
+            loaded_pages += 1
+
+    def _get_captured_resumes(self) -> list[dict] | None:
+        """
+        Gets the resumes of the last page of results from the network events of the browser.
+
+        Every change of the filters and every page loads the results from the employer API, so the last
+        response to a request sent since the previous call is the current page. Its body is read when it is
+        fully loaded. The events are removed from the log when they are read.
+
+        Returns:
+            list[dict] | None: The resumes as they are returned by the API, or None if no response was
+            captured in 'response_timeout' seconds.
+        """
+
+        deadline = monotonic() + self.response_timeout
+        sent_ids, response_ids, finished_ids = set(), [], set()
+        while True:
+            self._read_cv_list_events(sent_ids, response_ids, finished_ids)
+            if response_ids and response_ids[-1] in finished_ids:
+                try:
+                    response = self.browser.execute_cdp_cmd("Network.getResponseBody", {"requestId": response_ids[-1]})
+                    body = response["body"]
+                    if response.get("base64Encoded"):
+                        body = b64decode(body)
+                    return [resume for resume in json.loads(body)["documents"] if resume.get("resumeId")]
+                except (WebDriverException, ValueError, KeyError, TypeError, AttributeError):
+                    # The body may be evicted from the buffer of the browser or have an unknown format.
+                    logger.warning("Failed to read the captured results of robota.ua, reading the page")
+                    return None
+            if monotonic() >= deadline:
+                logger.warning("The results of robota.ua were not captured, reading the page")
+                return None
+            self._sleep(0.2)
+
+    def _wait_for_page_change(self, previous_card) -> bool:
+        """
+        Waits until the card of the previous page is removed from the page, so the cards of the new page are read.
+
+        Args:
+            previous_card (WebElement | None): The first card of the previous page, or None on the first page.
+
+        Returns:
+            bool: True if the page has changed, False if the previous page is still shown after
+            'response_timeout' seconds.
+        """
+
+        if previous_card is None:
+            return True
+        deadline = monotonic() + self.response_timeout
+        while monotonic() < deadline:
+            try:
+                previous_card.is_enabled()
+            except StaleElementReferenceException:
+                return True
+            self._sleep(0.2)
+        logger.warning("The next page of robota.ua was not loaded, stopping at the collected resumes")
+        return False
+
+    def _clear_network_events(self) -> None:
+        """
+        Removes the network events received so far from the performance log.
+        """
+
+        self.browser.get_log("performance")
+
+    def _read_cv_list_events(self, sent_ids: set[str], response_ids: list[str], finished_ids: set[str]) -> None:
+        """
+        Reads the performance log and collects the events of the requests for the search results. Responses to
+        requests sent before the log was last read are ignored, they are results of earlier filters or pages.
+
+        Args:
+            sent_ids (set[str]): The IDs of the sent requests, updated in place.
+            response_ids (list[str]): The IDs of the requests in the order of their responses, updated in place.
+            finished_ids (set[str]): The IDs of the requests whose responses are fully loaded, updated in place.
+        """
+
+        for entry in self.browser.get_log("performance"):
+            message = json.loads(entry["message"])["message"]
+            method = message.get("method")
+            params = message.get("params") or {}
+            if method == "Network.requestWillBeSent":
+                if params["request"]["url"].startswith(CV_LIST_URL):
+                    sent_ids.add(params["requestId"])
+            elif method == "Network.responseReceived":
+                if params["requestId"] in sent_ids and params.get("type") in ("XHR", "Fetch"):
+                    response_ids.append(params["requestId"])
+            elif method == "Network.loadingFinished" and params.get("requestId") in sent_ids:
+                finished_ids.add(params["requestId"])
+
+    def _iter_page_cards(self, cv_list_xpath: str):
+        """
+        Reads the resume cards rendered on the page.
+
+        Args:
+            cv_list_xpath (str): XPath of the list of the resume cards.
+
+        Yields:
+            tuple[str, dict]: The link to the resume and its card.
+        """
+
+        self._sleep(1)
+        resume_cards = self._try_find_element_by_xpath(cv_list_xpath + "div").find_elements(
+            By.TAG_NAME, "alliance-employer-cvdb-cv-list-card"
+        )
+        for card in resume_cards:
+            try:
+                link_element = card.find_element(By.TAG_NAME, "a")
+                # The card text contains the position, the salary, the experience and the last job of the candidate.
+                resume_card = {"title": link_element.text, "text": card.text}
+                resume_link = link_element.get_attribute("href")
+            except StaleElementReferenceException:
+                logger.warning("The page of robota.ua changed while its cards were read")
+                return
+            yield resume_link, resume_card
+
+    @staticmethod
+    def _get_resume_card(resume: dict) -> tuple[str, dict]:
+        """
+        Builds the card of a resume returned by the employer API, with the same data as the rendered card.
+
+        Args:
+            resume (dict): The resume from the search results of the API.
+
+        Returns:
+            tuple[str, dict]: The link to the resume and its card.
+        """
+
+        texts = [resume.get("speciality"), resume.get("cityName")]
+        salary = resume.get("salary")
+        if salary and str(salary) != "0":
+            texts.append(f"{salary} {resume.get('currencySign') or ''}")
+        for experience in resume.get("experience") or resume.get("experiences") or []:
+            if isinstance(experience, dict):
+                texts.extend([experience.get("position"), experience.get("company"), experience.get("datesDiff")])
+        texts.extend(skill for skill in resume.get("skills") or [] if isinstance(skill, str))
+        card_text = "\n".join(str(text) for text in texts if text)
+        return f"{CANDIDATE_URL}{resume['resumeId']}", {"title": resume.get("speciality") or "", "text": card_text}
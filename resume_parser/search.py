@@ -0,0 +1,286 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from time import time
+from typing import TYPE_CHECKING
+
+from .budget import SearchBudget
+from .cancellation import CancellationToken
+from .exceptions import ResumeNotFoundError, SearchCancelledError
+from .filters import filter_resumes
+from .metrics import measure, measure_memory
+from .planning import SearchPlanner
+from .platforms import PLATFORMS, load_parser, load_platform
+from .profiling import SearchProfiler, profile_stage
+
+if TYPE_CHECKING:
+    from .caching import LinkCache
+    from .cassettes import Cassette
+    from .corpus import ResumeCorpus
+    from .dto import CriteriaDTO
+
+logger = logging.getLogger(__name__)
+
+
+def search_resumes(
+    criteria: "CriteriaDTO",
+    platform: str,
+    budget: SearchBudget = None,
+    parser_options: dict = None,
+    trace_memory: bool = False,
+    profiler: SearchProfiler = None,
+    cancellation_token: CancellationToken = None,
+    planner: SearchPlanner = None,
+    cassette: "Cassette" = None,
+    link_cache: "LinkCache" = None,
+) -> dict | None:
+    """
+    Searches resumes on a platform and parses them.
+
+    Args:
+        criteria (CriteriaDTO): Criteria data transfer object containing search parameters.
+        platform (str): The name of the platform, one of the PLATFORMS keys.
+        budget (SearchBudget, optional): Limits of the search. Defaults to None.
+        parser_options (dict, optional): Arguments of the parser, e.g. the number of fetch and parse workers.
+            Defaults to None.
+        trace_memory (bool, optional): Whether to measure the peak of Python allocations with tracemalloc in
+            addition to the peak RSS. Defaults to False.
+        profiler (SearchProfiler, optional): The profiler of the search run, its stages are searching and
+            parsing. While it is active, resumes are parsed in the calling thread, so the profile of parsing
+            shows the parser instead of waits for the process pool. Defaults to None, when the search is not
+            profiled.
+        cancellation_token (CancellationToken, optional): The cancellation of the search. Defaults to None.
+        planner (SearchPlanner, optional): The planner of narrower queries with the keywords, whose links are
+            merged and parsed as one search. Defaults to None, one query with the criteria.
+        cassette (Cassette, optional): The cassette that records the found links and the responses of the parser,
+            or replays them without a browser and network requests. Defaults to None.
+        link_cache (LinkCache, optional): The cache of found links. Queries found in it do not start a browser,
+            and the links found by the others are cached. Defaults to None.
+
+    Returns:
+        dict | None: Parsed resumes by their links, or None if no resumes were found for the criteria.
+
+    Raises:
+        SearchCancelledError: If the search is cancelled. The browsers and the connections are closed.
+    """
+
+    with measure_memory(f"Search on {platform}", trace_allocations=trace_memory):
+        with profile_stage(profiler, f"search on {platform}"):
+            searcher_class, parser_class = load_platform(platform)
+            queries = planner.plan(criteria) if planner else [criteria]
+            if len(queries) == 1:
+                found_resumes = _find_resumes(
+                    searcher_class, queries[0], platform, budget, cancellation_token, cassette, link_cache
+                )
+            else:
+                found_resumes = _find_planned_resumes(
+                    searcher_class,
+                    queries,
+                    platform,
+                    budget,
+                    planner.max_parallel,
+                    cancellation_token,
+                    cassette,
+                    link_cache,
+                )
+            if found_resumes is None:
+                return None
+            resume_links, resume_cards = found_resumes
+
+        with profile_stage(profiler, f"parsing on {platform}"):
+            with measure(f"Parser setup on {platform}"):
+                parser_options = dict(parser_options or {})
+                if profiler is not None and profiler.is_active:
+                    parser_options["parse_workers"] = 0
+                parser = parser_class(**parser_options, cancellation_token=cancellation_token)
+                if cassette:
+                    parser.http_client = cassette.wrap_http_client(parser.http_client)
+            parser.pars_resumes(resume_links, criteria, budget, resume_cards)
+        return parser.resume_results
+
+
+def _find_resumes(
+    searcher_class: type,
+    criteria: "CriteriaDTO",
+    platform: str,
+    budget: SearchBudget | None,
+    cancellation_token: CancellationToken | None,
+    cassette: "Cassette" = None,
+    link_cache: "LinkCache" = None,
+) -> tuple[list[str], dict] | None:
+    """
+    Runs the searcher of a platform for the criteria, or replays its results from the cassette or the link cache.
+
+    Returns:
+        tuple[list[str], dict] | None: The links and the result cards of the found resumes, or None if no
+        resumes were found.
+    """
+
+    if cassette and cassette.mode == "replay":
+        return cassette.get_search(platform, criteria)
+    cached_resumes = link_cache.get(platform, criteria, budget) if link_cache else None
+    if cached_resumes is not None:
+        logger.info("Search for %r on %s is served from the link cache", criteria.position, platform)
+        if cassette:
+            cassette.record_search(platform, criteria, *cached_resumes)
+        return cached_resumes
+
+    with measure(f"Search setup on {platform}"):
+        searcher = _call_cancellable(cancellation_token, searcher_class, cancellation_token)
+    try:
+        _call_cancellable(cancellation_token, searcher.set_params, criteria, budget)
+    except ResumeNotFoundError:
+        if cassette:
+            cassette.record_search(platform, criteria, None)
+        return None
+    finally:
+        searcher.close()
+    if cassette:
+        cassette.record_search(platform, criteria, searcher.resume_links, searcher.resume_cards)
+    if link_cache:
+        is_complete = not (budget and budget.is_exhausted)
+        link_cache.put(platform, criteria, searcher.resume_links, searcher.resume_cards, is_complete)
+    return searcher.resume_links, searcher.resume_cards
+
+
+def _find_planned_resumes(
+    searcher_class: type,
+    queries: list["CriteriaDTO"],
+    platform: str,
+    budget: SearchBudget | None,
+    max_parallel: int,
+    cancellation_token: CancellationToken | None,
+    cassette: "Cassette" = None,
+    link_cache: "LinkCache" = None,
+) -> tuple[list[str], dict] | None:
+    """
+    Runs the searcher of a platform for every planned query in parallel and merges the found links.
+
+    The limits of resumes and pages of the budget are divided between the queries, and the deadline of every
+    query counts from the start of the search. A query that fails is skipped, unless every query fails.
+
+    Returns:
+        tuple[list[str], dict] | None: The unique links and the result cards of the found resumes, or None if
+        no query found resumes.
+    """
+
+    query_budgets = budget.split(len(queries)) if budget else [None] * len(queries)
+    with ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix=f"query-{platform}") as executor:
+        futures = [
+            executor.submit(
+                _find_resumes, searcher_class, query, platform, query_budget, cancellation_token, cassette, link_cache
+            )
+            for query, query_budget in zip(queries, query_budgets)
+        ]
+        found_resumes = []
+        errors = []
+        for query, future in zip(queries, futures):
+            try:
+                query_resumes = future.result()
+            except SearchCancelledError:
+                raise
+            except Exception as error:
+                logger.warning("Query %r on %s failed", query.position, platform, exc_info=True)
+                errors.append(error)
+                continue
+            if query_resumes is not None:
+                found_resumes.append(query_resumes)
+
+    if budget and any(query_budget.is_exhausted for query_budget in query_budgets):
+        budget.is_exhausted = True
+    if len(errors) == len(queries):
+        raise errors[0]
+    if not found_resumes:
+        return None
+    return SearchPlanner.merge_links(found_resumes)
+
+
+def _call_cancellable(cancellation_token: CancellationToken | None, function, *args):
+    """
+    Calls a function of the searcher and raises SearchCancelledError instead of its error if the search is
+    cancelled, e.g. when a WebDriver command fails because the browser is closed on cancellation.
+    """
+
+    try:
+        return function(*args)
+    except Exception as error:
+        if cancellation_token and cancellation_token.is_cancelled and not isinstance(error, SearchCancelledError):
+            raise SearchCancelledError() from error
+        raise
+
+
+def search_corpus(
+    criteria: "CriteriaDTO",
+    corpus: "ResumeCorpus",
+    platforms: list[str] = None,
+    max_age: float = None,
+    refresh_limit: int = 0,
+    max_candidates: int = 1000,
+) -> dict:
+    """
+    Searches resumes in the local corpus and scores them for the criteria, without a live search. The salary and
+    experience filters are applied to the structured fields of the stored documents.
+
+    Args:
+        criteria (CriteriaDTO): Criteria data transfer object containing search parameters.
+        corpus (ResumeCorpus): The local corpus of resumes.
+        platforms (list[str], optional): The platforms of the resumes. Defaults to all platforms.
+        max_age (float, optional): The age in seconds after which a stored resume is stale. Defaults to None,
+            when no resume is stale.
+        refresh_limit (int, optional): Stale resumes among this number of the most relevant ones are downloaded
+            again and filtered by the criteria again. Resumes that no longer exist on the website are removed from
+            the corpus. Stale resumes that could not be downloaded now, and other stale resumes, are returned as
+            they are. Defaults to 0.
+        max_candidates (int, optional): The maximum number of resumes taken from the corpus. Defaults to 1000.
+
+    Returns:
+        dict: Scored resumes by their links, every resume has the time it was fetched, 'fetched_at'.
+    """
+
+    from .interfaces import ResumeParserInterface
+
+    platforms = platforms or list(PLATFORMS)
+    with measure("Corpus query"):
+        stored_resumes = corpus.query(criteria, platforms, max_candidates)
+
+    resume_results = {}
+    for resume_link, stored_resume in stored_resumes.items():
+        parser_class = load_parser(stored_resume["platform"])
+        resume = parser_class.score_document(stored_resume["document"], criteria.skills_and_keywords)
+        resume_results[resume_link] = {**resume, "fetched_at": stored_resume["fetched_at"]}
+    resume_results = filter_resumes(resume_results, criteria)
+
+    if max_age is None or not refresh_limit:
+        return resume_results
+
+    relevant_links = ResumeParserInterface.rank_resumes(resume_results, refresh_limit)
+    for platform in platforms:
+        stale_links = [
+            resume_link
+            for resume_link in relevant_links
+            if stored_resumes[resume_link]["platform"] == platform
+            and time() - stored_resumes[resume_link]["fetched_at"] > max_age
+        ]
+        if not stale_links:
+            continue
+
+        with measure(f"Corpus refresh on {platform}"):
+            parser = load_parser(platform)(sinks=[corpus])
+            parser.pars_resumes(stale_links, criteria)
+        refreshed_at = time()
+        refreshed_results = filter_resumes(
+            {
+                resume_link: {**parser.resume_results[resume_link], "fetched_at": refreshed_at}
+                for resume_link in stale_links
+                if resume_link in parser.resume_results
+            },
+            criteria,
+        )
+        gone_links = [resume_link for resume_link in stale_links if resume_link in parser.gone_links]
+        for resume_link in stale_links:
+            if resume_link in refreshed_results:
+                resume_results[resume_link] = refreshed_results[resume_link]
+            elif resume_link in parser.resume_results or resume_link in parser.gone_links:
+                del resume_results[resume_link]
+        corpus.delete(gone_links)
+
+    return resume_results
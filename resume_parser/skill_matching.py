@@ -0,0 +1,195 @@
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+# Cyrillic letters that look like Latin ones in upper or lower case, so "Jаvа" typed with Cyrillic "а" is the same
+# skill as "Java".
+_HOMOGLYPHS = str.maketrans("аеіорсухкмтвнј", "aeiopcyxkmtbhj")
+_SEPARATORS = re.compile(r"[\s.\-_/]+")
+
+SKILL_ALIASES = {
+    "js": "javascript",
+    "джаваскрипт": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "пайтон": "python",
+    "пітон": "python",
+    "py": "python",
+    "джава": "java",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mssql": "sql server",
+    "ms sql": "sql server",
+    "react.js": "react",
+    "reactjs": "react",
+    "vue.js": "vue",
+    "vuejs": "vue",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "cpp": "c++",
+    "ml": "machine learning",
+    "машинне навчання": "machine learning",
+    "англійська": "english",
+    "англійська мова": "english",
+    "ексель": "excel",
+    "ms excel": "excel",
+}
+
+
+class SkillIndex:
+    """
+    Character n-gram index of resume skills for fuzzy matching.
+
+    Skills are normalized: letters are lowered, Cyrillic letters that look like Latin ones are replaced, separators
+    are removed ("Java Script" and "javascript" are the same skill) and aliases are resolved ("js" is
+    "javascript"). Every new normalized skill is added to the index of its n-grams. A required skill is compared
+    only with skills that share enough n-grams with it to reach the similarity threshold, and only with skills
+    of a suitable length. The similarity is the Dice coefficient of n-gram sets.
+
+    Lookups of a required skill are cached, and when new skills are added, only the new skills are checked.
+    Resume skills repeat across resumes, so fuzzy matching costs about as much as exact matching.
+
+    Attributes:
+        threshold (float): The minimum Dice coefficient of similar skills.
+        ngram_size (int): The length of n-grams.
+        max_size (int): The maximum number of skills in the index. The index is cleared when it is full.
+
+    Methods:
+        match(required_skills: list[str], skills: list[str]) -> set[str]: Finds the skills matching required skills.
+        normalize(skill: str) -> str: Normalizes a skill for comparison.
+    """
+
+    def __init__(self, aliases: dict = None, threshold: float = 0.75, ngram_size: int = 2, max_size: int = 100000):
+        self.threshold = threshold
+        self.ngram_size = ngram_size
+        self.max_size = max_size
+        aliases = SKILL_ALIASES if aliases is None else aliases
+        self._aliases = {self._compact(alias): self._compact(skill) for alias, skill in aliases.items()}
+        self._lock = threading.Lock()
+        self._clear()
+
+    def match(self, required_skills: list[str], skills: list[str]) -> set[str]:
+        """
+        Finds the skills matching required skills: the ones containing a required skill after normalization,
+        or similar to it.
+
+        Args:
+            required_skills (list[str]): The required skills.
+            skills (list[str]): The skills of a resume.
+
+        Returns:
+            set[str]: The matching skills of the resume, as they are given.
+        """
+
+        matching_skills = set()
+        with self._lock:
+            normalized_skills = [self._add(skill) for skill in skills]
+            for required_skill in required_skills:
+                required = self._normalize_cached(required_skill)
+                similar_skills = self._find_similar(required)
+                for skill, normalized in zip(skills, normalized_skills):
+                    if required in normalized or normalized in similar_skills:
+                        matching_skills.add(skill)
+        return matching_skills
+
+    def normalize(self, skill: str) -> str:
+        """
+        Normalizes a skill for comparison.
+
+        Args:
+            skill (str): The skill.
+
+        Returns:
+            str: The normalized skill.
+        """
+
+        compact = self._compact(skill)
+        return self._aliases.get(compact, compact)
+
+    @staticmethod
+    def _compact(skill: str) -> str:
+        skill = unicodedata.normalize("NFKC", skill).lower().translate(_HOMOGLYPHS)
+        return _SEPARATORS.sub("", skill)
+
+    def _normalize_cached(self, skill: str) -> str:
+        normalized = self._normalized.get(skill)
+        if normalized is None:
+            if len(self._normalized) >= self.max_size:
+                self._normalized.clear()
+            normalized = self._normalized[skill] = self.normalize(skill)
+        return normalized
+
+    def _clear(self) -> None:
+        self._normalized = {}
+        self._skills = {}
+        self._skill_names = []
+        self._ngram_counts = []
+        self._postings = defaultdict(list)
+        self._cache = {}
+
+    def _get_ngrams(self, skill: str) -> set[str]:
+        padded = f"^{skill}$"
+        return {padded[i : i + self.ngram_size] for i in range(max(1, len(padded) - self.ngram_size + 1))}
+
+    def _add(self, skill: str) -> str:
+        """
+        Adds a skill to the index if it is new.
+
+        Returns:
+            str: The normalized skill.
+        """
+
+        normalized = self._normalize_cached(skill)
+        if normalized in self._skills:
+            return normalized
+        if len(self._skills) >= self.max_size:
+            self._clear()
+            self._normalized[skill] = normalized
+
+        skill_id = len(self._ngram_counts)
+        self._skills[normalized] = skill_id
+        self._skill_names.append(normalized)
+        ngrams = self._get_ngrams(normalized)
+        self._ngram_counts.append(len(ngrams))
+        for ngram in ngrams:
+            self._postings[ngram].append(skill_id)
+        return normalized
+
+    def _find_similar(self, required: str) -> set[str]:
+        """
+        Finds indexed skills similar to a normalized required skill, checking only the skills added since
+        the previous lookup.
+        """
+
+        similar_skills, checked_count = self._cache.get(required, (set(), 0))
+        if checked_count == len(self._ngram_counts):
+            return similar_skills
+
+        ngrams = self._get_ngrams(required)
+        # Dice = 2 * shared / (|A| + |B|) >= t needs |B| in [|A| * t / (2 - t), |A| * (2 - t) / t].
+        min_count = len(ngrams) * self.threshold / (2 - self.threshold)
+        max_count = len(ngrams) * (2 - self.threshold) / self.threshold
+        shared_counts = defaultdict(int)
+        for ngram in ngrams:
+            postings = self._postings.get(ngram, ())
+            for skill_id in postings[bisect_left(postings, checked_count) :]:
+                shared_counts[skill_id] += 1
+
+        for skill_id, shared_count in shared_counts.items():
+            ngram_count = self._ngram_counts[skill_id]
+            if not min_count <= ngram_count <= max_count:
+                continue
+            if 2 * shared_count >= self.threshold * (len(ngrams) + ngram_count):
+                similar_skills.add(self._skill_names[skill_id])
+
+        self._cache[required] = (similar_skills, len(self._ngram_counts))
+        return similar_skills
+
+
+skill_index = SkillIndex()
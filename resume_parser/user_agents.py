@@ -0,0 +1,57 @@
+import random
+import threading
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+)
+
+
+class UserAgentProvider:
+    """
+    Shared rotation pool of browser user agents.
+
+    The browser database of fake_useragent is loaded once, a pool of user agents is sampled from it, and all
+    parsers pick random user agents from this pool.
+
+    Attributes:
+        pool_size (int): The number of user agents sampled into the pool.
+
+    Methods:
+        preload() -> None: Starts loading the pool in a background thread.
+        random -> str: A random user agent from the pool.
+    """
+
+    def __init__(self, pool_size: int = 50):
+        self.pool_size = pool_size
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def preload(self) -> None:
+        """
+        Starts loading the pool in a background thread, so the first search does not wait for it.
+        """
+
+        threading.Thread(target=self._get_pool, daemon=True).start()
+
+    @property
+    def random(self) -> str:
+        return random.choice(self._get_pool())
+
+    def _get_pool(self) -> list[str]:
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._load_pool()
+            return self._pool
+
+    def _load_pool(self) -> list[str]:
+        try:
+            import fake_useragent
+
+            user_agent = fake_useragent.UserAgent()
+            pool = list({user_agent.random for _ in range(self.pool_size)})
+        except Exception:
+            pool = []
+        return pool or [DEFAULT_USER_AGENT]
+
+
+user_agent_provider = UserAgentProvider()
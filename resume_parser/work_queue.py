@@ -0,0 +1,367 @@
+import json
+import sqlite3
+import threading
+import uuid
+from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
+from time import time
+from typing import Iterator
+
+UNIT_STATES = ("pending", "leased", "done", "failed", "cancelled")
+
+
+class WorkUnit:
+    """
+    A part of a crawl job leased by a worker.
+
+    Attributes:
+        id (int): The ID of the unit.
+        job_id (str): The ID of the job of the unit.
+        kind (str): The kind of work, "listing" or "resumes".
+        payload (dict): The arguments of the work.
+        attempts (int): The number of times the unit was leased, including the current lease.
+    """
+
+    def __init__(self, id: int, job_id: str, kind: str, payload: dict, attempts: int):
+        self.id = id
+        self.job_id = job_id
+        self.kind = kind
+        self.payload = payload
+        self.attempts = attempts
+
+
+class WorkQueueInterface(metaclass=ABCMeta):
+    """
+    Abstract base class for durable queues of crawl jobs split into work units.
+
+    A worker leases a unit for a limited time and renews the lease while it works. A unit whose lease expires,
+    e.g. because its worker died, is leased again by another worker. A failed unit is retried until it has been
+    leased 'max_attempts' times.
+
+    Methods:
+        create_job(spec: dict, units: list[tuple[str, dict]]) -> str: Creates a job with its first units.
+        get_job(job_id: str) -> dict | None: Gets the spec of a job.
+        lease(worker_id: str, lease_timeout: float) -> WorkUnit | None: Leases the next available unit.
+        renew(unit_id: int, worker_id: str, lease_timeout: float) -> bool: Extends the lease of a unit.
+        complete(unit_id: int, worker_id: str, result: dict, new_units: list[tuple[str, dict]] = None) -> bool:
+            Saves the result of a unit and adds the units that follow from it.
+        fail(unit_id: int, worker_id: str, error: str) -> None: Releases a unit for a retry.
+        get_progress(job_id: str) -> dict[str, int]: Counts the units of a job by their states.
+        get_results(job_id: str) -> list[tuple[str, dict, dict]]: Gets the results of the done units of a job.
+        cancel_job(job_id: str) -> None: Cancels the unfinished units of a job.
+        delete_job(job_id: str) -> None: Removes a job and its units.
+        close() -> None: Closes the connection to the queue.
+    """
+
+    @abstractmethod
+    def create_job(self, spec: dict, units: list[tuple[str, dict]]) -> str:
+        """
+        Abstract method to create a job with its first units.
+
+        Args:
+            spec (dict): The parameters of the job shared by its units.
+            units (list[tuple[str, dict]]): The kinds and the payloads of the units.
+
+        Returns:
+            str: The ID of the job.
+        """
+        pass
+
+    @abstractmethod
+    def get_job(self, job_id: str) -> dict | None:
+        """
+        Abstract method to get the spec of a job.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Returns:
+            dict | None: The spec of the job, or None if the job does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def lease(self, worker_id: str, lease_timeout: float) -> WorkUnit | None:
+        """
+        Abstract method to lease the next pending unit or a unit whose lease has expired.
+
+        Args:
+            worker_id (str): The ID of the worker.
+            lease_timeout (float): The duration of the lease in seconds.
+
+        Returns:
+            WorkUnit | None: The leased unit, or None if no unit is available.
+        """
+        pass
+
+    @abstractmethod
+    def renew(self, unit_id: int, worker_id: str, lease_timeout: float) -> bool:
+        """
+        Abstract method to extend the lease of a unit.
+
+        Args:
+            unit_id (int): The ID of the unit.
+            worker_id (str): The ID of the worker holding the lease.
+            lease_timeout (float): The new duration of the lease from now in seconds.
+
+        Returns:
+            bool: False if the worker no longer holds the lease, e.g. the lease expired or the job was cancelled.
+        """
+        pass
+
+    @abstractmethod
+    def complete(self, unit_id: int, worker_id: str, result: dict, new_units: list[tuple[str, dict]] = None) -> bool:
+        """
+        Abstract method to save the result of a unit and add the units that follow from it, atomically.
+
+        Args:
+            unit_id (int): The ID of the unit.
+            worker_id (str): The ID of the worker holding the lease.
+            result (dict): The JSON serializable result of the unit.
+            new_units (list[tuple[str, dict]], optional): The kinds and the payloads of the units to add to
+                the job of the unit. Defaults to None.
+
+        Returns:
+            bool: False if the worker no longer holds the lease, then the result is discarded.
+        """
+        pass
+
+    @abstractmethod
+    def fail(self, unit_id: int, worker_id: str, error: str) -> None:
+        """
+        Abstract method to release a unit after an error. The unit is retried, or fails if it has no attempts left.
+
+        Args:
+            unit_id (int): The ID of the unit.
+            worker_id (str): The ID of the worker holding the lease.
+            error (str): The description of the error.
+        """
+        pass
+
+    @abstractmethod
+    def get_progress(self, job_id: str) -> dict[str, int]:
+        """
+        Abstract method to count the units of a job by their states.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Returns:
+            dict[str, int]: The number of units in each of the UNIT_STATES.
+        """
+        pass
+
+    @abstractmethod
+    def get_results(self, job_id: str) -> list[tuple[str, dict, dict]]:
+        """
+        Abstract method to get the results of the done units of a job.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Returns:
+            list[tuple[str, dict, dict]]: The kind, the payload and the result of every done unit, in the order
+            the units were added.
+        """
+        pass
+
+    @abstractmethod
+    def cancel_job(self, job_id: str) -> None:
+        """
+        Abstract method to cancel the pending and leased units of a job. Workers holding their leases fail to
+        renew them and stop.
+
+        Args:
+            job_id (str): The ID of the job.
+        """
+        pass
+
+    @abstractmethod
+    def delete_job(self, job_id: str) -> None:
+        """
+        Abstract method to remove a job and its units.
+
+        Args:
+            job_id (str): The ID of the job.
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Closes the connection to the queue. Does nothing by default.
+        """
+        pass
+
+
+class SQLiteWorkQueue(WorkQueueInterface):
+    """
+    Work queue in a SQLite database file shared by the coordinator and the workers.
+
+    Every process opens the file itself, and leases are taken in immediate transactions, so a unit is never leased
+    by two workers at once. The database is in the WAL mode, which needs all processes on one host, e.g. several
+    workers with their own browsers. Workers on other hosts need a queue over a shared database server
+    implementing WorkQueueInterface.
+
+    Attributes:
+        path (str): The path to the database file.
+        max_attempts (int): The maximum number of leases of a unit.
+    """
+
+    def __init__(self, path: str = "crawl_queue.sqlite3", max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                spec TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS units (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker_id TEXT,
+                lease_expires_at REAL,
+                result TEXT,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS units_state ON units (state, id);
+            CREATE INDEX IF NOT EXISTS units_job ON units (job_id, state);
+            """
+        )
+
+    def create_job(self, spec: dict, units: list[tuple[str, dict]]) -> str:
+        job_id = uuid.uuid4().hex
+        with self._transaction():
+            self._connection.execute(
+                "INSERT INTO jobs (id, spec, created_at) VALUES (?, ?, ?)",
+                (job_id, json.dumps(spec, ensure_ascii=False), time()),
+            )
+            self._add_units(job_id, units)
+        return job_id
+
+    def get_job(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._connection.execute("SELECT spec FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def lease(self, worker_id: str, lease_timeout: float) -> WorkUnit | None:
+        now = time()
+        with self._transaction():
+            # Units whose last worker died without releasing them fail when they have no attempts left.
+            self._connection.execute(
+                """
+                UPDATE units SET state = 'failed', error = 'The lease expired'
+                WHERE state = 'leased' AND lease_expires_at < ? AND attempts >= ?
+                """,
+                (now, self.max_attempts),
+            )
+            row = self._connection.execute(
+                """
+                SELECT id, job_id, kind, payload, attempts FROM units
+                WHERE state = 'pending' OR (state = 'leased' AND lease_expires_at < ?)
+                ORDER BY id
+                LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            unit_id, job_id, kind, payload, attempts = row
+            self._connection.execute(
+                "UPDATE units SET state = 'leased', attempts = ?, worker_id = ?, lease_expires_at = ? WHERE id = ?",
+                (attempts + 1, worker_id, now + lease_timeout, unit_id),
+            )
+        return WorkUnit(unit_id, job_id, kind, json.loads(payload), attempts + 1)
+
+    def renew(self, unit_id: int, worker_id: str, lease_timeout: float) -> bool:
+        with self._transaction():
+            cursor = self._connection.execute(
+                "UPDATE units SET lease_expires_at = ? WHERE id = ? AND worker_id = ? AND state = 'leased'",
+                (time() + lease_timeout, unit_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, unit_id: int, worker_id: str, result: dict, new_units: list[tuple[str, dict]] = None) -> bool:
+        with self._transaction():
+            cursor = self._connection.execute(
+                """
+                UPDATE units SET state = 'done', result = ?, lease_expires_at = NULL
+                WHERE id = ? AND worker_id = ? AND state = 'leased'
+                """,
+                (json.dumps(result, ensure_ascii=False), unit_id, worker_id),
+            )
+            if cursor.rowcount != 1:
+                return False
+            if new_units:
+                (job_id,) = self._connection.execute("SELECT job_id FROM units WHERE id = ?", (unit_id,)).fetchone()
+                self._add_units(job_id, new_units)
+        return True
+
+    def fail(self, unit_id: int, worker_id: str, error: str) -> None:
+        with self._transaction():
+            self._connection.execute(
+                """
+                UPDATE units SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    error = ?, worker_id = NULL, lease_expires_at = NULL
+                WHERE id = ? AND worker_id = ? AND state = 'leased'
+                """,
+                (self.max_attempts, error, unit_id, worker_id),
+            )
+
+    def get_progress(self, job_id: str) -> dict[str, int]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT state, COUNT(*) FROM units WHERE job_id = ? GROUP BY state", (job_id,)
+            ).fetchall()
+        return {**dict.fromkeys(UNIT_STATES, 0), **dict(rows)}
+
+    def get_results(self, job_id: str) -> list[tuple[str, dict, dict]]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT kind, payload, result FROM units WHERE job_id = ? AND state = 'done' ORDER BY id", (job_id,)
+            ).fetchall()
+        return [(kind, json.loads(payload), json.loads(result)) for kind, payload, result in rows]
+
+    def cancel_job(self, job_id: str) -> None:
+        with self._transaction():
+            self._connection.execute(
+                "UPDATE units SET state = 'cancelled' WHERE job_id = ? AND state IN ('pending', 'leased')", (job_id,)
+            )
+
+    def delete_job(self, job_id: str) -> None:
+        with self._transaction():
+            self._connection.execute("DELETE FROM units WHERE job_id = ?", (job_id,))
+            self._connection.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _add_units(self, job_id: str, units: list[tuple[str, dict]]) -> None:
+        self._connection.executemany(
+            "INSERT INTO units (job_id, kind, payload) VALUES (?, ?, ?)",
+            ((job_id, kind, json.dumps(payload, ensure_ascii=False)) for kind, payload in units),
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """
+        Runs an immediate transaction, so the writers of all processes are serialized from its start.
+        """
+
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
@@ -1,62 +1,117 @@
+import re
 from typing import Union
 
-import requests
 from bs4 import BeautifulSoup
 
 from .constants import ResumeStatus
-from .dto import CriteriaDTO
+from .fields import parse_experience_years, parse_salary, parse_ukrainian_date
 from .interfaces import ResumeParserInterface
+from .skill_matching import skill_index
+
+_UPDATED_AT_PATTERN = re.compile(r"Резюме (?:від|оновлено)")
 
 
 class WorkUaResumeParser(ResumeParserInterface):
     """
     Class for parsing resumes on work.ua website.
 
+    Resumes are parsed in a process pool of one worker per CPU core by default.
+
     Methods:
 
-    - pars_resumes(resume_links: list[str], params: CriteriaDTO) -> None: Parses resumes from the provided list of
-      resume links and extracts relevant information.
+    - _fetch_resume(resume_link: str) -> bytes | None: Downloads the resume page.
+    - _extract_document(content: bytes) -> dict: Parses the resume page and extracts the fields of the resume.
+    - score_document(document: dict, required_keywords: list[str] = None) -> dict: Matches the fields of
+      the resume with the required keywords. If the resume is uploaded as a file, only the position and matching
+      keywords are included.
     """
 
-    def pars_resumes(self, resume_links: list[str], params: CriteriaDTO) -> None:
+    platform = "work_ua"
+    default_parse_workers = None
+
+    def _fetch_resume(self, resume_link: str) -> bytes | None:
         """
-        Parses resumes from the provided list of resume links and extracts relevant information.
+        Downloads the resume page.
 
         Args:
-            resume_links (list[str]): A list of URLs pointing to resumes to be parsed.
-            params (CriteriaDTO): An instance of the CriteriaDTO class containing search parameters.
+            resume_link (str): The URL of the resume.
 
         Returns:
-            None: The method does not return a value directly, but populates the 'resume_results' dictionary.
-
-        Note:
-            If a resume page is not accessible (status code other than 200), it skips to the next resume link.
-            If the resume is uploaded as a file, it only extracts the position and matching keywords.
-        """
-
-        for resume_link in resume_links:
-            resume_page = requests.get(url=resume_link, headers={"user-agent": self.user_agent.random})
-            if resume_page.status_code != 200:
-                continue
-            resume = BeautifulSoup(resume_page.content, "lxml")
-            is_file = self._get_resume_is_file(resume)
-            if is_file:
-                self.resume_results[resume_link] = {
-                    "position": self._get_position(resume),
-                    "matching_keywords": self._match_keywords(resume, params.skills_and_keywords),
-                    "is_file": bool(is_file),
-                }
-            else:
-                self.resume_results[resume_link] = {
-                    "position": self._get_position(resume),
-                    "matching_skills": self._match_skills(resume, params.skills_and_keywords),
-                    "matching_keywords": self._match_keywords(resume, params.skills_and_keywords),
-                    "experience": self._check_experience(resume),
-                    "education": self._check_education(resume),
-                    "is_file": bool(is_file),
-                }
-
-            self.resume_results[resume_link]["points"] = self._get_resume_points(self.resume_results[resume_link])
+            bytes | None: The content of the page, or None if the page is not accessible
+            (status code other than 200).
+        """
+
+        return self.http_client.fetch(resume_link, headers={"user-agent": self.user_agent.random})
+
+    @classmethod
+    def _extract_document(cls, content: bytes) -> dict:
+        """
+        Parses the resume page and extracts the fields of the resume. Only plain values are returned, so no
+        references to the page tree are kept.
+
+        Args:
+            content (bytes): The content of the resume page.
+
+        Returns:
+            dict: The document of the resume.
+        """
+
+        resume = BeautifulSoup(content, "lxml")
+        try:
+            position = cls._get_position(resume)
+            salary, currency = parse_salary(position)
+            return {
+                "position": position,
+                "is_file": bool(cls._get_resume_is_file(resume)),
+                "skills": cls._get_skills(resume),
+                "text_blocks": cls._get_text_blocks(resume),
+                "experience": cls._check_experience(resume),
+                "education": cls._check_education(resume),
+                "city": cls._get_city(resume),
+                "experience_years": cls._get_experience_years(resume),
+                "salary": salary,
+                "currency": currency,
+                "updated_at": cls._get_updated_at(resume),
+                "fingerprint": cls._get_fingerprint(position, cls._get_resume_text(resume)),
+            }
+        finally:
+            # The tree is full of reference cycles, so without decompose() it waits for the cyclic garbage collector.
+            resume.decompose()
+
+    @classmethod
+    def score_document(cls, document: dict, required_keywords: list[str] = None) -> dict:
+        """
+        Matches the fields of the resume with the required keywords.
+
+        Args:
+            document (dict): The document of the resume.
+            required_keywords (list[str]): List of required skills and keywords.
+
+        Returns:
+            dict: The parsed resume. If the resume is uploaded as a file, only the position and matching keywords
+            are included.
+        """
+
+        if document["is_file"]:
+            resume_result = {
+                "position": document["position"],
+                "matching_keywords": cls._match_keywords(document["text_blocks"], required_keywords),
+                "is_file": True,
+            }
+        else:
+            resume_result = {
+                "position": document["position"],
+                "matching_skills": cls._match_skills(document["skills"], required_keywords),
+                "matching_keywords": cls._match_keywords(document["text_blocks"], required_keywords),
+                "experience": document["experience"],
+                "education": document["education"],
+                "is_file": False,
+            }
+
+        resume_result["points"] = cls._get_resume_points(resume_result)
+        resume_result.update(cls._get_structured_fields(document))
+        resume_result["fingerprint"] = document["fingerprint"]
+        return resume_result
 
     @staticmethod
     def _get_resume_is_file(resume: BeautifulSoup):
@@ -73,6 +128,21 @@ class WorkUaResumeParser(ResumeParserInterface):
         is_file = resume.find("div", class_="flex").find("span", class_="label-violet-light")
         return is_file
 
+    @staticmethod
+    def _get_resume_text(resume: BeautifulSoup) -> str:
+        """
+        Extracts the text of the resume body.
+
+        Args:
+            resume (BeautifulSoup): The parsed resume page.
+
+        Returns:
+            str: The text of the resume body, or an empty string if the body is not found.
+        """
+
+        resume_body = resume.find("div", class_="wordwrap")
+        return resume_body.get_text(" ", strip=True) if resume_body else ""
+
     @staticmethod
     def _get_position(resume: BeautifulSoup) -> str:
         """
@@ -89,20 +159,18 @@ class WorkUaResumeParser(ResumeParserInterface):
         return position
 
     @staticmethod
-    def _match_skills(resume: BeautifulSoup, required_skills: list[str] = None) -> Union[str, set]:
+    def _get_skills(resume: BeautifulSoup) -> list[str] | None:
         """
-        Matches required skills with skills listed in the resume.
+        Extracts the skills listed in the resume.
 
         Args:
             resume (BeautifulSoup): The parsed resume page.
-            required_skills (list[str]): List of required skills.
 
         Returns:
-            Union[str, set]: Matching skills found in the resume.
+            list[str] | None: The skills in lower case, an empty list if the resume is uploaded as a file,
+            or None if the skills section is empty.
         """
 
-        if not required_skills:
-            return ResumeStatus.KEYWORDS_NOT_PROVIDED
         try:
             skills_elements = (
                 resume.find("div", class_="wordwrap")
@@ -110,27 +178,115 @@ class WorkUaResumeParser(ResumeParserInterface):
                 .find_all("span", recursive=False)
             )
         except (IndexError, AttributeError):
+            return None
+        return [skills_element.text.strip().lower() for skills_element in skills_elements]
+
+    @staticmethod
+    def _get_text_blocks(resume: BeautifulSoup) -> list[str]:
+        """
+        Extracts the text blocks of the resume matched with the keywords.
+
+        Args:
+            resume (BeautifulSoup): The parsed resume page.
+
+        Returns:
+            list[str]: The text blocks in lower case, or an empty list if the resume is not filled.
+        """
+
+        try:
+            resume_blocks = (
+                resume.find("div", class_="wordwrap").find_all("div", recursive=False)[2].find_next_siblings()
+            )
+        except IndexError:
+            return []
+        return [block.text.strip().lower() for block in resume_blocks]
+
+    @staticmethod
+    def _get_city(resume: BeautifulSoup) -> str | None:
+        """
+        Extracts the city of the candidate.
+
+        Args:
+            resume (BeautifulSoup): The parsed resume page.
+
+        Returns:
+            str | None: The city, or None if it is not found on the page.
+        """
+
+        city_title = resume.find("dt", string=lambda text: text and text.strip().startswith("Місто"))
+        city = city_title.find_next_sibling("dd") if city_title else None
+        return city.get_text(" ", strip=True) if city else None
+
+    @staticmethod
+    def _get_experience_years(resume: BeautifulSoup) -> float | None:
+        """
+        Sums the periods of the jobs in the work experience section, e.g. "(2 роки 3 місяці)".
+
+        Args:
+            resume (BeautifulSoup): The parsed resume page.
+
+        Returns:
+            float | None: The years of experience, or None if the section or the periods are not found.
+        """
+
+        experience_title = resume.find("h2", string=lambda text: text and text.strip() == "Досвід роботи")
+        if experience_title is None:
+            return None
+        experience_texts = []
+        for element in experience_title.find_next_siblings():
+            if element.name == "h2":
+                break
+            experience_texts.append(element.get_text(" ", strip=True))
+        return parse_experience_years(" ".join(experience_texts))
+
+    @staticmethod
+    def _get_updated_at(resume: BeautifulSoup) -> str | None:
+        """
+        Extracts the date of the resume, e.g. "Резюме від 5 березня 2024".
+
+        Args:
+            resume (BeautifulSoup): The parsed resume page.
+
+        Returns:
+            str | None: The date in the ISO format, or None if it is not found.
+        """
+
+        updated_at = resume.find(string=_UPDATED_AT_PATTERN)
+        return parse_ukrainian_date(updated_at.parent.get_text(" ", strip=True)) if updated_at else None
+
+    @staticmethod
+    def _match_skills(skills: list[str] | None, required_skills: list[str] = None) -> Union[str, set]:
+        """
+        Matches required skills with skills listed in the resume. Skills match if they contain the required skill
+        or are similar to it, after normalization of case, Cyrillic lookalike letters, separators and aliases.
+
+        Args:
+            skills (list[str] | None): The skills of the resume returned by '_get_skills'.
+            required_skills (list[str]): List of required skills.
+
+        Returns:
+            Union[str, set]: Matching skills found in the resume.
+        """
+
+        if not required_skills:
+            return ResumeStatus.KEYWORDS_NOT_PROVIDED
+        if skills is None:
             return ResumeStatus.SKILLS_SECTION_EMPTY
-        if not skills_elements:
+        if not skills:
             return ResumeStatus.RESUME_AS_FILE
 
-        skills = [skills_element.text.strip().lower() for skills_element in skills_elements]
-        matching_skills = set()
-        for required_skill in required_skills:
-            for skill_in_resume in skills:
-                if required_skill in skill_in_resume:
-                    matching_skills.add(skill_in_resume)
+        matching_skills = skill_index.match(required_skills, skills)
         if len(matching_skills):
             return matching_skills
         return ResumeStatus.NO_SKILL_MATCHES
 
     @staticmethod
-    def _match_keywords(resume: BeautifulSoup, required_keywords: list[str] = None) -> Union[str, set]:
+    def _match_keywords(text_blocks: list[str], required_keywords: list[str] = None) -> Union[str, set]:
         """
         Matches required keywords with text blocks in the resume.
 
         Args:
-            resume (BeautifulSoup): The parsed resume page.
+            text_blocks (list[str]): The text blocks of the resume returned by '_get_text_blocks'.
             required_keywords (list[str]): List of required keywords.
 
         Returns:
@@ -139,19 +295,12 @@ class WorkUaResumeParser(ResumeParserInterface):
 
         if not required_keywords:
             return ResumeStatus.KEYWORDS_NOT_PROVIDED
-        try:
-            resume_blocks = (
-                resume.find("div", class_="wordwrap").find_all("div", recursive=False)[2].find_next_siblings()
-            )
-        except IndexError:
-            return ResumeStatus.RESUME_NOT_FILLED
-        if not resume_blocks:
+        if not text_blocks:
             return ResumeStatus.RESUME_NOT_FILLED
 
-        resume_text = [block.text.strip().lower() for block in resume_blocks]
         matching_keywords = set()
         for required_keyword in required_keywords:
-            for text in resume_text:
+            for text in text_blocks:
                 if required_keyword in text:
                     matching_keywords.add(required_keyword)
         if len(matching_keywords):
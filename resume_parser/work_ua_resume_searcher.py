@@ -1,33 +1,13 @@
-from time import sleep
-
 from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import Select
 
+from .budget import SearchBudget
+from .cancellation import CancellationToken
+from .constants import SALARY
 from .dto import CriteriaDTO
 from .interfaces import ResumeSearcherInterface
 
-SALARY = {
-    None: "0",
-    1: "1",
-    2000: "2",
-    3000: "3",
-    4000: "4",
-    5000: "5",
-    6000: "6",
-    7000: "7",
-    8000: "8",
-    9000: "9",
-    10000: "10",
-    15000: "11",
-    20000: "12",
-    25000: "13",
-    30000: "14",
-    40000: "15",
-    50000: "16",
-    100000: "17",
-}
-
 
 class WorkUaResumeSearcher(ResumeSearcherInterface):
     """
@@ -38,43 +18,51 @@ class WorkUaResumeSearcher(ResumeSearcherInterface):
 
     Methods:
 
-    - __init__(): Initializes the WebDriver and navigates to the work.ua resumes page.
-    - set_params(params: CriteriaDTO): Sets the search parameters for searching resumes.
+    - __init__(cancellation_token: CancellationToken = None): Initializes the WebDriver and navigates to
+      the work.ua resumes page.
+    - set_params(params: CriteriaDTO, budget: SearchBudget = None): Sets the search parameters for searching resumes.
     - set_position_and_location(self, position: str, location: str = None) -> None: Set the position and
       location parameters, and search resume.
     - set_experience(experience: float | None) -> None: Sets the experience filter for searching resumes.
     - set_salary(salary_from: int | None, salary_to: int | None) -> None: Sets
       the experience filter for searching resumes.
-    - get_resume_links(self) -> None: Gets a link to all found resumes.
+    - get_resume_links(self, budget: SearchBudget = None) -> None: Gets a link to all found resumes.
     """
 
-    def __init__(self):
+    def __init__(self, cancellation_token: CancellationToken = None):
         """
         Initializes the WebDriver and navigates to the work.ua resumes page.
+
+        Args:
+            cancellation_token (CancellationToken, optional): The cancellation of the search. Defaults to None.
         """
 
-        super().__init__()
+        super().__init__(cancellation_token)
         self.browser.get("https://www.work.ua/resumes/")
-        sleep(2)
+        self._sleep(2)
 
-    def set_params(self, params: CriteriaDTO):
+    def set_params(self, params: CriteriaDTO, budget: SearchBudget = None):
         """
         Sets the search parameters for searching resumes.
 
         Args:
             params (CriteriaDTO): Criteria data transfer object containing search parameters.
+            budget (SearchBudget, optional): Limits of the search. Defaults to None.
         """
 
+        if budget:
+            budget.start()
+
         self.set_position_and_location(params.position, params.location)
 
         self.set_salary(params.salary_from, params.salary_to)
-        sleep(1)
+        self._sleep(1)
 
         self.set_experience(params.experience)
-        sleep(1)
+        self._sleep(1)
 
-        self.get_resume_links()
-        self.browser.quit()
+        self.get_resume_links(budget)
+        self.close()
 
     def set_position_and_location(self, position: str, location: str = None) -> None:
         """
@@ -95,7 +83,7 @@ class WorkUaResumeSearcher(ResumeSearcherInterface):
 
         search_candidates_button = self.browser.find_element(By.XPATH, "//*[@id='sm-but']")
         search_candidates_button.click()
-        sleep(3)
+        self._sleep(3)
 
     def set_experience(self, experience: float | None) -> None:
         """
@@ -111,13 +99,13 @@ class WorkUaResumeSearcher(ResumeSearcherInterface):
             self._try_find_element_by_xpath("//*[@id='experience_selection']/div[1]/label/input").click()
         if 0 < experience <= 1:
             self._try_find_element_by_xpath("//*[@id='experience_selection']/div[2]/label/input").click()
-        sleep(1)
+        self._sleep(1)
         if 1 <= experience <= 2:
             self._try_find_element_by_xpath("//*[@id='experience_selection']/div[3]/label/input").click()
-        sleep(1)
+        self._sleep(1)
         if 2 <= experience <= 5:
             self._try_find_element_by_xpath("//*[@id='experience_selection']/div[4]/label/input").click()
-        sleep(1)
+        self._sleep(1)
         if experience >= 5:
             self._try_find_element_by_xpath("//*[@id='experience_selection']/div[5]/label/input").click()
 
@@ -133,30 +121,48 @@ class WorkUaResumeSearcher(ResumeSearcherInterface):
         select_salary_from = Select(self._try_find_element_by_xpath("//*[@id='salaryfrom_selection']"))
 
         self._try_select_by_value(select=select_salary_from, value=SALARY[salary_from])
-        sleep(1)
+        self._sleep(1)
 
         select_salary_to = Select(self._try_find_element_by_xpath("//*[@id='salaryto_selection']"))
 
         self._try_select_by_value(select=select_salary_to, value=SALARY[salary_to])
 
-    def get_resume_links(self) -> None:
+    def get_resume_links(self, budget: SearchBudget = None) -> None:
         """
         Gets a link to all found resumes.
 
-        This method iterates through the resume cards on the page and extracts the links to the resumes.
+        This method iterates through the resume cards on the page and extracts the links to the resumes
+        and the texts of the cards.
         It also handles pagination by clicking on the next page link until no more resumes are available.
+
+        Args:
+            budget (SearchBudget, optional): Limits of the search. When the budget is exhausted, the links
+                collected so far are kept. Defaults to None.
         """
 
+        loaded_pages = 1
         while True:
             resume_cards = self._try_find_element_by_xpath("//*[@id='pjax-resume-list']").find_elements(
                 By.CLASS_NAME, "resume-link"
             )
             for card in resume_cards:
-                self._resume_links.append(card.find_element(By.TAG_NAME, "a").get_attribute("href"))
+                if budget and not budget.can_load_resume(len(self._resume_links)):
+                    return
+                link_element = card.find_element(By.TAG_NAME, "a")
+                resume_link = link_element.get_attribute("href")
+                self._resume_links.append(resume_link)
+                # The card text contains the snippet, the salary and the experience of the candidate.
+                self._resume_cards[resume_link] = {"title": link_element.text, "text": card.text}
 
             try:
                 pagination = self.browser.find_element(By.XPATH, "//*[@id='pjax-resume-list']/nav/ul[1]")
-                pagination.find_element(By.CLASS_NAME, "add-left-default").find_element(By.TAG_NAME, "a").click()
+                next_page_link = pagination.find_element(By.CLASS_NAME, "add-left-default").find_element(
+                    By.TAG_NAME, "a"
+                )
             except NoSuchElementException:
                 return
-            sleep(1)
+            if budget and not budget.can_load_page(loaded_pages):
+                return
+            next_page_link.click()
+            loaded_pages += 1
+            self._sleep(1)